@@ -0,0 +1,320 @@
+"""Headless HTTP/JSON interview API: every interview of the process on one asyncio event loop"""
+# Waiting on the model costs a coroutine instead of a thread, so a single process serves thousands
+# of candidates at once. The Streamlit app becomes a client when AI_INTERVIEWER_API_URL points
+# here (see utils/api_client.py).
+# Interviews:
+#     POST /v1/interviews                      {"candidate_name": "...", "background": "..."}
+#     GET  /v1/interviews/<id>                 questions, phase and progress
+#     POST /v1/interviews/<id>/answers         {"question_id": 1, "answer": "...", "time_taken": 42.0}
+#     GET  /v1/interviews/<id>/results         final evaluation, once every question is answered
+# Single calls (used by the Streamlit client, which keeps its own session state):
+#     POST /v1/questions                       {"background": "...", "fallback": true}
+#     GET  /v1/questions/bank                  a question set from the bank, or null
+#     POST /v1/score                           {"response": {...}}
+#     POST /v1/evaluate                        {"responses": [...], "answer_scores": {"1": {...}}}
+# Operations:
+#     GET  /healthz
+#     GET  /metrics                            Prometheus text format
+# Off loopback every request except /healthz and /metrics needs "Authorization: Bearer
+# $AI_INTERVIEWER_API_TOKEN", since the routes spend the server's key; the server refuses to bind
+# a public interface without a token.
+# Usage:
+#     python api_server.py --port 8600                     # Gemini, key from $GEMINI_API_KEY
+#     AI_INTERVIEWER_BACKEND=simulated python api_server.py
+#     AI_INTERVIEWER_API_TOKEN=... python api_server.py --host 0.0.0.0
+import argparse
+import asyncio
+import hmac
+import ipaddress
+import json
+import logging
+import os
+import sys
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+from models.data_models import Response
+from services.ai_service import QuestionGenerationError
+from services.async_interviewer import AsyncAIInterviewer
+from services.interview_service import (
+    InterviewService, InterviewStateError, UnknownInterviewError, question_to_dict
+)
+from services.telemetry import render_prometheus
+
+API_TOKEN_ENV = 'AI_INTERVIEWER_API_TOKEN'
+# Routes that spend nothing and stay open to health checks and scrapers
+PUBLIC_PATHS = ('/healthz', '/metrics')
+MAX_BODY_BYTES = 1 << 20
+# Longest request or header line, and most header lines, accepted per request
+MAX_LINE_BYTES = 8192
+MAX_HEADERS = 100
+# An idle keep-alive connection is closed after KEEP_ALIVE_SECONDS; once a request has
+# started, its headers and body must arrive within REQUEST_READ_SECONDS
+KEEP_ALIVE_SECONDS = 75.0
+REQUEST_READ_SECONDS = 30.0
+REASONS = {200: 'OK', 201: 'Created', 400: 'Bad Request', 401: 'Unauthorized', 404: 'Not Found', 405: 'Method Not Allowed',
+           408: 'Request Timeout', 409: 'Conflict', 413: 'Payload Too Large',
+           431: 'Request Header Fields Too Large', 500: 'Internal Server Error', 502: 'Bad Gateway'}
+
+class HTTPError(Exception):
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+def response_from_json(data: Dict) -> Response:
+    try:
+        return Response(
+            question_id=int(data['question_id']),
+            question=str(data['question']),
+            category=str(data['category']),
+            answer=str(data['answer']),
+            time_taken=float(data.get('time_taken', 0.0))
+        )
+    except (KeyError, TypeError, ValueError) as e:
+        raise HTTPError(400, f'Invalid response object: {e}')
+
+class InterviewAPI:
+    """Routes one parsed request to the interview service; transport-agnostic so it is easy to drive"""
+
+    def __init__(self, service: InterviewService):
+        self.service = service
+        self.interviewer = service.interviewer
+
+    async def handle(self, method: str, path: str, body: Optional[Dict]) -> Tuple[int, object]:
+        """(status, payload) for a request; a str payload is sent as plain text"""
+        try:
+            return await self._route(method, [part for part in path.split('/') if part], body or {})
+        except HTTPError as e:
+            return e.status, {'error': str(e)}
+        except UnknownInterviewError as e:
+            return 404, {'error': f'Unknown interview {e.args[0]}'}
+        except InterviewStateError as e:
+            return 409, {'error': str(e)}
+        except QuestionGenerationError as e:
+            return 502, {'error': str(e)}
+        except ValueError as e:
+            return 400, {'error': str(e)}
+        except Exception as e:
+            # Model and network failures that no fallback absorbed
+            return 502, {'error': f'{type(e).__name__}: {e}'}
+
+    async def _route(self, method: str, parts, body: Dict) -> Tuple[int, object]:
+        if parts == ['healthz']:
+            # Loads the SQLite-backed bank on first use
+            bank_ready = await asyncio.to_thread(self.interviewer.interviewer.bank_ready)
+            return 200, {'status': 'ok', 'model': self.interviewer.model_name, 'interviews': len(self.service),
+                         'bank_ready': bank_ready}
+        if parts == ['metrics']:
+            return 200, render_prometheus()
+        if parts[:1] != ['v1']:
+            raise HTTPError(404, 'Not found')
+        parts = parts[1:]
+
+        if parts == ['interviews'] and method == 'POST':
+            session = await self.service.start(str(body.get('candidate_name', '')), str(body.get('background', '')))
+            return 201, session.to_dict()
+        if len(parts) == 2 and parts[0] == 'interviews' and method == 'GET':
+            return 200, (await self.service.get(parts[1])).to_dict()
+        if len(parts) == 3 and parts[0] == 'interviews' and parts[2] == 'answers' and method == 'POST':
+            if 'question_id' not in body:
+                raise HTTPError(400, 'question_id is required')
+            time_taken = body.get('time_taken')
+            session = await self.service.answer(
+                parts[1], int(body['question_id']), str(body.get('answer', '')),
+                None if time_taken is None else float(time_taken)
+            )
+            return 200, session.to_dict()
+        if len(parts) == 3 and parts[0] == 'interviews' and parts[2] == 'results' and method == 'GET':
+            return 200, await self.service.results(parts[1])
+
+        if parts == ['questions'] and method == 'POST':
+            background = str(body.get('background', ''))
+            if body.get('fallback', True):
+                questions = await self.interviewer.generate_questions(background)
+            else:
+                questions = await self.interviewer.request_questions(background)
+            return 200, {'questions': [question_to_dict(q) for q in questions]}
+        if parts == ['questions', 'bank'] and method == 'GET':
+            questions = await asyncio.to_thread(self.interviewer.interviewer.bank_question_set)
+            return 200, {'questions': None if questions is None else [question_to_dict(q) for q in questions]}
+        if parts == ['score'] and method == 'POST':
+            response = response_from_json(body.get('response') or {})
+            try:
+                return 200, await self.interviewer.score_response(response)
+            except ValueError as e:
+                raise HTTPError(502, f'Unusable scoring response: {e}')
+        if parts == ['evaluate'] and method == 'POST':
+            responses = [response_from_json(r) for r in body.get('responses') or []]
+            answer_scores = {int(k): v for k, v in (body.get('answer_scores') or {}).items()} or None
+            evaluation = await self.interviewer.evaluate_responses(
+                responses, answer_scores=answer_scores, use_cache=bool(body.get('use_cache', True))
+            )
+            return 200, evaluation
+
+        raise HTTPError(405 if parts and parts[0] in ('interviews', 'questions', 'score', 'evaluate') else 404,
+                        f"No route for {method} /v1/{'/'.join(parts)}")
+
+def is_loopback(host: str) -> bool:
+    """Whether ``host`` only accepts connections from this machine"""
+    try:
+        return ipaddress.ip_address(host).is_loopback
+    except ValueError:
+        return host == 'localhost'
+
+def _authorized(headers: Dict[str, str], token: str) -> bool:
+    scheme, _, credentials = headers.get('authorization', '').partition(' ')
+    return scheme.lower() == 'bearer' and hmac.compare_digest(credentials.strip().encode('utf-8'),
+                                                              token.encode('utf-8'))
+
+async def _readline(reader: asyncio.StreamReader) -> bytes:
+    try:
+        return await reader.readline()
+    except ValueError:
+        # The reader's limit (MAX_LINE_BYTES) was reached before the end of the line
+        raise HTTPError(431, 'Request line or header too long')
+
+async def _read_request(reader: asyncio.StreamReader, token: Optional[str] = None):
+    """(method, path, body, keep_alive) of the next request, or None when the client closed or idled out"""
+    # With a ``token``, requests outside PUBLIC_PATHS must carry it as a bearer token.
+    try:
+        request_line = await asyncio.wait_for(_readline(reader), KEEP_ALIVE_SECONDS)
+    except asyncio.TimeoutError:
+        return None
+    if not request_line:
+        return None
+    try:
+        return await asyncio.wait_for(_read_rest(reader, request_line, token), REQUEST_READ_SECONDS)
+    except asyncio.TimeoutError:
+        raise HTTPError(408, 'Timed out reading the request')
+
+async def _read_rest(reader: asyncio.StreamReader, request_line: bytes, token: Optional[str] = None):
+    """Headers and body of the request that ``request_line`` started"""
+    try:
+        method, target, version = request_line.decode('latin-1').split()
+    except ValueError:
+        raise HTTPError(400, 'Malformed request line')
+
+    headers = {}
+    for _ in range(MAX_HEADERS + 1):
+        line = await _readline(reader)
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    else:
+        raise HTTPError(431, 'Too many headers')
+    path = urlsplit(target).path
+    # Checked before the body is read, so an unauthenticated client cannot make us buffer it
+    if token and path not in PUBLIC_PATHS and not _authorized(headers, token):
+        raise HTTPError(401, 'Missing or wrong bearer token')
+
+    try:
+        length = int(headers.get('content-length') or 0)
+    except ValueError:
+        raise HTTPError(400, 'Invalid Content-Length')
+    if length < 0:
+        raise HTTPError(400, 'Invalid Content-Length')
+    if length > MAX_BODY_BYTES:
+        raise HTTPError(413, 'Request body too large')
+    body = None
+    if length:
+        try:
+            body = json.loads(await reader.readexactly(length))
+        except json.JSONDecodeError as e:
+            raise HTTPError(400, f'Invalid JSON body: {e}')
+        if not isinstance(body, dict):
+            raise HTTPError(400, 'JSON body must be an object')
+
+    connection = headers.get('connection', '').lower()
+    keep_alive = connection != 'close' if version == 'HTTP/1.1' else connection == 'keep-alive'
+    return method.upper(), path, body, keep_alive
+
+def _encode_response(status: int, payload: object, keep_alive: bool) -> bytes:
+    if isinstance(payload, str):
+        body, content_type = payload.encode('utf-8'), 'text/plain; version=0.0.4; charset=utf-8'
+    else:
+        body, content_type = json.dumps(payload, ensure_ascii=False).encode('utf-8'), 'application/json'
+    head = (
+        f"HTTP/1.1 {status} {REASONS.get(status, 'Error')}\r\n"
+        f'Content-Type: {content_type}\r\n'
+        f'Content-Length: {len(body)}\r\n'
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    return head.encode('latin-1') + body
+
+async def serve(api: InterviewAPI, host: str = '127.0.0.1', port: int = 8600, backlog: int = 4096,
+                token: Optional[str] = None):
+    """Start the HTTP/1.1 server (keep-alive, JSON bodies) and return the asyncio Server"""
+    # ``token`` is required as a bearer token when set, and must be set to bind off loopback.
+    if not token and not is_loopback(host):
+        raise ValueError(f'Refusing to serve on {host} without a token; set {API_TOKEN_ENV}')
+
+    async def handle_connection(reader: asyncio.StreamReader, writer: asyncio.StreamWriter):
+        try:
+            while True:
+                try:
+                    request = await _read_request(reader, token)
+                except HTTPError as e:
+                    writer.write(_encode_response(e.status, {'error': str(e)}, False))
+                    break
+                if request is None:
+                    break
+                method, path, body, keep_alive = request
+                status, payload = await api.handle(method, path, body)
+                writer.write(_encode_response(status, payload, keep_alive))
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    return await asyncio.start_server(handle_connection, host, port, backlog=backlog, limit=MAX_LINE_BYTES)
+
+def build_api(api_key: Optional[str] = None, backend=None) -> InterviewAPI:
+    """The API over an AIInterviewer for ``api_key``, or ``backend`` / AI_INTERVIEWER_BACKEND"""
+    from services.ai_service import AIInterviewer
+    from services.hedging import hedge_policy_from_env
+    from services.llm_backend import backend_from_env
+
+    # AIInterviewer reports through Streamlit, which only logs warnings outside a session
+    for logger_name in list(logging.root.manager.loggerDict):
+        if logger_name.startswith('streamlit'):
+            logging.getLogger(logger_name).setLevel(logging.ERROR)
+
+    interviewer = AIInterviewer(api_key or '', backend=backend or backend_from_env(),
+                                hedge_policy=hedge_policy_from_env())
+    return InterviewAPI(InterviewService(AsyncAIInterviewer(interviewer)))
+
+async def _run(args) -> None:
+    from services.telemetry import start_telemetry
+    start_telemetry()
+    server = await serve(build_api(args.api_key), args.host, args.port, token=args.token)
+    print(f'Interview API listening on http://{args.host}:{args.port}', file=sys.stderr)
+    async with server:
+        await server.serve_forever()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Serve interviews over HTTP/JSON from one event loop')
+    parser.add_argument('--host', default='127.0.0.1', help='Interface to bind')
+    parser.add_argument('--port', type=int, default=8600, help='Port to listen on')
+    parser.add_argument('--api-key', default=os.environ.get('GEMINI_API_KEY'),
+                        help='Gemini API key (defaults to $GEMINI_API_KEY)')
+    args = parser.parse_args(argv)
+    args.token = os.environ.get(API_TOKEN_ENV) or None
+
+    if not args.token and not is_loopback(args.host):
+        parser.error(f'{API_TOKEN_ENV} must be set to serve on {args.host}; '
+                     'without it anyone who can reach the port spends the Gemini key')
+
+    if not args.api_key and os.environ.get('AI_INTERVIEWER_BACKEND', '').lower() != 'simulated':
+        parser.error('a Gemini API key is required (--api-key or $GEMINI_API_KEY), '
+                     'or AI_INTERVIEWER_BACKEND=simulated')
+    try:
+        asyncio.run(_run(args))
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
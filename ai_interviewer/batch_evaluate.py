@@ -0,0 +1,180 @@
+"""Re-grade interview transcripts in bulk without the Streamlit UI"""
+# Input is JSONL, one interview per line:
+#     {"id": "cand-42", "responses": [{"question_id": 1, "question": "...", "category": "Technical",
+#                                      "answer": "...", "time_taken": 95.2}, ...]}
+# Results are appended to the output JSONL as they finish. The output file doubles as the
+# checkpoint: re-running the same command skips interviews that already have a result. Failed
+# evaluations and malformed input lines are written as ``error`` records (with the input line
+# number) and are retried on the next run.
+# Usage:
+#     python batch_evaluate.py transcripts.jsonl results.jsonl --concurrency 8
+import argparse
+import json
+import logging
+import math
+import os
+import sys
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Dict, Iterator, List, Optional, Set, Tuple
+from models.data_models import Response
+
+def load_completed_ids(output_path: str) -> Set[str]:
+    """Ids already written to the output file by an earlier (possibly crashed) run"""
+    completed = set()
+    if not os.path.exists(output_path):
+        return completed
+
+    with open(output_path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # Partial line from a crash; that interview is redone
+            if 'evaluation' in record:
+                completed.add(str(record['id']))
+    return completed
+
+def iter_transcripts(input_path: str,
+                     skip_ids: Set[str]) -> Iterator[Tuple[str, int, Optional[List[Response]], Optional[str]]]:
+    """Stream (id, line number, responses, error) from a JSONL file, skipping completed ids"""
+    # A malformed line yields its error instead of responses rather than ending the batch.
+    with open(input_path, encoding='utf-8') as f:
+        for line_no, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            transcript_id = str(line_no)
+            try:
+                record = json.loads(line)
+                transcript_id = str(record.get('id', line_no))
+                if transcript_id in skip_ids:
+                    continue
+                responses = [
+                    Response(
+                        question_id=int(r['question_id']),
+                        question=r['question'],
+                        category=r['category'],
+                        answer=r['answer'],
+                        time_taken=float(r.get('time_taken', 0.0))
+                    )
+                    for r in record['responses']
+                ]
+            # json.JSONDecodeError is a ValueError; AttributeError/TypeError: a line that is not an object
+            except (AttributeError, KeyError, TypeError, ValueError) as e:
+                yield transcript_id, line_no, None, f'Malformed transcript on line {line_no}: {e!r}'
+                continue
+            yield transcript_id, line_no, responses, None
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+def run_batch(interviewer, input_path: str, output_path: str, concurrency: int = 4) -> Dict:
+    """Evaluate every pending transcript with bounded concurrency and return run statistics"""
+    completed = load_completed_ids(output_path)
+    transcripts = iter_transcripts(input_path, completed)
+
+    def evaluate(transcript_id: str, line_no: int, responses: List[Response]) -> Dict:
+        started = time.monotonic()
+        try:
+            # A basic evaluation in place of the model's would be checkpointed as done
+            evaluation = interviewer.evaluate_responses(responses, use_fallback=False)
+            return {'id': transcript_id, 'model': interviewer.model_name, 'evaluation': evaluation,
+                    'latency': time.monotonic() - started}
+        except Exception as e:
+            return {'id': transcript_id, 'line': line_no, 'error': str(e) or type(e).__name__,
+                    'latency': time.monotonic() - started}
+
+    latencies: List[float] = []
+    errors = 0
+    started = time.monotonic()
+
+    def write(out, result: Dict) -> None:
+        nonlocal errors
+        out.write(json.dumps(result, ensure_ascii=False) + '\n')
+        out.flush()
+        if 'error' in result:
+            errors += 1
+
+    # Append mode plus a newline guard keeps earlier results after a crash mid-write
+    needs_newline = os.path.exists(output_path) and os.path.getsize(output_path) > 0
+    if needs_newline:
+        with open(output_path, 'rb') as f:
+            f.seek(-1, os.SEEK_END)
+            needs_newline = f.read(1) != b'\n'
+
+    with open(output_path, 'a', encoding='utf-8') as out, \
+            ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix='batch-eval') as executor:
+        if needs_newline:
+            out.write('\n')
+
+        in_flight = set()
+        exhausted = False
+        while in_flight or not exhausted:
+            # Keep a bounded window so huge inputs are never fully loaded
+            while not exhausted and len(in_flight) < concurrency * 2:
+                try:
+                    transcript_id, line_no, responses, error = next(transcripts)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if error is not None:
+                    write(out, {'id': transcript_id, 'line': line_no, 'error': error})
+                    continue
+                in_flight.add(executor.submit(evaluate, transcript_id, line_no, responses))
+
+            if not in_flight:
+                break
+
+            done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                result = future.result()
+                write(out, result)
+                latencies.append(result['latency'])
+
+    elapsed = time.monotonic() - started
+    latencies.sort()
+    return {
+        'skipped': len(completed),
+        'evaluated': len(latencies),
+        'errors': errors,
+        'elapsed': elapsed,
+        'throughput': len(latencies) / elapsed if elapsed > 0 else 0.0,
+        'p50': percentile(latencies, 50),
+        'p90': percentile(latencies, 90),
+        'p99': percentile(latencies, 99),
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Batch-evaluate interview transcripts')
+    parser.add_argument('input', help='Transcript JSONL file')
+    parser.add_argument('output', help='Result JSONL file (appended to; also the resume checkpoint)')
+    parser.add_argument('--api-key', default=os.environ.get('GEMINI_API_KEY'),
+                        help='Gemini API key (defaults to $GEMINI_API_KEY)')
+    parser.add_argument('--concurrency', type=int, default=4, help='Evaluations in flight at once')
+    args = parser.parse_args(argv)
+
+    if not args.api_key:
+        parser.error('a Gemini API key is required (--api-key or $GEMINI_API_KEY)')
+
+    from services.ai_service import AIInterviewer
+
+    # AIInterviewer reports through Streamlit, which only logs warnings outside a session
+    for logger_name in list(logging.root.manager.loggerDict):
+        if logger_name.startswith('streamlit'):
+            logging.getLogger(logger_name).setLevel(logging.ERROR)
+
+    interviewer = AIInterviewer(args.api_key)
+    stats = run_batch(interviewer, args.input, args.output, concurrency=max(1, args.concurrency))
+
+    print(f"Evaluated {stats['evaluated']} interviews ({stats['errors']} errors, "
+          f"{stats['skipped']} already done) in {stats['elapsed']:.1f}s")
+    print(f"Throughput: {stats['throughput']:.2f} interviews/s")
+    print(f"Latency p50: {stats['p50']:.2f}s  p90: {stats['p90']:.2f}s  p99: {stats['p99']:.2f}s")
+    return 0 if stats['errors'] == 0 else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,181 @@
+"""Local load test of the interview API: thousands of simulated candidates at once"""
+# Starts api_server in this process on a simulated model (default median latency 1s), then drives
+# every candidate concurrently over its own keep-alive connection: start an interview, answer six
+# questions with some think time, fetch the results. Reports completed interviews, throughput and
+# per-endpoint latency percentiles.
+# Run from the ai_interviewer directory:
+#     python -m benchmarks.load_test --candidates 2000
+#     python -m benchmarks.load_test --candidates 5000 --latency 2 --think 1
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import math
+import os
+import random
+import resource
+import sys
+import tempfile
+import time
+from collections import defaultdict
+from typing import Dict, List
+
+# Keep stores and caches away from real user data
+os.environ.setdefault('AI_INTERVIEWER_DATA_DIR', tempfile.mkdtemp(prefix='ai-interviewer-load-'))
+
+ANSWER = ('I would start from the requirements, pick a data structure that keeps the common '
+          'operation cheap, and explain the trade-offs with a small example. ')
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    if not sorted_values:
+        return 0.0
+    rank = max(0, min(len(sorted_values) - 1, math.ceil(pct / 100 * len(sorted_values)) - 1))
+    return sorted_values[rank]
+
+class Client:
+    """One keep-alive HTTP/1.1 connection speaking JSON"""
+
+    def __init__(self, host: str, port: int, latencies: Dict[str, List[float]]):
+        self.host = host
+        self.port = port
+        self.latencies = latencies
+        self.reader = self.writer = None
+
+    async def __aenter__(self):
+        self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        return self
+
+    async def __aexit__(self, *exc_info):
+        self.writer.close()
+
+    async def call(self, endpoint: str, method: str, path: str, body=None):
+        data = b'' if body is None else json.dumps(body).encode('utf-8')
+        started = time.perf_counter()
+        self.writer.write(
+            f'{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Type: application/json\r\n'
+            f'Content-Length: {len(data)}\r\n\r\n'.encode('latin-1') + data
+        )
+        await self.writer.drain()
+        status = int((await self.reader.readline()).split()[1])
+        length = 0
+        while True:
+            line = await self.reader.readline()
+            if line in (b'\r\n', b''):
+                break
+            name, _, value = line.decode('latin-1').partition(':')
+            if name.lower() == 'content-length':
+                length = int(value)
+        payload = json.loads(await self.reader.readexactly(length)) if length else None
+        self.latencies[endpoint].append(time.perf_counter() - started)
+        if status >= 400:
+            raise RuntimeError(f'{method} {path} -> {status}: {payload}')
+        return payload
+
+async def run_candidate(index: int, args, latencies: Dict[str, List[float]], rng: random.Random) -> Dict:
+    # Spread arrivals so the server sees a ramp rather than one burst of connects
+    await asyncio.sleep(rng.uniform(0, args.ramp))
+    async with Client(args.host, args.port, latencies) as client:
+        background = f'Candidate {index}: Python, SQL, a web scraper project' if rng.random() < args.personalized else ''
+        interview = await client.call('start', 'POST', '/v1/interviews',
+                                      {'candidate_name': f'Load {index}', 'background': background})
+        session_id = interview['session_id']
+        for question in interview['questions']:
+            await asyncio.sleep(rng.uniform(0, 2 * args.think))
+            await client.call('answer', 'POST', f'/v1/interviews/{session_id}/answers', {
+                'question_id': question['id'],
+                'answer': f'{ANSWER * 3}(candidate {index})',
+                'time_taken': rng.uniform(30, 150),
+            })
+        return await client.call('results', 'GET', f'/v1/interviews/{session_id}/results')
+
+async def run(args) -> Dict:
+    from api_server import InterviewAPI, serve
+    from services.ai_service import AIInterviewer
+    from services.async_interviewer import AsyncAIInterviewer
+    from services.interview_service import InterviewService
+    from services.llm_backend import LatencyModel, SimulatedBackend
+
+    backend = SimulatedBackend(latency=LatencyModel(median=args.latency, sigma=0.5),
+                               failure_rate=args.failure_rate, seed=7)
+    service = InterviewService(AsyncAIInterviewer(AIInterviewer('', backend=backend)),
+                               max_sessions=max(10000, args.candidates))
+    server = await serve(InterviewAPI(service), args.host, args.port)
+    args.port = server.sockets[0].getsockname()[1]
+
+    latencies: Dict[str, List[float]] = defaultdict(list)
+    rng = random.Random(42)
+    started = time.perf_counter()
+    results = await asyncio.gather(
+        *(run_candidate(i, args, latencies, rng) for i in range(args.candidates)), return_exceptions=True
+    )
+    elapsed = time.perf_counter() - started
+    server.close()
+    await server.wait_closed()
+
+    errors = [r for r in results if isinstance(r, BaseException)]
+    requests = sum(len(values) for values in latencies.values())
+    return {
+        'candidates': args.candidates,
+        'completed': len(results) - len(errors),
+        'errors': len(errors),
+        'first_error': repr(errors[0]) if errors else None,
+        'elapsed': elapsed,
+        'interviews_per_s': (len(results) - len(errors)) / elapsed,
+        'requests_per_s': requests / elapsed,
+        'model_calls': backend.calls,
+        'endpoints': {
+            endpoint: {'count': len(values), 'p50': percentile(values, 50), 'p95': percentile(values, 95),
+                       'p99': percentile(values, 99)}
+            for endpoint, values in ((e, sorted(v)) for e, v in latencies.items())
+        },
+    }
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Drive many concurrent interviews through the interview API')
+    parser.add_argument('--candidates', type=int, default=2000, help='Concurrent candidates')
+    parser.add_argument('--latency', type=float, default=1.0, help='Median simulated model latency (s)')
+    parser.add_argument('--failure-rate', type=float, default=0.0, help='Simulated model failure rate')
+    parser.add_argument('--think', type=float, default=0.5, help='Mean think time before each answer (s)')
+    parser.add_argument('--ramp', type=float, default=2.0, help='Candidates arrive over this many seconds')
+    parser.add_argument('--personalized', type=float, default=0.5,
+                        help='Share of candidates with a background (personalized questions)')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=0, help='0 picks a free port')
+    parser.add_argument('--json', action='store_true', help='Print the raw result as JSON')
+    args = parser.parse_args(argv)
+
+    # Each candidate holds a client and a server socket
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    needed = 2 * args.candidates + 256
+    if soft < needed:
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (min(needed, hard), hard))
+        except (ValueError, OSError):
+            pass
+        soft = resource.getrlimit(resource.RLIMIT_NOFILE)[0]
+        if soft < needed:
+            parser.error(f'{args.candidates} candidates need {needed} open files; the limit is {soft}')
+
+    # The interviewer prints one line per prompt built; keep the report readable
+    with contextlib.redirect_stdout(io.StringIO()):
+        stats = asyncio.run(run(args))
+    if args.json:
+        print(json.dumps(stats, indent=2))
+        return 0 if stats['errors'] == 0 else 1
+
+    print(f"{stats['completed']} of {stats['candidates']} interviews completed in {stats['elapsed']:.1f}s "
+          f"({stats['errors']} errors, {stats['model_calls']} model calls)")
+    if stats['first_error']:
+        print(f"First error: {stats['first_error']}")
+    print(f"Throughput: {stats['interviews_per_s']:.1f} interviews/s, {stats['requests_per_s']:.0f} requests/s")
+    print(f"{'endpoint':<10}{'count':>8}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for endpoint in ('start', 'answer', 'results'):
+        row = stats['endpoints'].get(endpoint)
+        if row:
+            print(f"{endpoint:<10}{row['count']:>8}{row['p50'] * 1000:>8.0f}ms{row['p95'] * 1000:>8.0f}ms"
+                  f"{row['p99'] * 1000:>8.0f}ms")
+    return 0 if stats['errors'] == 0 else 1
+
+if __name__ == '__main__':
+    sys.exit(main())
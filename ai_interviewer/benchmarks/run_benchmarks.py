@@ -0,0 +1,312 @@
+"""Micro-benchmarks for the interviewer hot paths against a stubbed LLM"""
+# Run from the ai_interviewer directory:
+#     python -m benchmarks.run_benchmarks                      # writes benchmarks/results/<commit>.json
+#     python -m benchmarks.run_benchmarks --compare benchmarks/results/<older>.json
+#     python -m benchmarks.run_benchmarks --filter parse --quick
+import argparse
+import json
+import logging
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+APP_DIR = os.path.dirname(BENCH_DIR)
+RESULTS_DIR = os.path.join(BENCH_DIR, 'results')
+
+# Keep caches and the simulated backend away from real user data and the network
+os.environ.setdefault('AI_INTERVIEWER_DATA_DIR', tempfile.mkdtemp(prefix='ai-interviewer-bench-'))
+os.environ['AI_INTERVIEWER_BACKEND'] = 'simulated'
+os.environ['AI_INTERVIEWER_SIM_LATENCY'] = '0'
+
+def measure(fn: Callable[[], object], repeat: int, number: int) -> Dict:
+    """Time ``number`` calls of ``fn``, ``repeat`` times; report per-call seconds"""
+    fn()  # warm-up: imports, caches, lazy initialisation
+    samples = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(number):
+            fn()
+        samples.append((time.perf_counter() - started) / number)
+    return {
+        'min': min(samples),
+        'median': statistics.median(samples),
+        'mean': statistics.fmean(samples),
+        'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+        'repeat': repeat,
+        'number': number,
+    }
+
+def _sample_questions():
+    from models.data_models import Question
+    return [
+        Question(1, 'Explain the difference between an array and a linked list.', 'Technical', 'Medium'),
+        Question(2, 'What is Big O notation?', 'Technical', 'Easy'),
+        Question(3, 'Walk me through debugging a slow web page.', 'Problem-Solving', 'Medium'),
+        Question(4, 'Design a basic real-time chat application.', 'Problem-Solving', 'Hard'),
+        Question(5, 'Describe a challenging project you worked on.', 'Behavioral', 'Medium'),
+        Question(6, 'SQL vs NoSQL: when would you use each?', 'Technical', 'Easy'),
+    ]
+
+def _sample_responses(count: int, answer_words: int = 120):
+    from models.data_models import Response
+    questions = _sample_questions()
+    answer = ' '.join(['the candidate explains the trade-offs with an example'] * (answer_words // 8))
+    return [
+        Response(
+            question_id=i + 1,
+            question=questions[i % 6].text,
+            category=questions[i % 6].category,
+            answer=f'{answer} #{i}',
+            time_taken=30.0 + (i % 150)
+        )
+        for i in range(count)
+    ]
+
+def _interviewer(payloads: Optional[Dict[str, str]] = None):
+    from services.ai_service import AIInterviewer
+    from services.llm_backend import LatencyModel, SimulatedBackend
+    backend = SimulatedBackend(latency=LatencyModel(median=0.0), seed=0)
+    if payloads:
+        backend.payloads.update(payloads)
+    return AIInterviewer(None, backend=backend)
+
+def bench_construction(repeat: int, number: int) -> Dict[str, Dict]:
+    from services.ai_service import AIInterviewer
+    from services.llm_backend import LatencyModel, SimulatedBackend
+    from services.model_cache import hash_api_key, store_model
+
+    backend = SimulatedBackend(latency=LatencyModel(median=0.0))
+    # Steady-state Gemini rerun: the model is already in the process-wide cache
+    store_model(hash_api_key('bench-key'), 'gemini-bench', object())
+    return {
+        'construct.simulated_backend': measure(lambda: AIInterviewer(None, backend=backend), repeat, number),
+        'construct.gemini_cache_hit': measure(lambda: AIInterviewer('bench-key'), repeat, number),
+    }
+
+def bench_parsing(repeat: int, number: int) -> Dict[str, Dict]:
+    from services.llm_backend import _default_payloads
+    questions_json = _default_payloads()['questions']
+    evaluation_json = _default_payloads()['evaluation']
+
+    question_payloads = {
+        'clean': questions_json,
+        'fenced': f'```json\n{questions_json}\n```',
+        'chatter': f'Sure! Here are your questions:\n{questions_json}\nGood luck!',
+        'truncated': questions_json[:len(questions_json) * 2 // 3],
+        'malformed': questions_json.replace('",', '"', 3),
+    }
+    evaluation_payloads = {
+        'clean': evaluation_json,
+        'fenced': f'```json\n{evaluation_json}\n```',
+        'malformed': evaluation_json.replace('",', '"', 2),
+    }
+
+    results = {}
+    for name, payload in question_payloads.items():
+        interviewer = _interviewer({'questions': payload})
+        results[f'parse.generate_questions.{name}'] = measure(
+            lambda i=interviewer: i.generate_questions('Python, React'), repeat, number
+        )
+
+    responses = _sample_responses(6)
+    for name, payload in evaluation_payloads.items():
+        interviewer = _interviewer({'evaluation': payload})
+        results[f'parse.evaluate_responses.{name}'] = measure(
+            lambda i=interviewer: i.evaluate_responses(responses, use_cache=False), repeat, number
+        )
+    return results
+
+def bench_basic_evaluation(repeat: int, number: int) -> Dict[str, Dict]:
+    interviewer = _interviewer()
+    results = {}
+    for count in (6, 1_000, 100_000):
+        responses = _sample_responses(count, answer_words=40)
+        results[f'basic_evaluation.{count}'] = measure(
+            lambda r=responses: interviewer._basic_evaluation(r), repeat, max(1, number // max(1, count // 1000))
+        )
+    return results
+
+def bench_report(repeat: int, number: int) -> Dict[str, Dict]:
+    import streamlit as st
+    from services.llm_backend import _default_payloads
+    from utils.report_utils import generate_report
+
+    st.session_state.candidate_name = 'Benchmark Candidate'
+    evaluation = json.loads(_default_payloads()['evaluation'])
+    results = {}
+    for count in (6, 500):
+        responses = _sample_responses(count, answer_words=400)
+        results[f'report.generate_report.{count}'] = measure(
+            lambda r=responses: generate_report(evaluation, r), repeat, number
+        )
+    return results
+
+def bench_analytics(repeat: int, number: int) -> Dict[str, Dict]:
+    """Dashboard refresh over 100k synthetic interviews (six answers each)"""
+    import random
+    from services import analytics
+    from services.session_store import question_key
+
+    rng = random.Random(0)
+    questions = _sample_questions() * 50
+    bank = [(question_key(f'{q.text} #{i}'), f'{q.text} #{i}', str(q.category), str(q.difficulty))
+            for i, q in enumerate(questions)]
+    evaluation_rows, answer_rows = [], []
+    for i in range(100_000):
+        sid = f'bench-{i}'
+        evaluation_rows.append((sid, *(rng.uniform(40, 95) for _ in range(5)),
+                                rng.choice(('Strong Hire', 'Hire', 'No Hire')), 1.7e9 + i * 60))
+        for key, text, category, difficulty in rng.sample(bank, 6):
+            answer_rows.append((sid, key, text, category, difficulty, rng.uniform(30, 100), rng.uniform(10, 180)))
+    dataset = analytics.build_dataset(evaluation_rows, answer_rows)
+
+    def refresh():
+        analytics.score_percentiles(dataset)
+        analytics.answer_percentiles(dataset, by='category')
+        analytics.answer_percentiles(dataset, by='difficulty', value='time_taken')
+        analytics.question_calibration(dataset)
+        analytics.cohort_comparison(dataset)
+
+    return {
+        'analytics.build_dataset.100k': measure(
+            lambda: analytics.build_dataset(evaluation_rows, answer_rows), repeat, 1
+        ),
+        'analytics.refresh.100k': measure(refresh, repeat, max(1, number // 10)),
+    }
+
+def bench_reruns(repeat: int, number: int) -> Dict[str, Dict]:
+    from streamlit.testing.v1 import AppTest
+
+    questions = _sample_questions()
+    responses = _sample_responses(6)
+    phases = {
+        'setup': {},
+        'interview': {
+            'questions': questions, 'current_question': 2,
+            'start_time': time.time(), 'question_start_time': time.time(),
+        },
+        'results': {
+            'questions': questions, 'responses': responses, 'current_question': 6,
+            'candidate_name': 'Benchmark Candidate',
+        },
+    }
+
+    results = {}
+    for phase, state in phases.items():
+        app = AppTest.from_file(os.path.join(APP_DIR, 'main.py'), default_timeout=60)
+        app.session_state['phase'] = phase
+        for key, value in state.items():
+            app.session_state[key] = value
+
+        def rerun(app=app):
+            app.run()
+            if app.exception:
+                raise RuntimeError(app.exception[0].value)
+
+        results[f'rerun.main.{phase}'] = measure(rerun, repeat, max(1, number // 10))
+    return results
+
+def bench_imports(repeat: int, number: int) -> Dict[str, Dict]:
+    """Cold-process import cost of the app, with and without the Gemini SDK"""
+    def cold_import(statement: str):
+        subprocess.run([sys.executable, '-W', 'ignore', '-c', statement], cwd=APP_DIR, check=True,
+                       stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+
+    return {
+        'import.interpreter': measure(lambda: cold_import('pass'), repeat, 1),
+        'import.main': measure(lambda: cold_import('import main'), repeat, 1),
+        'import.main_with_sdk': measure(lambda: cold_import('import main, google.generativeai'), repeat, 1),
+    }
+
+SUITES = {
+    'imports': bench_imports,
+    'construction': bench_construction,
+    'parsing': bench_parsing,
+    'basic_evaluation': bench_basic_evaluation,
+    'report': bench_report,
+    'analytics': bench_analytics,
+    'reruns': bench_reruns,
+}
+
+def git_commit() -> str:
+    try:
+        return subprocess.check_output(['git', 'rev-parse', '--short', 'HEAD'], cwd=APP_DIR,
+                                       stderr=subprocess.DEVNULL, text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown'
+
+def compare(current: Dict[str, Dict], baseline_path: str, threshold: float) -> List[str]:
+    """Print median ratios against an earlier run; return benchmarks slower than ``threshold``"""
+    with open(baseline_path, encoding='utf-8') as f:
+        baseline = json.load(f)['results']
+
+    regressions = []
+    print(f"\n{'benchmark':<45} {'baseline':>12} {'current':>12} {'ratio':>8}")
+    for name, result in sorted(current.items()):
+        if name not in baseline:
+            continue
+        old, new = baseline[name]['median'], result['median']
+        ratio = new / old if old else float('inf')
+        flag = '  <-- slower' if ratio > 1 + threshold else ''
+        if flag:
+            regressions.append(name)
+        print(f'{name:<45} {old * 1e3:>10.3f}ms {new * 1e3:>10.3f}ms {ratio:>7.2f}x{flag}')
+    return regressions
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Benchmark AIInterviewer hot paths against a stubbed LLM')
+    parser.add_argument('--output', help='Result JSON path (default: benchmarks/results/<commit>.json)')
+    parser.add_argument('--compare', help='Earlier result JSON to compare medians against')
+    parser.add_argument('--threshold', type=float, default=0.10, help='Relative slowdown flagged as a regression')
+    parser.add_argument('--filter', default='', help='Only run suites whose name contains this text')
+    parser.add_argument('--quick', action='store_true', help='Fewer repetitions, for smoke runs')
+    args = parser.parse_args(argv)
+
+    # AIInterviewer reports through Streamlit, which only logs warnings outside a session
+    logging.disable(logging.WARNING)
+    repeat, number = (3, 5) if args.quick else (7, 50)
+
+    results: Dict[str, Dict] = {}
+    for suite_name, suite in SUITES.items():
+        if args.filter and args.filter not in suite_name:
+            continue
+        started = time.perf_counter()
+        results.update(suite(repeat, number))
+        print(f'{suite_name}: done in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+
+    for name, result in sorted(results.items()):
+        print(f"{name:<45} median {result['median'] * 1e3:>10.3f}ms  min {result['min'] * 1e3:>10.3f}ms")
+
+    commit = git_commit()
+    output = args.output or os.path.join(RESULTS_DIR, f'{commit}.json')
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump({
+            'meta': {
+                'commit': commit,
+                'timestamp': datetime.now(timezone.utc).isoformat(),
+                'python': platform.python_version(),
+                'platform': platform.platform(),
+                'repeat': repeat,
+                'number': number,
+            },
+            'results': results,
+        }, f, indent=2, sort_keys=True)
+    print(f'\nSaved {len(results)} results to {output}')
+
+    if args.compare:
+        regressions = compare(results, args.compare, args.threshold)
+        if regressions:
+            print(f'\n{len(regressions)} regression(s) above {args.threshold:.0%}')
+            return 1
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,42 @@
+"""Export stored interview reports into one zip archive without the Streamlit UI"""
+# Reports are read from the session store in batches and compressed straight into the archive, so
+# memory use stays flat however many interviews are exported.
+# Usage:
+#     python export_reports.py week.zip --days 7 --format html
+#     python export_reports.py - --since 2025-09-01 --until 2025-09-08 > september.zip
+import argparse
+import sys
+import time
+from datetime import datetime
+from services.session_store import get_session_store
+from utils.report_utils import REPORT_FORMATS, write_reports_zip
+
+def _timestamp(value: str) -> float:
+    return datetime.strptime(value, '%Y-%m-%d').timestamp()
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='Export stored interview reports to a zip archive')
+    parser.add_argument('output', help='Zip file to write, or - for stdout')
+    parser.add_argument('--format', choices=list(REPORT_FORMATS), default='text', help='Report format')
+    parser.add_argument('--days', type=float, help='Only interviews completed in the last N days')
+    parser.add_argument('--since', type=_timestamp, help='Only interviews completed on or after YYYY-MM-DD')
+    parser.add_argument('--until', type=_timestamp, help='Only interviews completed before YYYY-MM-DD')
+    args = parser.parse_args(argv)
+
+    since = args.since
+    if args.days is not None:
+        since = max(since or 0.0, time.time() - args.days * 86400)
+
+    reports = get_session_store().iter_reports(since=since, until=args.until)
+    started = time.perf_counter()
+    if args.output == '-':
+        count = write_reports_zip(sys.stdout.buffer, reports, args.format)
+    else:
+        with open(args.output, 'wb') as f:
+            count = write_reports_zip(f, reports, args.format)
+
+    print(f'Exported {count} reports in {time.perf_counter() - started:.1f}s', file=sys.stderr)
+    return 0
+
+if __name__ == '__main__':
+    sys.exit(main())
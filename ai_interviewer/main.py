@@ -1,8 +1,14 @@
 import streamlit as st
 from services.ai_service import AIInterviewer
+from services.hedging import hedge_policy_from_env
+from services.llm_backend import backend_from_env
+from services.telemetry import RERUN_SECONDS, span, start_telemetry
+from services.warmup import start_warmup, warmup_enabled
 from ui.setup_phase import show_setup_phase
 from ui.interview_phase import show_interview_phase
 from ui.results_phase import show_results_phase
+from ui.analytics_phase import show_admin_page
+from utils.api_client import RemoteInterviewer, api_url_from_env
 from utils.session_utils import initialize_session_state, test_api_connection
 
 st.set_page_config(
@@ -13,6 +19,22 @@ st.set_page_config(
 
 def main():
     """Main application function"""
+    # Streamlit has no server-start hook: the first script run in the process kicks these off
+    start_telemetry()
+    if warmup_enabled():
+        start_warmup()
+    
+    # One span per script run; st.rerun() inside it ends the span as "aborted"
+    with span('streamlit.rerun', RERUN_SECONDS, phase=st.session_state.get('phase', 'setup')):
+        render_app()
+
+def render_app():
+    """Sidebar plus the page for the current phase"""
+    # Operators open ?page=admin: password-gated, and never linked from the candidate flow
+    if st.query_params.get('page') == 'admin':
+        show_admin_page()
+        return
+    
     initialize_session_state()
     
     with st.sidebar:
@@ -69,20 +91,37 @@ def main():
             elif st.session_state.phase == 'results':
                 st.success("Interview Complete!")
     
-    if not api_key:
+    # AI_INTERVIEWER_API_URL hands every model call to a shared interview API server
+    api_url = api_url_from_env()
+    if api_url is not None:
+        try:
+            interviewer = RemoteInterviewer(api_url)
+        except Exception as e:
+            st.error(f"Interview API at {api_url} is not reachable: {e}")
+            return
+        show_phase(interviewer)
+        return
+    
+    # AI_INTERVIEWER_BACKEND=simulated runs the app offline against canned responses
+    backend = backend_from_env()
+    if not api_key and backend is None:
         st.error("Please configure your Gemini API key in the sidebar to continue.")
         return
     
     try:
-        interviewer = AIInterviewer(api_key)
+        interviewer = AIInterviewer(api_key, backend=backend, hedge_policy=hedge_policy_from_env())
     except Exception as e:
         st.error(f"Error initializing AI Interviewer: {e}")
         return
     
+    show_phase(interviewer)
+
+def show_phase(interviewer):
+    """Page for the current phase"""
     if st.session_state.phase == 'setup':
         show_setup_phase(interviewer)
     elif st.session_state.phase == 'interview':
-        show_interview_phase()
+        show_interview_phase(interviewer)
     elif st.session_state.phase == 'results':
         show_results_phase(interviewer)
 
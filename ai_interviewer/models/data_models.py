@@ -1,17 +1,169 @@
+import sys
+from array import array
 from dataclasses import dataclass
-from typing import List, Dict
+from enum import Enum
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+
+class _InternedEnum(str, Enum):
+    """String enum whose members compare, hash, print and JSON-encode as their plain value"""
+
+    __str__ = str.__str__
+
+    @classmethod
+    def coerce(cls, value) -> Union['_InternedEnum', str]:
+        """The shared member for a known value; anything else is kept as an interned string"""
+        if isinstance(value, cls):
+            return value
+        try:
+            return cls(value)
+        except ValueError:
+            return sys.intern(str(value))
+
+
+class Category(_InternedEnum):
+    TECHNICAL = 'Technical'
+    PROBLEM_SOLVING = 'Problem-Solving'
+    BEHAVIORAL = 'Behavioral'
+
+
+class Difficulty(_InternedEnum):
+    EASY = 'Easy'
+    MEDIUM = 'Medium'
+    HARD = 'Hard'
+
 
 @dataclass
 class Question:
+    __slots__ = ('id', 'text', 'category', 'difficulty')
+
     id: int
     text: str
     category: str
     difficulty: str
 
+    def __post_init__(self):
+        self.category = Category.coerce(self.category)
+        self.difficulty = Difficulty.coerce(self.difficulty)
+
+
+@dataclass
+class QuestionReference:
+    """What a strong answer to a question says and the key concepts it should cover"""
+    __slots__ = ('answer', 'key_concepts')
+
+    answer: str
+    key_concepts: Tuple[str, ...]
+
+
 @dataclass
 class Response:
+    __slots__ = ('question_id', 'question', 'category', 'answer', 'time_taken')
+
     question_id: int
     question: str
     category: str
     answer: str
-    time_taken: float
\ No newline at end of file
+    time_taken: float
+
+    def __post_init__(self):
+        self.category = Category.coerce(self.category)
+
+
+# Recorded in place of an empty answer; both forms score zero
+NO_ANSWER = 'No response provided'
+TIMED_OUT_ANSWER = f'{NO_ANSWER} (time expired)'
+
+
+def is_no_answer(answer: str) -> bool:
+    """Whether an answer is one of the placeholders recorded for an empty submission"""
+    return answer.startswith(NO_ANSWER)
+
+
+class ResponseLog:
+    """One interview's answers, stored column-wise and indexed by question_id.
+
+    Holds at most one answer per question: ``upsert`` replaces the answer to a question
+    already in the log in O(1), as when a candidate goes back and answers again. It is
+    not a store for answers from several interviews, whose question ids would collide.
+    Question text sits in a side table keyed by question id and categories are small
+    codes, so the per-answer columns are fixed-width arrays. Behaves like a list of
+    Response for reading (len, iteration, indexing).
+    """
+
+    def __init__(self, responses=()):
+        self._row_of: Dict[int, int] = {}
+        self._question_ids = array('q')
+        self._category_codes = array('H')
+        self._time_taken = array('d')
+        self._answers: List[str] = []
+        self._categories: List[str] = []
+        self._category_code_of: Dict[str, int] = {}
+        self._question_text: Dict[int, str] = {}
+        for response in responses:
+            self.upsert(response)
+
+    def upsert(self, response: Response) -> None:
+        """Add an answer, or replace the earlier answer to the same question in place"""
+        code = self._category_code(response.category)
+        self._question_text[response.question_id] = response.question
+        row = self._row_of.get(response.question_id)
+        if row is None:
+            self._row_of[response.question_id] = len(self._answers)
+            self._question_ids.append(response.question_id)
+            self._category_codes.append(code)
+            self._time_taken.append(response.time_taken)
+            self._answers.append(response.answer)
+        else:
+            self._category_codes[row] = code
+            self._time_taken[row] = response.time_taken
+            self._answers[row] = response.answer
+
+    def get(self, question_id: int) -> Optional[Response]:
+        row = self._row_of.get(question_id)
+        return None if row is None else self[row]
+
+    def __contains__(self, question_id) -> bool:
+        return question_id in self._row_of
+
+    def __len__(self) -> int:
+        return len(self._answers)
+
+    def __getitem__(self, row: int) -> Response:
+        question_id = self._question_ids[row]
+        return Response(
+            question_id=question_id,
+            question=self._question_text[question_id],
+            category=self._categories[self._category_codes[row]],
+            answer=self._answers[row],
+            time_taken=self._time_taken[row]
+        )
+
+    def __iter__(self) -> Iterator[Response]:
+        for row in range(len(self)):
+            yield self[row]
+
+    def __eq__(self, other) -> bool:
+        if isinstance(other, (ResponseLog, list)):
+            return list(self) == list(other)
+        return NotImplemented
+
+    def __repr__(self) -> str:
+        return f"ResponseLog({list(self)!r})"
+
+    @property
+    def time_taken(self) -> array:
+        """Per-answer durations in seconds, in answer order, without building Response objects"""
+        return self._time_taken
+
+    def total_time(self) -> float:
+        return sum(self._time_taken)
+
+    def _category_code(self, category) -> int:
+        category = Category.coerce(category)
+        code = self._category_code_of.get(category)
+        if code is None:
+            code = len(self._categories)
+            self._categories.append(category)
+            self._category_code_of[category] = code
+        return code
@@ -1,227 +1,181 @@
-import google.generativeai as genai
+import asyncio
 import json
+import time
 import streamlit as st
-from typing import List, Dict
-from models.data_models import Question, Response
+from typing import Iterator, List, Dict, Optional, Tuple
+from models.data_models import NO_ANSWER, Question, Response
+from services.context_cache import get_prompt_cache
+from services.evaluation_cache import get_evaluation_cache
+from services.event_loop import run_coroutine
+from services.hedging import HedgePolicy, hedged_race
+from services.llm_backend import GeminiBackend, GenerationSettings, LLMBackend, LLMResponse
+from services.model_cache import (
+    get_cached_model, hash_api_key, invalidate_model, is_model_unavailable_error, store_model
+)
+from services.model_resolver import MODEL_PREFERENCE, ModelResolutionError, ModelResolver, probe_model
+from services.model_router import available_model_names, get_model_router
+from services.prompt_builder import TRANSCRIPT_PLACEHOLDER, PromptBuilder, PromptStats
+from services.question_bank import get_question_bank
+from services.rate_limiter import call_with_backoff, call_with_backoff_async, estimate_tokens, get_rate_limiter
+from services.rubric_scorer import get_rubric_scorer
+from services.telemetry import LLM_REQUEST_SECONDS, LLM_RETRIES, record_fallback, record_tokens, span
+from services.structured_output import (
+    EVALUATION, EVALUATION_SCORE_KEYS, QUESTION_SET, OutputSpec, StructuredOutputError, fix_question, json_settings,
+    parse_structured, question_references, record_outcome, repair_prompt, repair_settings
+)
+from utils.json_stream import JSONArrayStreamParser
 
-class AIInterviewer:
-    def __init__(self, api_key: str):
-        genai.configure(api_key=api_key)
-        
-        # Updated model names based on current Gemini API documentation (September 2025)
-        model_names = [
-            # Latest and most capable models
-            'gemini-2.5-pro',                    # Most powerful thinking model
-            'gemini-2.5-flash',                  # Best price-performance model
-            'gemini-2.5-flash-lite',             # Cost-efficient model
-            
-            # Gemini 2.0 models  
-            'gemini-2.0-flash',                  # Next-gen features
-            'gemini-2.0-flash-lite',             # Cost-efficient 2.0
-            
-            # Gemini 1.5 models (deprecated but still available)
-            'gemini-1.5-flash',                  # Fast and versatile
-            'gemini-1.5-flash-8b',               # Smaller model (deprecated)
-            'gemini-1.5-pro',                    # Advanced reasoning (deprecated)
-            
-            # Alternative naming patterns (with models/ prefix)
-            'models/gemini-2.5-pro',
-            'models/gemini-2.5-flash', 
-            'models/gemini-2.5-flash-lite',
-            'models/gemini-2.0-flash',
-            'models/gemini-2.0-flash-lite',
-            'models/gemini-1.5-flash',
-            'models/gemini-1.5-flash-8b',
-            'models/gemini-1.5-pro'
-        ]
-        
-        self.model = None
-        self.model_name = None
-        last_error = None
-        
-        # Try models in order of preference (newest/best first)
-        for model_name in model_names:
-            try:
-                st.info(f"🔄 Trying model: {model_name}")
-                self.model = genai.GenerativeModel(model_name)
-                
-                # Test with a simple request
-                test_response = self.model.generate_content(
-                    "Respond with 'OK' if you can see this message.", 
-                    generation_config=genai.types.GenerationConfig(
-                        max_output_tokens=10,
-                        temperature=0.1
-                    ),
-                    request_options={'timeout': 15}  # Increased timeout
-                )
-                
-                if test_response and test_response.text:
-                    self.model_name = model_name
-                    st.success(f"✅ Successfully connected with: {model_name}")
-                    break
-                else:
-                    st.warning(f"⚠️ Empty response from: {model_name}")
-                    continue
-                    
-            except Exception as e:
-                last_error = e
-                st.warning(f"❌ Failed with {model_name}: {str(e)[:100]}...")
-                continue
-        
-        if self.model is None:
-            error_msg = f"No working Gemini model found. Last error: {last_error}"
-            st.error(error_msg)
-            raise Exception(error_msg)
-        
-        print(f"Successfully initialized with model: {self.model_name}")
-    
-    def generate_questions(self, candidate_background: str = "") -> List[Question]:
-        """Generate personalized interview questions using Gemini"""
-        prompt = f"""
+# Category mix of every question set: 3 Technical, 2 Problem-Solving, 1 Behavioral
+QUESTION_MIX = {'Technical': 3, 'Problem-Solving': 2, 'Behavioral': 1}
+
+# Difficulty mix of every question set: 2 Easy, 3 Medium, 1 Hard
+DIFFICULTY_MIX = {'Easy': 2, 'Medium': 3, 'Hard': 1}
+
+# Per-answer score fields feeding each category score of the final evaluation
+CATEGORY_SCORE_KEYS = {
+    'Technical': 'technical_score',
+    'Problem-Solving': 'problem_solving_score',
+    'Behavioral': 'behavioral_score'
+}
+
+# Bump whenever the evaluation prompt changes so cached evaluations are not reused
+EVALUATION_PROMPT_VERSION = "4"
+
+# Models tried per call: the fastest suitable one, then the next if it fails
+MAX_ROUTED_ATTEMPTS = 2
+
+# Longest one question set, evaluation or answer score may take in all: rate-limit
+# queueing, retries, the fallback model and a repair request share this budget
+CALL_DEADLINE_SECONDS = 90.0
+
+# Prompt token budgets; longer transcripts have their longest answers shortened
+EVALUATION_TOKEN_BUDGET = 8000
+SCORING_TOKEN_BUDGET = 2000
+
+# Fixed leading parts of the question and evaluation prompts. Sent as each request's
+# static_prefix, so they can live in server-side cached content; only what follows
+# (candidate background, transcript) changes between requests.
+QUESTION_REQUIREMENTS = """
         Generate exactly 6 interview questions for a Software Development Engineer Intern position.
         
-        Candidate background: {candidate_background}
-        
         Requirements:
         - 3 Technical questions (data structures, algorithms, programming concepts)
         - 2 Problem-solving questions (debugging, system design, analytical thinking)
         - 1 Behavioral question (experience, motivation, challenges)
         - Questions should be intern-level appropriate
         - Mix of Easy (2), Medium (3), Hard (1) difficulty
+        - Tailor the questions to the candidate background given at the end
+        - For each question, a 2-3 sentence reference answer a strong intern would give
+          and the 3-6 key concepts (short phrases) a good answer must mention
+        
+        Question guidelines:
+        - Technical: arrays, linked lists, stacks, queues, hash tables, trees, graphs, sorting,
+          searching, recursion, time and space complexity, object-oriented design, memory,
+          concurrency basics, databases, networking basics. Prefer concepts the candidate can
+          explain in a few minutes without writing code; ask about trade-offs, not trivia.
+        - Problem-solving: debugging a described failure, designing a small system or feature,
+          estimating scale, breaking a vague task into steps. State the constraints (users, data
+          size, latency) so the candidate has something concrete to reason about.
+        - Behavioral: one question about a real project, team situation, setback or decision,
+          answerable from coursework, internships or personal projects.
+        - Each question is one or two sentences, self-contained and answerable in about three
+          minutes of typing. Do not combine several unrelated questions into one.
+        - Easy questions check a definition or a single trade-off; Medium questions need an
+          explanation with an example; the Hard question needs a design or multi-step analysis.
+        - Use the candidate background to choose topics and examples (languages, frameworks,
+          projects they mention), but keep every question fair to any intern-level candidate.
+          If the background is empty or generic, ask broadly applicable questions.
+        - No two questions may test the same concept.
+        
+        Examples of the expected level (do not reuse them):
+        - Easy, Technical: "When would you use a hash table instead of a sorted array, and what
+          do you give up?"
+        - Medium, Technical: "Explain how recursion uses the call stack, using factorial as an
+          example. What happens if the base case is missing?"
+        - Medium, Problem-Solving: "Users report that a web page sometimes shows stale data after
+          they save a form. How would you find the cause?"
+        - Hard, Problem-Solving: "Design a URL shortener for 10 million links and 1,000 requests
+          per second. What are the main components and how do they scale?"
+        - Medium, Behavioral: "Tell me about a time you had to learn a new technology quickly to
+          finish a project. How did you approach it?"
+        
+        Reference answers and key concepts:
+        - The reference answer is what a strong intern would say, in plain prose: correct,
+          specific and concise. It is used to grade answers, so it must be accurate.
+        - Key concepts are the ideas a grader should look for, as short noun phrases of one to
+          four words (for example "O(1) lookup", "hash collision", "base case"). Order them from
+          most to least important. For the behavioral question, use the parts of a complete
+          answer (for example "specific situation", "own actions", "measurable result",
+          "lesson learned").
+        
+        Field values:
+        - "id": 1 to 6, in the order the questions should be asked
+        - "category": exactly one of "Technical", "Problem-Solving", "Behavioral"
+        - "difficulty": exactly one of "Easy", "Medium", "Hard"
+        - Order the questions from easiest to hardest, with the behavioral question fifth
         
         Return ONLY a valid JSON array with this exact structure:
         [
-            {{
+            {
                 "id": 1,
                 "text": "Question text here",
                 "category": "Technical",
-                "difficulty": "Easy"
-            }},
-            {{
+                "difficulty": "Easy",
+                "reference_answer": "What a strong answer says",
+                "key_concepts": ["concept one", "concept two", "concept three"]
+            },
+            {
                 "id": 2,
-                "text": "Question text here", 
+                "text": "Question text here",
                 "category": "Technical",
-                "difficulty": "Medium"
-            }}
+                "difficulty": "Easy",
+                "reference_answer": "What a strong answer says",
+                "key_concepts": ["concept one", "concept two", "concept three"]
+            },
+            {
+                "id": 3,
+                "text": "Question text here",
+                "category": "Technical",
+                "difficulty": "Medium",
+                "reference_answer": "What a strong answer says",
+                "key_concepts": ["concept one", "concept two", "concept three"]
+            },
+            {
+                "id": 4,
+                "text": "Question text here",
+                "category": "Problem-Solving",
+                "difficulty": "Medium",
+                "reference_answer": "What a strong answer says",
+                "key_concepts": ["concept one", "concept two", "concept three"]
+            },
+            {
+                "id": 5,
+                "text": "Question text here",
+                "category": "Behavioral",
+                "difficulty": "Medium",
+                "reference_answer": "What a strong answer says",
+                "key_concepts": ["concept one", "concept two", "concept three"]
+            },
+            {
+                "id": 6,
+                "text": "Question text here",
+                "category": "Problem-Solving",
+                "difficulty": "Hard",
+                "reference_answer": "What a strong answer says",
+                "key_concepts": ["concept one", "concept two", "concept three"]
+            }
         ]
         
         Do not include any other text, explanations, or markdown formatting.
         """
-        
-        try:
-            generation_config = genai.types.GenerationConfig(
-                temperature=0.7,
-                max_output_tokens=2500,  # Increased for better responses
-                top_p=0.9
-            )
-            
-            response = self.model.generate_content(
-                prompt,
-                generation_config=generation_config,
-                request_options={'timeout': 45}  # Increased timeout
-            )
-            
-            if not response or not response.text:
-                st.warning("Empty response from AI. Using fallback questions.")
-                return self._get_fallback_questions()
-            
-            response_text = response.text.strip()
-            
-            # Clean up response text - remove markdown formatting
-            if response_text.startswith('```json'):
-                response_text = response_text[7:-3]
-            elif response_text.startswith('```'):
-                response_text = response_text[3:-3]
-            
-            # Find JSON array boundaries
-            start_idx = response_text.find('[')
-            end_idx = response_text.rfind(']') + 1
-            
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = response_text[start_idx:end_idx]
-                
-                try:
-                    questions_data = json.loads(json_str)
-                except json.JSONDecodeError as je:
-                    st.error(f"JSON parsing error: {je}")
-                    st.error(f"Raw response: {response_text[:500]}...")
-                    return self._get_fallback_questions()
-                
-                if not isinstance(questions_data, list):
-                    st.warning("AI response is not a JSON array. Using fallback questions.")
-                    return self._get_fallback_questions()
-                
-                if len(questions_data) < 6:
-                    st.warning(f"AI generated only {len(questions_data)} questions instead of 6. Using fallback questions.")
-                    return self._get_fallback_questions()
-                
-                questions = []
-                for i, q_data in enumerate(questions_data[:6]):
-                    if not isinstance(q_data, dict):
-                        st.warning("Invalid question format in AI response. Using fallback questions.")
-                        return self._get_fallback_questions()
-                        
-                    question = Question(
-                        id=i + 1,
-                        text=q_data.get('text', '').strip(),
-                        category=q_data.get('category', 'Technical'),
-                        difficulty=q_data.get('difficulty', 'Medium')
-                    )
-                    
-                    if question.text:
-                        questions.append(question)
-                
-                if len(questions) >= 6:
-                    st.success(f"Generated {len(questions)} personalized questions!")
-                    return questions[:6]
-                else:
-                    st.warning("AI generated incomplete questions. Using fallback questions.")
-                    return self._get_fallback_questions()
-            else:
-                st.warning("Could not find JSON array in AI response. Using fallback questions.")
-                st.error(f"Raw response: {response_text[:500]}...")
-                return self._get_fallback_questions()
-                
-        except Exception as e:
-            st.error(f"Error generating questions: {e}")
-            return self._get_fallback_questions()
-    
-    def _get_fallback_questions(self) -> List[Question]:
-        """High-quality fallback questions if AI generation fails"""
-        return [
-            Question(1, "Explain the difference between an array and a linked list. When would you use each data structure?", "Technical", "Medium"),
-            Question(2, "What is time complexity (Big O notation)? Calculate the time complexity of searching through a 2D array using nested loops.", "Technical", "Easy"),
-            Question(3, "You're debugging a web application that takes 30 seconds to load. Walk me through your debugging process step by step.", "Problem-Solving", "Medium"),
-            Question(4, "Design a basic real-time chat application. What main components and technologies would you need? Consider scalability for 1000+ users.", "Problem-Solving", "Hard"),
-            Question(5, "Describe a challenging coding project you worked on. What obstacles did you face and how did you overcome them?", "Behavioral", "Medium"),
-            Question(6, "What's the difference between SQL and NoSQL databases? Give an example of when you'd use each.", "Technical", "Easy")
-        ]
-    
-    def evaluate_responses(self, responses: List[Response]) -> Dict:
-        """Evaluate all responses and generate comprehensive feedback"""
-        
-        if not responses:
-            return self._basic_evaluation([])
-        
-        responses_text = ""
-        for i, r in enumerate(responses, 1):
-            responses_text += f"""
-Question {i}: {r.question} 
-Category: {r.category}
-Answer: {r.answer}
-Time taken: {r.time_taken:.1f} seconds
----
-"""
-        
-        prompt = f"""
-        Evaluate this SDE intern interview based on the following responses:
-        
-        {responses_text}
+
+EVALUATION_RUBRIC = f"""
+        Evaluate this SDE intern interview based on the candidate responses given at the end.
         
         Provide evaluation in this EXACT JSON format (no additional text):
         {{
             "technical_score": 75,
-            "communication_score": 80, 
+            "communication_score": 80,
             "problem_solving_score": 70,
             "behavioral_score": 85,
             "overall_score": 78,
@@ -237,106 +191,861 @@ Time taken: {r.time_taken:.1f} seconds
         - Problem-solving: Logical approach, creativity, systematic methodology
         - Behavioral: Relevant examples, self-awareness, cultural fit, growth mindset
         
+        Score bands, for each of the four scores:
+        - 90-100: Correct and complete, with depth beyond what the question asked (trade-offs,
+          edge cases, complexity, a concrete example). Would impress an experienced engineer.
+        - 75-89: Correct and covers the main points with sound reasoning; minor gaps or some
+          imprecise terminology.
+        - 60-74: Mostly correct but shallow; misses one important point or needs an example.
+        - 40-59: Partly correct; significant gaps, confusion between related concepts, or an
+          approach that would not work without major changes.
+        - 1-39: Largely incorrect, off topic, or too brief to show understanding.
+        - 0: No answer. Answers recorded as "{NO_ANSWER}" (with or without a note that time
+          expired) score 0 and count toward the category they belong to.
+        
+        What to look for:
+        - Technical answers: correct definitions, correct complexity claims, the right data
+          structure or algorithm for the situation, and awareness of trade-offs. Do not reward
+          length or buzzwords on their own; a short, correct answer beats a long, vague one.
+        - Problem-solving answers: a clear sequence of steps, stated assumptions, how the
+          candidate would verify the result, and how the design handles growth and failure.
+        - Behavioral answers: a specific situation, what the candidate personally did, the
+          outcome, and what they learned. Generic statements about teamwork score low.
+        - Communication: judged across all answers. Reward structure, precise wording and
+          examples; do not penalize informal tone, typos or non-native English.
+        
+        Calibration examples (question, answer, score):
+        - "What is the difference between an array and a linked list?" / "Arrays store elements
+          next to each other in memory, so reading index i is O(1), but inserting in the middle
+          shifts everything, O(n). Linked lists insert in O(1) once you hold the node, but
+          finding it takes O(n), and they use extra memory for pointers." / 85: correct, covers
+          access, insertion and memory, but no example of when to prefer each.
+        - Same question / "An array is a list and a linked list is linked. Linked lists are
+          faster." / 25: no correct distinction, and an unqualified, wrong performance claim.
+        - "How would you debug a page that loads slowly?" / "Reproduce it, look at the network
+          tab and a profiler to see where the time goes, fix the slowest part first (often a
+          database query missing an index or an uncached call), then measure again." / 80:
+          systematic and verifiable, but no mention of monitoring or of checking whether the
+          slowness depends on data size.
+        - "Tell me about a challenging project." / "I built a scheduling app for my club. Two
+          members edited the same event and one change was lost, so I added version numbers and
+          rejected stale updates. I learned to think about concurrent users early." / 82:
+          specific situation, own actions, outcome and lesson, though the result is not
+          quantified.
+        
+        Computing the scores:
+        - technical_score, problem_solving_score and behavioral_score are the average score of
+          the answers in that category. If a category has no answers, use the average of all
+          answers.
+        - overall_score is (3 x the average score of all answers + communication_score) / 4,
+          rounded to a whole number.
+        - All scores are whole numbers from 0 to 100.
+        
         Recommendation options: "Strong Hire", "Hire", "Conditional Hire", "Hold", "No Hire"
+        Choose by overall_score: 85 and above "Strong Hire", 70-84 "Hire", 55-69 "Conditional Hire",
+        40-54 "Hold", below 40 "No Hire". Move one step down if any technical answer contains a
+        fundamental misconception.
+        
+        Feedback fields:
+        - "strengths": 2-4 short phrases, each tied to something the candidate actually said.
+        - "improvements": 2-4 short, actionable phrases (what to study or do differently).
+        - "detailed_feedback": one paragraph of 4-6 sentences covering overall performance,
+          the strongest and weakest areas with a reference to specific answers, and potential
+          for growth. Address the candidate's work, not the candidate as a person.
         
         Be fair but thorough for intern-level expectations. Consider this is an entry-level position.
         """
+
+def _parse_json_object(text: str) -> Dict:
+    """Parse the first JSON object in a model response, ignoring fences and chatter"""
+    start_idx = text.find('{')
+    end_idx = text.rfind('}') + 1
+    if start_idx == -1 or end_idx <= start_idx:
+        raise ValueError("No JSON object in response")
+    result = json.loads(text[start_idx:end_idx])
+    if not isinstance(result, dict):
+        raise ValueError("Response JSON is not an object")
+    return result
+
+def _parse_score(text: str) -> Dict:
+    """Per-answer score from a scoring response; raises ValueError"""
+    if not text:
+        raise ValueError("Empty scoring response")
+    result = _parse_json_object(text)
+    return {
+        'score': max(0, min(100, int(result.get('score', 0)))),
+        'communication_score': max(0, min(100, int(result.get('communication_score', 0)))),
+        'strength': str(result.get('strength', '')).strip(),
+        'improvement': str(result.get('improvement', '')).strip()
+    }
+
+def _remaining(deadline: float) -> float:
+    """Seconds left before ``deadline`` (a time.monotonic() time); TimeoutError once it has passed"""
+    remaining = deadline - time.monotonic()
+    if remaining <= 0:
+        raise TimeoutError("Call deadline passed")
+    return remaining
+
+def _apply_synthesis(evaluation: Dict, synthesis: Dict, responses: List[Response],
+                     answer_scores: Dict[int, Dict]) -> Dict:
+    """Fill the written feedback from a synthesis response, falling back to the per-answer notes"""
+    strengths = [answer_scores[r.question_id]['strength'] for r in responses if answer_scores[r.question_id]['strength']]
+    improvements = [answer_scores[r.question_id]['improvement'] for r in responses if answer_scores[r.question_id]['improvement']]
+    
+    evaluation['strengths'] = synthesis.get('strengths') or strengths[:3] or ["Completed all questions"]
+    evaluation['improvements'] = synthesis.get('improvements') or improvements[:3] or ["Continue learning and practicing"]
+    evaluation['detailed_feedback'] = synthesis.get('detailed_feedback') or "Candidate completed the interview process."
+    evaluation['recommendation'] = synthesis.get('recommendation') or "Under Review"
+    return evaluation
+
+def _question_from_data(question_id: int, q_data) -> Optional[Question]:
+    """Build a Question from one parsed JSON element, or None if it is unusable"""
+    q_data, _ = fix_question(q_data)
+    if q_data is None:
+        return None
+    return Question(
+        id=question_id,
+        text=q_data['text'],
+        category=q_data['category'],
+        difficulty=q_data['difficulty']
+    )
+
+def default_questions() -> List[Question]:
+    """The built-in question set, used when neither the model nor the question bank can help"""
+    return [
+        Question(1, "Explain the difference between an array and a linked list. When would you use each data structure?", "Technical", "Medium"),
+        Question(2, "What is time complexity (Big O notation)? Calculate the time complexity of searching through a 2D array using nested loops.", "Technical", "Easy"),
+        Question(3, "You're debugging a web application that takes 30 seconds to load. Walk me through your debugging process step by step.", "Problem-Solving", "Medium"),
+        Question(4, "Design a basic real-time chat application. What main components and technologies would you need? Consider scalability for 1000+ users.", "Problem-Solving", "Hard"),
+        Question(5, "Describe a challenging coding project you worked on. What obstacles did you face and how did you overcome them?", "Behavioral", "Medium"),
+        Question(6, "What's the difference between SQL and NoSQL databases? Give an example of when you'd use each.", "Technical", "Easy")
+    ]
+
+def aggregate_answer_scores(responses: List[Response], answer_scores: Dict[int, Dict]) -> Dict:
+    """Category, communication and overall scores of an evaluation from per-answer scores"""
+    by_category: Dict[str, List[int]] = {}
+    for r in responses:
+        by_category.setdefault(r.category, []).append(answer_scores[r.question_id]['score'])
+    
+    all_scores = [answer_scores[r.question_id]['score'] for r in responses]
+    evaluation = {
+        score_key: int(round(sum(by_category[category]) / len(by_category[category])))
+        if by_category.get(category) else int(round(sum(all_scores) / len(all_scores)))
+        for category, score_key in CATEGORY_SCORE_KEYS.items()
+    }
+    evaluation['communication_score'] = int(round(
+        sum(answer_scores[r.question_id]['communication_score'] for r in responses) / len(responses)
+    ))
+    evaluation['overall_score'] = int(round(
+        (sum(all_scores) / len(all_scores) * 3 + evaluation['communication_score']) / 4
+    ))
+    return evaluation
+
+def basic_evaluation(responses: List[Response]) -> Dict:
+    """Offline evaluation against each question's reference answer and key concepts (see RubricScorer).
+    
+    Takes about a millisecond, so it serves both as the provisional score shown while the
+    model evaluates and as the evaluation itself when the model cannot be reached.
+    """
+    if not responses:
+        return {
+            **dict.fromkeys(EVALUATION_SCORE_KEYS, 0),
+            "strengths": [],
+            "improvements": ["Answer the interview questions"],
+            "detailed_feedback": "No answers to evaluate.",
+            "recommendation": "Hold"
+        }
+    
+    answer_scores = get_rubric_scorer().score_answers(responses)
+    evaluation = aggregate_answer_scores(responses, answer_scores)
+    overall = evaluation['overall_score']
+    categories = {category: evaluation[key] for category, key in CATEGORY_SCORE_KEYS.items()
+                  if any(r.category == category for r in responses)}
+    strongest = max(categories, key=categories.get)
+    weakest = min(categories, key=categories.get)
+    
+    if overall >= 85:
+        recommendation = "Strong Hire"
+    elif overall >= 70:
+        recommendation = "Hire"
+    elif overall >= 55:
+        recommendation = "Conditional Hire"
+    elif overall >= 40:
+        recommendation = "Hold"
+    else:
+        recommendation = "No Hire"
+    
+    feedback = {
+        'detailed_feedback': (
+            f"Scored offline against each question's reference answer and key concepts: {overall}/100 overall, "
+            f"strongest in {strongest} ({categories[strongest]}), weakest in {weakest} ({categories[weakest]}). "
+            f"Concept coverage and similarity to a model answer are measured; correctness of reasoning is not, "
+            f"so treat this as a provisional assessment."
+        ),
+        'recommendation': recommendation
+    }
+    return _apply_synthesis(evaluation, feedback, responses, answer_scores)
+
+def _render_transcript_entry(number: int, response: Response, answer: str) -> str:
+    """One answer of the evaluation transcript"""
+    return f"""
+Question {number}: {response.question} 
+Category: {response.category}
+Answer: {answer}
+Time taken: {response.time_taken:.1f} seconds
+---
+"""
+
+def _render_scored_answer(number: int, response: Response, answer: str) -> str:
+    """The single answer of a per-answer scoring prompt"""
+    return (
+        f"Question: {response.question}\n"
+        f"Category: {response.category}\n"
+        f"Answer: {answer}\n"
+        f"Time taken: {response.time_taken:.1f} seconds"
+    )
+
+class QuestionGenerationError(Exception):
+    """Raised when the model's question set cannot be used"""
+    
+    def __init__(self, message: str, raw_text: Optional[str] = None):
+        super().__init__(message)
+        self.raw_text = raw_text
+
+class AIInterviewer:
+    def __init__(self, api_key: str, backend: Optional[LLMBackend] = None,
+                 hedge_policy: Optional[HedgePolicy] = None):
+        # Opt-in: race slow evaluations against a second model
+        self.hedge_policy = hedge_policy
+        # Size of the last full-transcript evaluation prompt, shown on the results page
+        self.last_prompt_stats: Optional[PromptStats] = None
+        # Calls go to the fastest healthy model; backends for models other than self.model_name
+        self.router = get_model_router()
+        self._extra_backends: Dict[str, LLMBackend] = {}
         
+        if backend is not None:
+            # Injected backend (e.g. SimulatedBackend): no key, no model resolution
+            self.backend = backend
+            self.model = getattr(backend, 'model', None)
+            self.model_name = backend.model_name
+            self._key_hash = None
+            return
+        
+        # Deferred: the SDK pulls in gRPC/protobuf, which sessions without a key never need
+        import google.generativeai as genai
+        genai.configure(api_key=api_key)
+        self._key_hash = hash_api_key(api_key)
+        
+        # Reuse the model resolved by an earlier rerun or session with the same key
+        cached = get_cached_model(self._key_hash, revalidate=lambda entry: probe_model(entry.model))
+        if cached is not None:
+            self.model = cached.model
+            self.model_name = cached.model_name
+            self.backend = GeminiBackend(self.model, self.model_name, get_prompt_cache(self._key_hash))
+            return
+        
+        st.info("🔄 Finding the best available Gemini model...")
         try:
-            generation_config = genai.types.GenerationConfig(
-                temperature=0.3,  # Lower temperature for more consistent evaluation
-                max_output_tokens=1500,
-                top_p=0.8
-            )
-            
-            response = self.model.generate_content(
-                prompt, 
-                generation_config=generation_config,
-                request_options={'timeout': 30}
-            )
-            
-            if not response or not response.text:
-                st.warning("Empty evaluation response. Using basic evaluation.")
-                return self._basic_evaluation(responses)
-            
-            response_text = response.text.strip()
-            
-            # Clean up response text
-            if response_text.startswith('```json'):
-                response_text = response_text[7:-3]
-            elif response_text.startswith('```'):
-                response_text = response_text[3:-3]
-            
-            # Find JSON boundaries
-            start_idx = response_text.find('{')
-            end_idx = response_text.rfind('}') + 1
-            
-            if start_idx != -1 and end_idx > start_idx:
-                json_str = response_text[start_idx:end_idx]
-                
-                try:
-                    evaluation = json.loads(json_str)
-                except json.JSONDecodeError as je:
-                    st.error(f"Evaluation JSON parsing error: {je}")
-                    return self._basic_evaluation(responses)
-                
-                # Validate and clamp scores
-                score_keys = ['technical_score', 'communication_score', 'problem_solving_score', 'behavioral_score', 'overall_score']
-                for key in score_keys:
-                    if key in evaluation:
-                        evaluation[key] = max(0, min(100, int(evaluation.get(key, 0))))
-                
-                # Ensure required fields exist
-                if 'strengths' not in evaluation:
-                    evaluation['strengths'] = ["Completed all questions"]
-                if 'improvements' not in evaluation:
-                    evaluation['improvements'] = ["Continue learning and practicing"]
-                if 'detailed_feedback' not in evaluation:
-                    evaluation['detailed_feedback'] = "Candidate completed the interview process."
-                if 'recommendation' not in evaluation:
-                    evaluation['recommendation'] = "Under Review"
-                
-                return evaluation
+            resolved = ModelResolver().resolve()
+        except ModelResolutionError as e:
+            for model_name, error in e.errors.items():
+                st.warning(f"❌ Failed with {model_name}: {error[:100]}...")
+            st.error(str(e))
+            raise
+        
+        self.model = resolved.model
+        self.model_name = resolved.model_name
+        self.backend = GeminiBackend(self.model, self.model_name, get_prompt_cache(self._key_hash))
+        st.success(f"✅ Successfully connected with: {self.model_name}")
+        
+        store_model(self._key_hash, self.model_name, self.model)
+        print(f"Successfully initialized with model: {self.model_name}")
+    
+    def _handle_model_error(self, error: Exception):
+        """Forget the cached model when a real call shows it is no longer usable"""
+        if self._key_hash is not None and is_model_unavailable_error(error):
+            invalidate_model(self._key_hash)
+    
+    def _candidate_names(self) -> List[str]:
+        """Models this interviewer may route to, best-ranked first"""
+        if self._key_hash is None:
+            # Injected backend: its own model plus any replicas it serves (see SimulatedBackend)
+            return [self.model_name, *getattr(self.backend, 'replica_names', ())]
+        return available_model_names(
+            self._key_hash, self.model_name, MODEL_PREFERENCE, lambda: ModelResolver().available_models()
+        )
+    
+    def _backend_for(self, model_name: str) -> LLMBackend:
+        """Backend for a routed model, created on first use"""
+        if model_name == self.model_name:
+            return self.backend
+        backend = self._extra_backends.get(model_name)
+        if backend is None:
+            if self._key_hash is None:
+                # Only reached for the replica names an injected backend lists
+                backend = self.backend.for_model(model_name)
             else:
-                st.warning("Could not parse evaluation JSON. Using basic evaluation.")
-                return self._basic_evaluation(responses)
-                
+                import google.generativeai as genai
+                backend = GeminiBackend(genai.GenerativeModel(model_name), model_name,
+                                        get_prompt_cache(self._key_hash))
+            self._extra_backends[model_name] = backend
+        return backend
+    
+    async def _generate(self, prompt: str, settings: GenerationSettings, timeout: float,
+                        kind: str = 'default', deadline: Optional[float] = None) -> LLMResponse:
+        """Send one request to the fastest healthy model good enough for ``kind``.
+        
+        ``timeout`` applies until that model's latency for ``kind`` has been measured; after
+        that the router derives it from the observed tail. A failed call is retried once on
+        the next candidate model. Everything, retries included, ends by ``deadline``
+        (default: CALL_DEADLINE_SECONDS from now).
+        """
+        if deadline is None:
+            deadline = time.monotonic() + CALL_DEADLINE_SECONDS
+        with span('llm.call', kind=kind, stream=False) as call_span:
+            last_error = None
+            for name, name_timeout in self._routes(kind, timeout):
+                if last_error is not None and time.monotonic() >= deadline:
+                    break
+                try:
+                    return await self._generate_on(name, prompt, settings, name_timeout, kind, deadline)
+                except Exception as e:
+                    last_error = e
+                    call_span.event('model_failed', model=name, error=type(e).__name__)
+            raise last_error
+    
+    def _stream(self, prompt: str, settings: GenerationSettings, timeout: float,
+                kind: str = 'default', deadline: Optional[float] = None) -> Iterator[str]:
+        """``_generate`` for a streamed answer; only opening the stream fails over to the next model"""
+        if deadline is None:
+            deadline = time.monotonic() + CALL_DEADLINE_SECONDS
+        with span('llm.call', kind=kind, stream=True) as call_span:
+            last_error = None
+            for name, name_timeout in self._routes(kind, timeout):
+                if last_error is not None and time.monotonic() >= deadline:
+                    break
+                try:
+                    return self._stream_on(name, prompt, settings, name_timeout, kind, deadline)
+                except Exception as e:
+                    last_error = e
+                    call_span.event('model_failed', model=name, error=type(e).__name__)
+            raise last_error
+    
+    def _routes(self, kind: str, timeout: float) -> List[Tuple[str, float]]:
+        """Models to try for ``kind``, best-ranked first, each with the timeout the router allows it"""
+        names = self.router.rank(self._candidate_names(), kind) or [self.model_name]
+        return [(name, self.router.timeout_for(name, kind, timeout)) for name in names[:MAX_ROUTED_ATTEMPTS]]
+    
+    async def _generate_on(self, model_name: str, prompt: str, settings: GenerationSettings, timeout: float,
+                           kind: str, deadline: float) -> LLMResponse:
+        """Send one request to one model through the shared per-model rate limiter.
+        
+        Callers queue for quota instead of failing; 429s and timeouts are retried with
+        jittered exponential backoff before the error reaches the caller's fallback path.
+        Queueing and retries stop at ``deadline``, and no attempt runs past it.
+        """
+        backend = self._backend_for(model_name)
+        limiter = get_rate_limiter(model_name) if backend.rate_limited else None
+        estimated_tokens = estimate_tokens((settings.static_prefix or "") + prompt, settings.max_output_tokens)
+        attempts = 0
+        
+        async def call():
+            nonlocal attempts
+            attempts += 1
+            if limiter is not None:
+                await limiter.acquire_async(estimated_tokens, timeout=_remaining(deadline))
+            call_timeout = min(timeout, _remaining(deadline))
+            started = time.monotonic()
+            try:
+                with span('llm.generate', LLM_REQUEST_SECONDS, model=model_name, kind=kind, attempt=attempts,
+                          timeout=call_timeout):
+                    response = await asyncio.wait_for(backend.generate_async(prompt, settings, call_timeout),
+                                                      call_timeout)
+                    record_tokens(model_name, kind, response.prompt_tokens, response.output_tokens,
+                                  response.cached_tokens)
+            except Exception:
+                self.router.record_failure(model_name)
+                raise
+            self.router.record_success(model_name, time.monotonic() - started, kind)
+            return response
+        
+        try:
+            response = await call_with_backoff_async(call, limiter=limiter, deadline=deadline)
         except Exception as e:
+            if model_name == self.model_name:
+                self._handle_model_error(e)
+            raise
+        finally:
+            if attempts > 1:
+                LLM_RETRIES.inc(attempts - 1, model=model_name, kind=kind)
+        
+        if limiter is not None:
+            limiter.record_usage(estimated_tokens, response.total_tokens)
+        return response
+    
+    def _stream_on(self, model_name: str, prompt: str, settings: GenerationSettings, timeout: float,
+                   kind: str, deadline: float) -> Iterator[str]:
+        """Open a stream on one model, queued and retried like ``_generate_on``"""
+        backend = self._backend_for(model_name)
+        limiter = get_rate_limiter(model_name) if backend.rate_limited else None
+        estimated_tokens = estimate_tokens((settings.static_prefix or "") + prompt, settings.max_output_tokens)
+        attempts = 0
+        
+        def call():
+            nonlocal attempts
+            attempts += 1
+            if limiter is not None:
+                limiter.acquire(estimated_tokens, timeout=_remaining(deadline))
+            call_timeout = min(timeout, _remaining(deadline))
+            started = time.monotonic()
+            try:
+                # A stream's latency is only known once it ends; _track_stream records it
+                with span('llm.generate', model=model_name, kind=kind, attempt=attempts, timeout=call_timeout):
+                    chunks = backend.generate(prompt, settings, timeout=call_timeout, stream=True)
+            except Exception:
+                self.router.record_failure(model_name)
+                raise
+            return self._track_stream(model_name, kind, chunks, started)
+        
+        try:
+            return call_with_backoff(call, limiter=limiter, deadline=deadline)
+        except Exception as e:
+            if model_name == self.model_name:
+                self._handle_model_error(e)
+            raise
+        finally:
+            if attempts > 1:
+                LLM_RETRIES.inc(attempts - 1, model=model_name, kind=kind)
+    
+    def _track_stream(self, model_name: str, kind: str, chunks: Iterator[str], started: float) -> Iterator[str]:
+        """Pass a stream through, recording its latency or failure with the router"""
+        failed = False
+        try:
+            yield from chunks
+        except Exception:
+            failed = True
+            self.router.record_failure(model_name)
+            raise
+        finally:
+            # Also reached when the consumer stops early, e.g. after the sixth question
+            seconds = time.monotonic() - started
+            LLM_REQUEST_SECONDS.observe(seconds, model=model_name, kind=kind, outcome='error' if failed else 'ok')
+            if not failed:
+                self.router.record_success(model_name, seconds, kind)
+    
+    def generate_questions(self, candidate_background: str = "") -> List[Question]:
+        """Generate personalized interview questions using Gemini"""
+        try:
+            questions = self.request_questions(candidate_background)
+            st.success(f"Generated {len(questions)} personalized questions!")
+            return questions
+        except QuestionGenerationError as e:
+            record_fallback('questions', 'invalid_output')
+            st.warning(f"{e} Using fallback questions.")
+            if e.raw_text:
+                st.error(f"Raw response: {e.raw_text[:500]}...")
+            return self._get_fallback_questions()
+        except Exception as e:
+            record_fallback('questions', type(e).__name__)
+            st.error(f"Error generating questions: {e}")
+            return self._get_fallback_questions()
+    
+    def request_questions(self, candidate_background: str = "") -> List[Question]:
+        """Generate 6 questions or raise; safe to call from a background worker (no Streamlit calls)"""
+        return run_coroutine(self.request_questions_async(candidate_background))
+    
+    async def request_questions_async(self, candidate_background: str = "") -> List[Question]:
+        """``request_questions`` for coroutines; the sync method runs this on the background loop"""
+        deadline = time.monotonic() + CALL_DEADLINE_SECONDS
+        response = await self._generate(
+            self._question_prompt(candidate_background),
+            self._question_settings(),
+            timeout=45,  # Increased timeout
+            kind='questions',
+            deadline=deadline
+        )
+        
+        if not response or not response.text:
+            record_outcome('wasted')
+            raise QuestionGenerationError("Empty response from AI.")
+        
+        try:
+            questions_data = await self._parse_or_repair(response.text, QUESTION_SET, deadline)
+        except StructuredOutputError as e:
+            raise QuestionGenerationError(f"{e}.", e.raw_text or None)
+        questions = [q for q in (_question_from_data(i + 1, d) for i, d in enumerate(questions_data[:6])) if q]
+        
+        def bank_and_complete():
+            get_question_bank().add_many(questions, question_references(questions_data))
+            return self._complete_question_set(questions)
+        
+        # The bank is SQLite-backed
+        return await asyncio.to_thread(bank_and_complete)
+    
+    def stream_questions(self, candidate_background: str = "") -> Iterator[Question]:
+        """Yield each question as soon as the model has finished writing it.
+        
+        Always yields 6 questions: a truncated or failed stream is topped up with fallback
+        questions. Raises QuestionGenerationError only if no question arrived at all.
+        """
+        parser = JSONArrayStreamParser()
+        questions: List[Question] = []
+        questions_data: List[Dict] = []
+        
+        try:
+            response = self._stream(
+                self._question_prompt(candidate_background),
+                self._question_settings(),
+                timeout=45,
+                kind='questions'
+            )
+            for chunk in response:
+                for q_data in parser.feed(chunk):
+                    question = _question_from_data(len(questions) + 1, q_data)
+                    if question:
+                        questions.append(question)
+                        questions_data.append(fix_question(q_data)[0])
+                        yield question
+                if len(questions) >= 6 or parser.finished:
+                    break
+        except Exception as e:
+            self._handle_model_error(e)
+            if not questions:
+                raise QuestionGenerationError(f"Question stream failed: {e}.")
+        
+        if not questions:
+            record_outcome('wasted')
+            raise QuestionGenerationError("Could not find any valid questions in AI response.")
+        # A short stream is topped up locally rather than repaired
+        record_outcome('valid' if len(questions) >= 6 else 'fixed')
+        if len(questions) < 6:
+            record_fallback('questions', 'partial_stream')
+        
+        get_question_bank().add_many(questions, question_references(questions_data))
+        yield from self._complete_question_set(questions)[len(questions):]
+    
+    def bank_question_set(self) -> Optional[List[Question]]:
+        """A generic question set sampled from the local bank (no model call), or None if it is too small"""
+        return get_question_bank().sample_set(QUESTION_MIX, DIFFICULTY_MIX)
+    
+    def bank_ready(self) -> bool:
+        """Whether ``bank_question_set`` can fill a set; cheap enough to check on every rerun"""
+        return get_question_bank().can_sample_set(QUESTION_MIX, DIFFICULTY_MIX)
+    
+    @property
+    def quota_key(self) -> str:
+        """Whose quota this interviewer's calls spend: the API key hash, or the injected backend"""
+        return self._key_hash or f"backend:{self.model_name}"
+    
+    def _question_prompt(self, candidate_background: str) -> str:
+        """Per-candidate part of the question prompt; QUESTION_REQUIREMENTS goes before it"""
+        return f"""
+        Candidate background: {candidate_background}
+        """
+    
+    def _question_settings(self):
+        return json_settings(
+            QUESTION_SET,
+            temperature=0.7,
+            max_output_tokens=2500,  # Increased for better responses
+            top_p=0.9,
+            static_prefix=QUESTION_REQUIREMENTS
+        )
+    
+    def _complete_question_set(self, questions: List[Question]) -> List[Question]:
+        """Top up a partial question set with fallback questions for the missing categories"""
+        questions = questions[:6]
+        missing = dict(QUESTION_MIX)
+        for q in questions:
+            if missing.get(q.category, 0) > 0:
+                missing[q.category] -= 1
+        
+        used_texts = {q.text for q in questions}
+        fallback = [q for q in self._get_fallback_questions() if q.text not in used_texts]
+        for q in list(fallback):
+            if len(questions) >= 6:
+                break
+            if missing.get(q.category, 0) > 0:
+                missing[q.category] -= 1
+                questions.append(q)
+                fallback.remove(q)
+        # Categories the model over-filled: any fallback question will do
+        questions.extend(fallback[:6 - len(questions)])
+        
+        return [Question(i + 1, q.text, q.category, q.difficulty) for i, q in enumerate(questions)]
+    
+    def _get_fallback_questions(self) -> List[Question]:
+        """High-quality fallback questions if AI generation fails"""
+        banked = self.bank_question_set()
+        if banked is not None:
+            return banked
+        return default_questions()
+    
+    def evaluate_responses(self, responses: List[Response], answer_scores: Optional[Dict[int, Dict]] = None,
+                           use_cache: bool = True, use_fallback: bool = True) -> Dict:
+        """Evaluate all responses and generate comprehensive feedback.
+        
+        When ``answer_scores`` holds a background score for every response, only a short
+        synthesis call is made instead of grading the whole transcript again.
+        ``use_cache=False`` always calls the model (benchmarks, forced re-grades).
+        ``use_fallback=False`` raises when the model evaluation fails instead of returning
+        the basic evaluation (batch runs, which must not record a fallback as a result).
+        """
+        
+        if not responses:
+            return self._basic_evaluation([])
+        
+        if not use_fallback:
+            return run_coroutine(self.evaluate_async(responses, answer_scores, use_cache))[0]
+        
+        try:
+            evaluation, synthesized = run_coroutine(self.evaluate_async(responses, answer_scores, use_cache))
+        except ValueError as e:
+            record_fallback('evaluation', 'invalid_output')
+            st.warning(f"{e}. Using basic evaluation.")
+            return self._basic_evaluation(responses)
+        except Exception as e:
+            record_fallback('evaluation', type(e).__name__)
             st.error(f"Evaluation error: {e}")
             return self._basic_evaluation(responses)
+        
+        if not synthesized:
+            st.warning("Feedback synthesis failed, showing per-answer notes.")
+        return evaluation
     
-    def _basic_evaluation(self, responses: List[Response]) -> Dict:
-        """Enhanced basic evaluation if AI evaluation fails"""
-        if not responses:
-            base_score = 50
+    async def evaluate_async(self, responses: List[Response], answer_scores: Optional[Dict[int, Dict]] = None,
+                             use_cache: bool = True) -> Tuple[Dict, bool]:
+        """``evaluate_responses`` for coroutines: raises instead of falling back.
+        
+        Returns the evaluation and whether the model wrote all of it. The flag is False only
+        when a synthesis call failed and the per-answer notes stand in for the feedback;
+        such evaluations are not cached.
+        """
+        # Reruns, report downloads and restarts reuse the same evaluation
+        cache = get_evaluation_cache() if use_cache else None
+        if cache is not None:
+            cache_key = cache.make_key(responses, self.model_name, EVALUATION_PROMPT_VERSION)
+            cached_evaluation = await asyncio.to_thread(cache.get, cache_key)
+            if cached_evaluation is not None:
+                return cached_evaluation, True
+        
+        deadline = time.monotonic() + CALL_DEADLINE_SECONDS
+        synthesized = True
+        if answer_scores and all(r.question_id in answer_scores for r in responses):
+            evaluation, synthesized = await self._synthesize_evaluation(responses, answer_scores, deadline)
         else:
-            # More sophisticated basic scoring
-            avg_length = sum(len(r.answer) for r in responses) / len(responses)
-            avg_time = sum(r.time_taken for r in responses) / len(responses)
-            
-            # Score based on response quality indicators
-            length_score = min(100, max(30, avg_length / 15))  # Longer responses generally better
-            time_score = 100 if 30 <= avg_time <= 150 else 70  # Good time management
-            completion_score = (len(responses) / 6) * 100  # Completion rate
-            
-            base_score = int((length_score + time_score + completion_score) / 3)
+            # May count tokens for a long transcript, which blocks
+            prompt, settings = await asyncio.to_thread(self._evaluation_request, responses)
+            if self.hedge_policy is not None:
+                try:
+                    evaluation, fixes = await self._race_hedged(
+                        prompt, settings, 30, lambda text: parse_structured(text, EVALUATION), deadline=deadline
+                    )
+                    record_outcome('fixed' if fixes else 'valid')
+                except StructuredOutputError as e:
+                    evaluation = await self._repair(EVALUATION, e, deadline)
+            else:
+                response = await self._generate(prompt, settings, timeout=30, kind='evaluation', deadline=deadline)
+                evaluation = await self._parse_or_repair(response.text if response else "", EVALUATION, deadline)
         
-        return {
-            "technical_score": max(40, base_score - 5),
-            "communication_score": max(45, base_score),
-            "problem_solving_score": max(35, base_score - 10),
-            "behavioral_score": max(50, base_score + 5),
-            "overall_score": base_score,
-            "strengths": [
-                "Completed the interview process",
-                "Engaged with all questions",
-                "Showed up and participated"
-            ],
-            "improvements": [
-                "Could provide more detailed technical explanations",
-                "Practice explaining complex concepts clearly",
-                "Consider providing specific examples"
-            ],
-            "detailed_feedback": f"Candidate participated in the full interview process with an overall performance score of {base_score}/100. This basic evaluation was generated due to AI evaluation system limitations. The candidate showed engagement and completed all required questions within the allotted time frame.",
-            "recommendation": "Conditional Hire" if base_score >= 60 else "Hold"
-        }
\ No newline at end of file
+        # Feedback filled in after a failed synthesis must not outlive the failure
+        if cache is not None and synthesized:
+            await asyncio.to_thread(cache.put, cache_key, self.model_name, evaluation)
+        return evaluation, synthesized
+    
+    def _evaluation_request(self, responses: List[Response]) -> Tuple[str, GenerationSettings]:
+        """Per-candidate prompt and settings for grading a whole transcript; the rubric is the static prefix"""
+        template = EVALUATION_RUBRIC + f"""
+        Candidate responses:
+        
+        {TRANSCRIPT_PLACEHOLDER}
+        """
+        
+        # Built whole so the token budget covers the rubric too
+        prompt, self.last_prompt_stats = self._build_prompt(
+            template, responses, EVALUATION_TOKEN_BUDGET, _render_transcript_entry, 'evaluation'
+        )
+        settings = json_settings(
+            EVALUATION,
+            temperature=0.3,  # Lower temperature for more consistent evaluation
+            max_output_tokens=1500,
+            top_p=0.8,
+            static_prefix=EVALUATION_RUBRIC
+        )
+        return prompt[len(EVALUATION_RUBRIC):], settings
+    
+    async def _parse_or_repair(self, text: str, spec: OutputSpec, deadline: Optional[float] = None):
+        """Validated output of a structured call; output that cannot be fixed locally gets one repair request"""
+        try:
+            value, fixes = parse_structured(text, spec)
+        except StructuredOutputError as e:
+            return await self._repair(spec, e, deadline)
+        record_outcome('fixed' if fixes else 'valid')
+        return value
+    
+    async def _repair(self, spec: OutputSpec, error: StructuredOutputError, deadline: Optional[float] = None):
+        """Ask the model once to rewrite invalid output to the schema; re-raises ``error`` if that fails"""
+        if not error.raw_text:
+            record_outcome('wasted')
+            raise error
+        with span('llm.repair', output=spec.name) as repair_span:
+            try:
+                response = await self._generate(
+                    repair_prompt(spec, error.raw_text, error), repair_settings(spec), timeout=20, kind='repair',
+                    deadline=deadline
+                )
+                value, _ = parse_structured(response.text if response else "", spec)
+            except Exception as repair_error:
+                record_outcome('wasted', repair_requests=1)
+                repair_span.event('repair_failed', error=type(repair_error).__name__, message=str(repair_error)[:200])
+                raise error
+        record_outcome('repaired', repair_requests=1)
+        return value
+    
+    async def _race_hedged(self, prompt: str, settings: GenerationSettings, timeout: float, parse,
+                           kind: str = 'evaluation', deadline: Optional[float] = None):
+        """``parse`` of the first usable answer, hedging to the next routed model when the first is slow"""
+        if deadline is None:
+            deadline = time.monotonic() + CALL_DEADLINE_SECONDS
+        names = self.router.rank(self._candidate_names(), kind) or [self.model_name]
+        hedge_name = names[1] if len(names) > 1 else None
+        
+        def attempt(name):
+            backend = self._backend_for(name)
+            call_timeout = self.router.timeout_for(name, kind, timeout)
+            return lambda: self._attempt_async(backend, prompt, settings, call_timeout, parse, kind, deadline)
+        
+        return await hedged_race(
+            names[0], attempt(names[0]),
+            hedge_name, attempt(hedge_name) if hedge_name is not None else None,
+            self.hedge_policy, kind
+        )
+    
+    async def _attempt_async(self, backend: LLMBackend, prompt: str, settings: GenerationSettings,
+                             timeout: float, parse, kind: str = 'default', deadline: Optional[float] = None):
+        """One rate-limited async call whose answer only counts once it parses; none of it runs past ``deadline``"""
+        limiter = get_rate_limiter(backend.model_name) if backend.rate_limited else None
+        estimated_tokens = estimate_tokens((settings.static_prefix or "") + prompt, settings.max_output_tokens)
+        if deadline is None:
+            deadline = time.monotonic() + CALL_DEADLINE_SECONDS
+        if limiter is not None:
+            await limiter.acquire_async(estimated_tokens, timeout=_remaining(deadline))
+        timeout = min(timeout, _remaining(deadline))
+        try:
+            with span('llm.generate', LLM_REQUEST_SECONDS, model=backend.model_name, kind=kind, hedged=True,
+                      timeout=timeout):
+                response = await asyncio.wait_for(backend.generate_async(prompt, settings, timeout), timeout)
+                record_tokens(backend.model_name, kind, response.prompt_tokens, response.output_tokens,
+                              response.cached_tokens)
+        except Exception as e:
+            if backend is self.backend:
+                self._handle_model_error(e)
+            raise
+        if limiter is not None:
+            limiter.record_usage(estimated_tokens, response.total_tokens)
+        return parse(response.text if response else "")
+    
+    def _build_prompt(self, template: str, responses: List[Response], budget_tokens: int, render_response,
+                      kind: str) -> Tuple[str, PromptStats]:
+        """Fill the template's transcript within the token budget; its size goes on a ``prompt.build`` span"""
+        with span('prompt.build', kind=kind, answers=len(responses)) as build_span:
+            prompt, stats = PromptBuilder(self.backend, budget_tokens).build(template, responses, render_response)
+            build_span.set(prompt_tokens=stats.prompt_tokens, budget_tokens=stats.budget_tokens,
+                           truncated_answers=stats.truncated_answers, exact=stats.exact)
+        return prompt, stats
+    
+    def score_response(self, response: Response) -> Dict:
+        """Score a single answer; safe to call from a background worker (no Streamlit calls)"""
+        return run_coroutine(self.score_response_async(response))
+    
+    async def score_response_async(self, response: Response) -> Dict:
+        """``score_response`` for coroutines; raises when the call or its output fails"""
+        # May count tokens for a long answer, which blocks
+        prompt, settings = await asyncio.to_thread(self._scoring_request, response)
+        response_obj = await self._generate(prompt, settings, timeout=30, kind='scoring')
+        return _parse_score(response_obj.text if response_obj else "")
+    
+    def _scoring_request(self, response: Response) -> Tuple[str, GenerationSettings]:
+        """Prompt and settings for grading one answer"""
+        template = f"""
+        Score this answer from an SDE intern interview.
+        
+        {TRANSCRIPT_PLACEHOLDER}
+        
+        Return ONLY a JSON object in this exact format:
+        {{
+            "score": 75,
+            "communication_score": 80,
+            "strength": "One short phrase",
+            "improvement": "One short phrase"
+        }}
+        
+        "score" (0-100) grades the answer against the {response.category} criteria:
+        - Technical: Accuracy, depth, proper terminology, understanding of concepts
+        - Problem-Solving: Logical approach, creativity, systematic methodology
+        - Behavioral: Relevant examples, self-awareness, cultural fit, growth mindset
+        "communication_score" (0-100) grades clarity, structure and completeness.
+        Use intern-level expectations.
+        """
+        
+        prompt, _ = self._build_prompt(template, [response], SCORING_TOKEN_BUDGET, _render_scored_answer, 'scoring')
+        settings = GenerationSettings(
+            temperature=0.2,
+            max_output_tokens=200,
+            top_p=0.8
+        )
+        return prompt, settings
+    
+    async def _synthesize_evaluation(self, responses: List[Response], answer_scores: Dict[int, Dict],
+                                     deadline: Optional[float] = None) -> Tuple[Dict, bool]:
+        """Aggregate per-answer scores and ask only for the written feedback.
+        
+        Returns the evaluation and whether the model wrote its feedback; when it did not,
+        the per-answer notes stand in.
+        """
+        evaluation, prompt, settings = self._synthesis_request(responses, answer_scores)
+        try:
+            response_obj = await self._generate(prompt, settings, timeout=20, kind='synthesis', deadline=deadline)
+            synthesis = _parse_json_object(response_obj.text if response_obj else "")
+        except Exception as e:
+            record_fallback('synthesis', type(e).__name__)
+            return _apply_synthesis(evaluation, {}, responses, answer_scores), False
+        return _apply_synthesis(evaluation, synthesis, responses, answer_scores), True
+    
+    def _synthesis_request(self, responses: List[Response],
+                           answer_scores: Dict[int, Dict]) -> Tuple[Dict, str, GenerationSettings]:
+        """Scores aggregated from the per-answer scores, plus the prompt and settings asking for feedback"""
+        evaluation = aggregate_answer_scores(responses, answer_scores)
+        
+        summary = "\n".join(
+            f"- {r.category}: score {answer_scores[r.question_id]['score']}, "
+            f"strength: {answer_scores[r.question_id]['strength']}, "
+            f"improvement: {answer_scores[r.question_id]['improvement']}"
+            for r in responses
+        )
+        prompt = f"""
+        An SDE intern interview has already been graded per answer:
+        {summary}
+        
+        Scores: {json.dumps(evaluation)}
+        
+        Return ONLY a JSON object in this exact format:
+        {{
+            "strengths": ["Clear explanations", "Good examples", "Structured thinking"],
+            "improvements": ["More technical depth needed", "Consider edge cases"],
+            "detailed_feedback": "Short paragraph about performance and potential...",
+            "recommendation": "Conditional Hire"
+        }}
+        
+        Recommendation options: "Strong Hire", "Hire", "Conditional Hire", "Hold", "No Hire"
+        """
+        settings = GenerationSettings(
+            temperature=0.3,
+            max_output_tokens=500,
+            top_p=0.8
+        )
+        return evaluation, prompt, settings
+    
+    def _basic_evaluation(self, responses: List[Response]) -> Dict:
+        """Offline rubric evaluation, used when the model evaluation fails"""
+        return basic_evaluation(responses)
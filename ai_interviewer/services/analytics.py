@@ -0,0 +1,194 @@
+"""Cross-interview analytics over stored evaluations, computed with NumPy"""
+# ``load_dataset`` pulls every finished interview from the session store into flat arrays once;
+# every statistic below is then a handful of vectorized passes over those arrays, so the dashboard
+# stays fast with hundreds of thousands of interviews.
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from models.data_models import Category, Difficulty
+from services.session_store import EVALUATION_SCORE_FIELDS, SessionStore, get_session_store
+
+DEFAULT_PERCENTILES = (10, 25, 50, 75, 90)
+HIRE_RECOMMENDATIONS = ('Strong Hire', 'Hire')
+DIFFICULTY_LEVELS = [d.value for d in Difficulty]
+
+@dataclass
+class InterviewDataset:
+    """One row per finished interview and one row per answer, as parallel arrays"""
+
+    # Per interview
+    scores: np.ndarray            # (interviews, len(EVALUATION_SCORE_FIELDS)), NaN when missing
+    completed_at: np.ndarray      # unix seconds
+    hired: np.ndarray             # recommendation is a hire
+    # Per answer
+    answer_interview: np.ndarray  # row of the answer's interview in the arrays above, -1 if none
+    question_key: np.ndarray      # stable id of the question text
+    category: np.ndarray          # code into ``categories``
+    difficulty: np.ndarray        # code into DIFFICULTY_LEVELS, -1 when unknown
+    answer_score: np.ndarray      # per-answer score, NaN when the answer was not graded
+    time_taken: np.ndarray        # seconds
+    categories: List[str] = field(default_factory=list)
+    question_text: Dict[int, str] = field(default_factory=dict)
+
+    @property
+    def interviews(self) -> int:
+        return len(self.completed_at)
+
+    @property
+    def answers(self) -> int:
+        return len(self.time_taken)
+
+def build_dataset(evaluation_rows: Sequence[tuple], answer_rows: Sequence[tuple]) -> InterviewDataset:
+    """Arrays from the row layout of ``SessionStore.fetch_results``"""
+    n_fields = len(EVALUATION_SCORE_FIELDS)
+    row_of = {row[0]: i for i, row in enumerate(evaluation_rows)}
+    scores = np.array(
+        [row[1:1 + n_fields] for row in evaluation_rows], dtype=np.float64
+    ).reshape(len(evaluation_rows), n_fields)
+    completed_at = np.fromiter((row[2 + n_fields] for row in evaluation_rows), np.float64, len(evaluation_rows))
+    hired = np.fromiter((row[1 + n_fields] in HIRE_RECOMMENDATIONS for row in evaluation_rows), bool,
+                        len(evaluation_rows))
+
+    categories = [c.value for c in Category]
+    category_code = {name: code for code, name in enumerate(categories)}
+    difficulty_code = {name: code for code, name in enumerate(DIFFICULTY_LEVELS)}
+
+    def category_of(name):
+        code = category_code.get(name)
+        if code is None:
+            code = category_code[name] = len(categories)
+            categories.append(name)
+        return code
+
+    n = len(answer_rows)
+    question_text = {}
+    for row in answer_rows:
+        question_text.setdefault(row[1], row[2])
+
+    return InterviewDataset(
+        scores=scores,
+        completed_at=completed_at,
+        hired=hired,
+        answer_interview=np.fromiter((row_of.get(row[0], -1) for row in answer_rows), np.int64, n),
+        question_key=np.fromiter((row[1] for row in answer_rows), np.int64, n),
+        category=np.fromiter((category_of(row[3]) for row in answer_rows), np.int64, n),
+        difficulty=np.fromiter((difficulty_code.get(row[4], -1) for row in answer_rows), np.int64, n),
+        answer_score=np.fromiter((np.nan if row[5] is None else row[5] for row in answer_rows), np.float64, n),
+        time_taken=np.fromiter((row[6] for row in answer_rows), np.float64, n),
+        categories=categories,
+        question_text=question_text,
+    )
+
+def load_dataset(store: Optional[SessionStore] = None) -> InterviewDataset:
+    """Every finished interview in the session store"""
+    return build_dataset(*(store or get_session_store()).fetch_results())
+
+def grouped_percentiles(codes: np.ndarray, values: np.ndarray, n_groups: int,
+                        percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> np.ndarray:
+    """(n_groups, len(percentiles)) percentiles of ``values`` per group code, NaN for empty groups"""
+    # One sort for all groups; interpolates linearly like ``np.percentile``. Negative codes and
+    # NaN values are ignored.
+    keep = (codes >= 0) & ~np.isnan(values)
+    codes, values = codes[keep], values[keep]
+    counts = np.bincount(codes, minlength=n_groups)[:n_groups]
+    if len(values) == 0:
+        return np.full((n_groups, len(percentiles)), np.nan)
+
+    # Shifting each group into its own value band turns a (group, value) argsort into a plain
+    # float sort, which is several times faster; the shift is subtracted again afterwards
+    low = values.min()
+    span = values.max() - low + 1.0
+    shifted = np.sort(codes * span + (values - low))
+    sorted_values = shifted - np.repeat(np.arange(n_groups) * span, counts) + low
+
+    starts = np.concatenate(([0], np.cumsum(counts)[:-1]))
+    q = np.asarray(percentiles, dtype=np.float64) / 100.0
+
+    position = starts[:, None] + (counts[:, None] - 1) * q[None, :]
+    lower = np.floor(position).astype(np.int64)
+    upper = np.ceil(position).astype(np.int64)
+    empty = counts == 0
+    lower[empty] = upper[empty] = 0
+
+    weight = position - lower
+    result = sorted_values[lower] * (1 - weight) + sorted_values[upper] * weight
+    result[empty] = np.nan
+    return result
+
+def grouped_means(codes: np.ndarray, values: np.ndarray, n_groups: int) -> np.ndarray:
+    """Mean of ``values`` per group code, NaN for groups with no (non-NaN) values"""
+    keep = (codes >= 0) & ~np.isnan(values)
+    counts = np.bincount(codes[keep], minlength=n_groups)[:n_groups]
+    sums = np.bincount(codes[keep], weights=values[keep], minlength=n_groups)[:n_groups]
+    with np.errstate(invalid='ignore', divide='ignore'):
+        return np.where(counts > 0, sums / np.maximum(counts, 1), np.nan)
+
+def score_percentiles(dataset: InterviewDataset,
+                      percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, np.ndarray]:
+    """Percentiles of each evaluation score over all interviews"""
+    if dataset.interviews == 0:
+        return {name: np.full(len(percentiles), np.nan) for name in EVALUATION_SCORE_FIELDS}
+    table = np.nanpercentile(dataset.scores, percentiles, axis=0)
+    return {name: table[:, i] for i, name in enumerate(EVALUATION_SCORE_FIELDS)}
+
+def answer_percentiles(dataset: InterviewDataset, by: str = 'category', value: str = 'answer_score',
+                       percentiles: Sequence[float] = DEFAULT_PERCENTILES) -> Dict[str, np.ndarray]:
+    """Percentiles of per-answer ``value`` ('answer_score' or 'time_taken') by 'category' or 'difficulty'"""
+    labels = dataset.categories if by == 'category' else DIFFICULTY_LEVELS
+    table = grouped_percentiles(getattr(dataset, by), getattr(dataset, value), len(labels), percentiles)
+    return dict(zip(labels, table))
+
+def question_calibration(dataset: InterviewDataset, min_answers: int = 5) -> Dict[str, np.ndarray]:
+    """Per question: answer count, mean score and time, labelled vs observed difficulty"""
+    # Observed difficulty ranks questions by mean score into thirds (lowest third = Hard).
+    # ``miscalibrated`` flags questions whose label disagrees with what candidates scored.
+    keys, question_code = np.unique(dataset.question_key, return_inverse=True)
+    n_questions = len(keys)
+    answers = np.bincount(question_code, minlength=n_questions)
+    mean_score = grouped_means(question_code, dataset.answer_score, n_questions)
+    mean_time = grouped_means(question_code, dataset.time_taken, n_questions)
+    # A question keeps its label across interviews, so any of its answers gives it
+    labelled = np.full(n_questions, -1, dtype=np.int64)
+    labelled[question_code] = dataset.difficulty
+
+    eligible = (answers >= min_answers) & ~np.isnan(mean_score)
+    observed = np.full(n_questions, -1, dtype=np.int64)
+    if eligible.any():
+        low, high = np.percentile(mean_score[eligible], [100 / 3, 200 / 3])
+        hard, medium, easy = (DIFFICULTY_LEVELS.index(d) for d in ('Hard', 'Medium', 'Easy'))
+        observed[eligible] = np.where(mean_score[eligible] <= low, hard,
+                                      np.where(mean_score[eligible] >= high, easy, medium))
+
+    return {
+        'question_key': keys,
+        'question': np.array([dataset.question_text.get(int(k), '') for k in keys], dtype=object),
+        'answers': answers,
+        'mean_score': mean_score,
+        'mean_time': mean_time,
+        'labelled_difficulty': labelled,
+        'observed_difficulty': observed,
+        'miscalibrated': eligible & (labelled >= 0) & (observed != labelled),
+    }
+
+def cohort_comparison(dataset: InterviewDataset, period_days: float = 7.0,
+                      score: str = 'overall_score') -> Dict[str, np.ndarray]:
+    """Interviews grouped by completion period: size, mean and median score, hire rate"""
+    if dataset.interviews == 0:
+        empty = np.array([], dtype=np.float64)
+        return {'cohort_start': empty, 'interviews': empty.astype(np.int64), 'mean_score': empty,
+                'median_score': empty, 'hire_rate': empty}
+
+    period = period_days * 86400.0
+    buckets, cohort = np.unique(np.floor(dataset.completed_at / period), return_inverse=True)
+    n_cohorts = len(buckets)
+    values = dataset.scores[:, EVALUATION_SCORE_FIELDS.index(score)]
+    interviews = np.bincount(cohort, minlength=n_cohorts)
+    return {
+        'cohort_start': buckets * period,
+        'interviews': interviews,
+        'mean_score': grouped_means(cohort, values, n_cohorts),
+        'median_score': grouped_percentiles(cohort, values, n_cohorts, (50,))[:, 0],
+        'hire_rate': np.bincount(cohort, weights=dataset.hired, minlength=n_cohorts) / interviews,
+    }
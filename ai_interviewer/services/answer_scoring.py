@@ -0,0 +1,57 @@
+import hashlib
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Optional
+from models.data_models import Response
+from services.telemetry import record_fallback
+
+# Shared by every session in the process; each worker holds one in-flight LLM call
+_scoring_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='answer-scoring')
+
+def _answer_hash(response: Response) -> str:
+    return hashlib.sha256(f'{response.question}\0{response.answer}'.encode('utf-8')).hexdigest()
+
+def schedule_answer_scoring(jobs: Dict[int, Dict], response: Response, score_fn: Callable[[Response], Dict]) -> bool:
+    """Score an answer in the background unless the same answer is already scored or scoring"""
+    # ``jobs`` maps question_id to its scoring job and normally lives in st.session_state. Returns
+    # True when a new job was submitted.
+    answer_hash = _answer_hash(response)
+    job = jobs.get(response.question_id)
+    if job is not None and job['answer_hash'] == answer_hash:
+        return False
+
+    if job is not None:
+        job['future'].cancel()
+
+    jobs[response.question_id] = {
+        'answer_hash': answer_hash,
+        'future': _scoring_pool.submit(score_fn, response)
+    }
+    return True
+
+def collect_answer_scores(jobs: Dict[int, Dict], responses: List[Response], timeout: float = 15.0) -> Optional[Dict[int, Dict]]:
+    """Wait for the background scores of the final responses"""
+    # Returns None when any answer is missing, stale, failed or still running after ``timeout``
+    # seconds, so the caller can fall back to a full evaluation.
+    deadline = time.monotonic() + timeout
+    scores = {}
+    for response in responses:
+        job = jobs.get(response.question_id)
+        if job is None or job['answer_hash'] != _answer_hash(response):
+            record_fallback('answer_scores', 'missing' if job is None else 'stale')
+            return None
+
+        future: Future = job['future']
+        try:
+            scores[response.question_id] = future.result(timeout=max(0.0, deadline - time.monotonic()))
+        except FutureTimeoutError:
+            record_fallback('answer_scores', 'timeout')
+            return None
+        except Exception:
+            # Drop the failed job so a later submit re-scores it
+            jobs.pop(response.question_id, None)
+            record_fallback('answer_scores', 'failed')
+            return None
+
+    return scores
@@ -0,0 +1,60 @@
+"""Coroutine face of AIInterviewer for serving many interviews from one event loop"""
+# The model calls, parsing, repair and caching live once, in AIInterviewer's coroutines
+# (``request_questions_async``, ``score_response_async``, ``evaluate_async``); its sync methods
+# run them on a background loop and add Streamlit messages. This wrapper awaits them on the
+# caller's loop instead, so a call in flight holds a coroutine rather than a thread and thousands
+# of candidates can wait on the model at once. Nothing here calls Streamlit: failures fall back
+# silently and are counted with ``record_fallback``.
+import asyncio
+from typing import Dict, List, Optional
+from models.data_models import Question, Response
+from services.ai_service import AIInterviewer, QuestionGenerationError, basic_evaluation, default_questions
+from services.telemetry import record_fallback
+
+class AsyncAIInterviewer:
+    """Async ``generate_questions``, ``score_response`` and ``evaluate_responses`` over an AIInterviewer"""
+
+    def __init__(self, interviewer: AIInterviewer):
+        self.interviewer = interviewer
+
+    @property
+    def model_name(self) -> str:
+        return self.interviewer.model_name
+
+    async def generate_questions(self, candidate_background: str = '') -> List[Question]:
+        """Six questions: personalized when the model delivers, otherwise the fallback set"""
+        try:
+            return await self.request_questions(candidate_background)
+        except QuestionGenerationError:
+            record_fallback('questions', 'invalid_output')
+        except Exception as e:
+            record_fallback('questions', type(e).__name__)
+        return await self.fallback_questions()
+
+    async def request_questions(self, candidate_background: str = '') -> List[Question]:
+        """Generate 6 questions or raise QuestionGenerationError"""
+        return await self.interviewer.request_questions_async(candidate_background)
+
+    async def fallback_questions(self) -> List[Question]:
+        """A question set sampled from the bank, or the built-in one while the bank is too small"""
+        # The bank is SQLite-backed
+        banked = await asyncio.to_thread(self.interviewer.bank_question_set)
+        return banked or default_questions()
+
+    async def score_response(self, response: Response) -> Dict:
+        """Score a single answer; raises on failure like ``AIInterviewer.score_response``"""
+        return await self.interviewer.score_response_async(response)
+
+    async def evaluate_responses(self, responses: List[Response], answer_scores: Optional[Dict[int, Dict]] = None,
+                                 use_cache: bool = True) -> Dict:
+        """``AIInterviewer.evaluate_responses``; the basic evaluation replaces Streamlit warnings"""
+        if not responses:
+            return basic_evaluation([])
+        try:
+            evaluation, _ = await self.interviewer.evaluate_async(responses, answer_scores, use_cache)
+            return evaluation
+        except ValueError:
+            record_fallback('evaluation', 'invalid_output')
+        except Exception as e:
+            record_fallback('evaluation', type(e).__name__)
+        return await asyncio.to_thread(basic_evaluation, responses)
@@ -0,0 +1,228 @@
+"""Server-side context caching of the fixed prompt prefix of each call type"""
+# Evaluation and question-generation prompts open with a long block that never changes:
+# rubric, JSON template, requirements. ``GenerationSettings.static_prefix`` marks that
+# block. GeminiBackend stores it once per model as cached content
+# (``genai.caching.CachedContent``) and sends only the per-candidate rest, so the prefix is
+# neither re-uploaded nor billed at the full input rate on every call.
+# Nothing here blocks a request: a missing entry is created in the background while the request
+# sends its prefix inline, and a background thread extends entries still in use before they
+# expire. When caching is unavailable (the model does not support it, the prefix is below the API
+# minimum, quota) the prefix keeps going inline and the entry is retried after ``retry_after``.
+# AI_INTERVIEWER_PROMPT_CACHE=0 turns caching off; AI_INTERVIEWER_PROMPT_CACHE_MIN_TOKENS sets the
+# size below which it is not attempted.
+import hashlib
+import logging
+import math
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from datetime import timedelta
+from typing import Any, Callable, Dict, Optional, Tuple
+from services.prompt_builder import estimate_text_tokens
+from services.rate_limiter import error_status
+from services.telemetry import PROMPT_CACHE_EVENTS
+
+PROMPT_CACHE_ENV = 'AI_INTERVIEWER_PROMPT_CACHE'
+PROMPT_CACHE_MIN_TOKENS_ENV = 'AI_INTERVIEWER_PROMPT_CACHE_MIN_TOKENS'
+
+# What a request against cached content gets once that content has expired, been
+# deleted, or is not visible to the calling key
+CACHE_ERROR_STATUS_CODES = frozenset({403, 404})
+
+logger = logging.getLogger(__name__)
+
+# Entries are created and refreshed off the request path
+_cache_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='prompt-cache')
+
+def _create_cached_model(model_name: str, prefix: str, ttl: float) -> Tuple[Any, Any]:
+    """(GenerativeModel bound to the cached prefix, CachedContent)"""
+    import google.generativeai as genai
+    cached = genai.caching.CachedContent.create(
+        model=model_name,
+        display_name=f"ai-interviewer-{hashlib.sha256(prefix.encode('utf-8')).hexdigest()[:12]}",
+        contents=[prefix],
+        ttl=timedelta(seconds=ttl)
+    )
+    return genai.GenerativeModel.from_cached_content(cached), cached
+
+def _extend_cached(cached: Any, ttl: float) -> None:
+    cached.update(ttl=timedelta(seconds=ttl))
+
+def is_cache_error(error: Exception) -> bool:
+    """Whether a request sent against cached content failed because that content is gone or unusable"""
+    return error_status(error) in CACHE_ERROR_STATUS_CODES
+
+@dataclass
+class _Entry:
+    # 'creating', 'ready' or 'failed'
+    state: str
+    model: Any = None
+    cached: Any = None
+    # monotonic times
+    expires_at: float = 0.0
+    last_used: float = 0.0
+    retry_at: float = 0.0
+
+class PromptCacheMetrics:
+    """How requests with a static prefix were sent, and the prompt tokens served from cache"""
+
+    FIELDS = ('cached_requests', 'inline_requests', 'created', 'refreshed', 'failed',
+              'prompt_tokens', 'cached_tokens')
+
+    def __init__(self):
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+        self._lock = threading.Lock()
+
+    def add(self, **increments: int) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                self._counts[name] += value
+
+    def snapshot(self) -> Dict[str, float]:
+        """Counts plus cached_share (cached / prompt tokens of requests with a static prefix)"""
+        with self._lock:
+            counts = dict(self._counts)
+        counts['requests'] = counts['cached_requests'] + counts['inline_requests']
+        counts['cached_share'] = counts['cached_tokens'] / counts['prompt_tokens'] if counts['prompt_tokens'] else 0.0
+        return counts
+
+_metrics = PromptCacheMetrics()
+
+def prompt_cache_metrics() -> Dict[str, float]:
+    return _metrics.snapshot()
+
+def record_prefix_usage(prompt_tokens: Optional[int], cached_tokens: Optional[int]) -> None:
+    """Token usage of one request that had a static prefix"""
+    _metrics.add(prompt_tokens=prompt_tokens or 0, cached_tokens=cached_tokens or 0,
+                 **{'cached_requests' if cached_tokens else 'inline_requests': 1})
+
+class PromptCache:
+    """Cached content per (model, prefix) for one API key, created and kept alive in the background"""
+
+    def __init__(self, ttl: float = 3600.0, refresh_margin: float = 300.0, min_tokens: int = 1024,
+                 retry_after: float = 1800.0,
+                 create: Callable[[str, str, float], Tuple[Any, Any]] = _create_cached_model,
+                 extend: Callable[[Any, float], None] = _extend_cached):
+        self.ttl = ttl
+        # Entries used within the last ``ttl`` are extended this long before they expire
+        self.refresh_margin = refresh_margin
+        self.min_tokens = min_tokens
+        self.retry_after = retry_after
+        self._create = create
+        self._extend = extend
+        self._entries: Dict[Tuple[str, str], _Entry] = {}
+        self._lock = threading.Lock()
+        self._refresher: Optional[threading.Thread] = None
+
+    @staticmethod
+    def _key(model_name: str, prefix: str) -> Tuple[str, str]:
+        return model_name, hashlib.sha256(prefix.encode('utf-8')).hexdigest()
+
+    def model_for(self, model_name: str, prefix: str) -> Optional[Any]:
+        """Model bound to the cached ``prefix``, or None to send the prefix inline this time"""
+        key = self._key(model_name, prefix)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry.state == 'ready' and entry.expires_at > now + 5:
+                entry.last_used = now
+                PROMPT_CACHE_EVENTS.inc(event='hit')
+                return entry.model
+            PROMPT_CACHE_EVENTS.inc(event='inline')
+            if entry is not None and (entry.state == 'creating' or entry.retry_at > now):
+                return None
+            if estimate_text_tokens(prefix) < self.min_tokens:
+                # Below the API minimum: creating it would only fail
+                self._entries[key] = _Entry('failed', retry_at=math.inf)
+                PROMPT_CACHE_EVENTS.inc(event='too_small')
+                return None
+            self._entries[key] = _Entry('creating', last_used=now)
+        _cache_pool.submit(self._create_entry, key, model_name, prefix)
+        return None
+
+    def invalidate(self, model_name: str, prefix: str) -> None:
+        """Forget an entry the API no longer accepts; the next request recreates it"""
+        with self._lock:
+            self._entries.pop(self._key(model_name, prefix), None)
+
+    def _create_entry(self, key: Tuple[str, str], model_name: str, prefix: str) -> None:
+        try:
+            model, cached = self._create(model_name, prefix, self.ttl)
+        except Exception as e:
+            logger.warning('Prompt cache unavailable for %s: %s', model_name, str(e)[:200])
+            with self._lock:
+                self._entries[key] = _Entry('failed', retry_at=time.monotonic() + self.retry_after)
+            _metrics.add(failed=1)
+            PROMPT_CACHE_EVENTS.inc(event='failed')
+            return
+
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.setdefault(key, _Entry('creating', last_used=now))
+            entry.state, entry.model, entry.cached = 'ready', model, cached
+            entry.expires_at = now + self.ttl
+            start_refresher = self._refresher is None
+            if start_refresher:
+                self._refresher = threading.Thread(target=self._refresh_loop, name='prompt-cache-refresh',
+                                                   daemon=True)
+        _metrics.add(created=1)
+        PROMPT_CACHE_EVENTS.inc(event='created')
+        if start_refresher:
+            self._refresher.start()
+
+    def _refresh_loop(self) -> None:
+        while True:
+            time.sleep(max(1.0, min(60.0, self.refresh_margin / 4)))
+            self.refresh()
+
+    def refresh(self) -> None:
+        """Extend entries used within the last ttl that expire within the refresh margin; drop the rest"""
+        now = time.monotonic()
+        with self._lock:
+            due = [
+                (key, entry) for key, entry in self._entries.items()
+                if entry.state == 'ready' and entry.expires_at - now < self.refresh_margin
+            ]
+        for key, entry in due:
+            if now - entry.last_used > self.ttl:
+                # Unused: let it expire on the server
+                with self._lock:
+                    if self._entries.get(key) is entry:
+                        del self._entries[key]
+                continue
+            try:
+                self._extend(entry.cached, self.ttl)
+            except Exception as e:
+                logger.warning('Prompt cache refresh failed: %s', str(e)[:200])
+                PROMPT_CACHE_EVENTS.inc(event='refresh_failed')
+                if entry.expires_at <= time.monotonic():
+                    self._drop(key, entry)
+                continue
+            with self._lock:
+                entry.expires_at = time.monotonic() + self.ttl
+            _metrics.add(refreshed=1)
+            PROMPT_CACHE_EVENTS.inc(event='refreshed')
+
+    def _drop(self, key: Tuple[str, str], entry: _Entry) -> None:
+        with self._lock:
+            if self._entries.get(key) is entry:
+                del self._entries[key]
+
+def prompt_cache_enabled() -> bool:
+    return os.environ.get(PROMPT_CACHE_ENV, '1').lower() not in ('0', 'false', 'no')
+
+_caches: Dict[str, PromptCache] = {}
+_caches_lock = threading.Lock()
+
+def get_prompt_cache(key_hash: str) -> Optional[PromptCache]:
+    """Process-wide prompt cache for an API key, or None when caching is turned off"""
+    if not prompt_cache_enabled():
+        return None
+    with _caches_lock:
+        cache = _caches.get(key_hash)
+        if cache is None:
+            cache = PromptCache(min_tokens=int(os.environ.get(PROMPT_CACHE_MIN_TOKENS_ENV, '1024')))
+            _caches[key_hash] = cache
+        return cache
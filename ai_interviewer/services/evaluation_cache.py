@@ -0,0 +1,90 @@
+import copy
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, List, Optional
+from models.data_models import Response
+from utils.storage import connect_sqlite, data_path
+
+class EvaluationCache:
+    """Two-tier (in-memory LRU + SQLite) cache of evaluations keyed by their inputs"""
+
+    def __init__(self, db_path: Optional[str] = None, max_entries: int = 256):
+        self.db_path = db_path or data_path('evaluations.sqlite3')
+        self.max_entries = max_entries
+        self._memory: 'OrderedDict[str, Dict]' = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(self.db_path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS evaluations ('
+            ' key TEXT PRIMARY KEY,'
+            ' model_name TEXT NOT NULL,'
+            ' evaluation TEXT NOT NULL,'
+            ' created_at REAL NOT NULL)'
+        )
+        self._conn.commit()
+
+    @staticmethod
+    def make_key(responses: List[Response], model_name: str, prompt_version: str) -> str:
+        """Content hash of everything that goes into an evaluation prompt"""
+        payload = {
+            'model': model_name,
+            'prompt_version': prompt_version,
+            'responses': [
+                [r.question_id, r.question, r.category, r.answer, round(r.time_taken, 1)]
+                for r in responses
+            ],
+        }
+        encoded = json.dumps(payload, sort_keys=True, ensure_ascii=False).encode('utf-8')
+        return hashlib.sha256(encoded).hexdigest()
+
+    def get(self, key: str) -> Optional[Dict]:
+        """Return a copy of the cached evaluation, promoting disk hits to memory"""
+        with self._lock:
+            evaluation = self._memory.get(key)
+            if evaluation is not None:
+                self._memory.move_to_end(key)
+                return copy.deepcopy(evaluation)
+
+            row = self._conn.execute('SELECT evaluation FROM evaluations WHERE key = ?', (key,)).fetchone()
+            if row is None:
+                return None
+
+            evaluation = json.loads(row[0])
+            self._remember(key, evaluation)
+            return copy.deepcopy(evaluation)
+
+    def put(self, key: str, model_name: str, evaluation: Dict) -> None:
+        """Store an evaluation in both tiers"""
+        evaluation = copy.deepcopy(evaluation)
+        with self._lock:
+            self._remember(key, evaluation)
+            self._conn.execute(
+                'INSERT OR REPLACE INTO evaluations (key, model_name, evaluation, created_at) VALUES (?, ?, ?, ?)',
+                (key, model_name, json.dumps(evaluation, ensure_ascii=False), time.time()),
+            )
+            self._conn.commit()
+
+    def _remember(self, key: str, evaluation: Dict) -> None:
+        self._memory[key] = evaluation
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+_default_cache: Optional[EvaluationCache] = None
+_default_lock = threading.Lock()
+
+def get_evaluation_cache() -> EvaluationCache:
+    """Process-wide evaluation cache shared by every session"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            try:
+                _default_cache = EvaluationCache()
+            except (OSError, sqlite3.Error):
+                # Read-only or missing data directory: keep the cache for this process only
+                _default_cache = EvaluationCache(db_path=':memory:')
+        return _default_cache
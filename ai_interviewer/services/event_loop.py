@@ -0,0 +1,34 @@
+"""One long-lived event loop for coroutines started from synchronous code"""
+# google-generativeai caches its grpc_asyncio client per process and per model, bound to the loop
+# of the first async call. ``asyncio.run`` per call would leave every later call on a client whose
+# loop is closed, so sync callers (the Streamlit script, worker threads) submit their coroutines
+# to this loop instead; it runs on a daemon thread for the life of the process.
+import asyncio
+import threading
+from typing import Awaitable, Optional, TypeVar
+
+T = TypeVar('T')
+
+_loop: Optional[asyncio.AbstractEventLoop] = None
+_loop_lock = threading.Lock()
+
+def background_loop() -> asyncio.AbstractEventLoop:
+    """The process-wide background loop, started on first use"""
+    global _loop
+    with _loop_lock:
+        if _loop is None:
+            loop = asyncio.new_event_loop()
+            threading.Thread(target=loop.run_forever, name='async-calls', daemon=True).start()
+            _loop = loop
+        return _loop
+
+def run_coroutine(coroutine: Awaitable[T]) -> T:
+    """Run ``coroutine`` on the background loop and block until it finishes"""
+    # If the caller is interrupted (e.g. a Streamlit rerun stops the script), the coroutine is
+    # cancelled rather than left running.
+    future = asyncio.run_coroutine_threadsafe(coroutine, background_loop())
+    try:
+        return future.result()
+    except BaseException:
+        future.cancel()
+        raise
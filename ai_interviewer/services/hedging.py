@@ -0,0 +1,113 @@
+"""Hedged LLM requests: race a second model when the first one is slower than usual"""
+# The primary request starts immediately. If it has not produced a usable answer by the primary
+# model's recent latency percentile, a duplicate goes to a hedge model and the first response that
+# parses wins; the other request is cancelled. Opt in with AI_INTERVIEWER_HEDGE=1
+# (AI_INTERVIEWER_HEDGE_PERCENTILE tunes the trigger).
+import asyncio
+import os
+import threading
+import time
+from dataclasses import dataclass
+from typing import Awaitable, Callable, Dict, Optional, TypeVar
+from services.model_router import get_model_router
+
+T = TypeVar('T')
+
+HEDGE_ENV = 'AI_INTERVIEWER_HEDGE'
+HEDGE_PERCENTILE_ENV = 'AI_INTERVIEWER_HEDGE_PERCENTILE'
+
+@dataclass
+class HedgePolicy:
+    # Hedge once the primary is slower than this percentile of its recent latencies
+    percentile: float = 90.0
+    # Delay used until a model has ``min_samples`` recorded latencies
+    default_delay: float = 8.0
+    min_delay: float = 1.0
+    min_samples: int = 20
+
+def hedge_policy_from_env() -> Optional[HedgePolicy]:
+    """A HedgePolicy when AI_INTERVIEWER_HEDGE is set, otherwise None (no hedging)"""
+    if os.environ.get(HEDGE_ENV, '').lower() not in ('1', 'true', 'yes'):
+        return None
+    return HedgePolicy(percentile=float(os.environ.get(HEDGE_PERCENTILE_ENV, '90')))
+
+class HedgeMetrics:
+    """Counters for tuning the extra cost of hedging"""
+
+    FIELDS = ('requests', 'hedged', 'primary_wins', 'hedge_wins', 'failed', 'cancelled')
+
+    def __init__(self):
+        self._counts = dict.fromkeys(self.FIELDS, 0)
+        self._lock = threading.Lock()
+
+    def add(self, **increments: int) -> None:
+        with self._lock:
+            for name, value in increments.items():
+                self._counts[name] += value
+
+    def snapshot(self) -> Dict[str, float]:
+        """Counts plus hedge_rate (hedged / requests) and hedge_win_rate (hedge wins / hedged)"""
+        with self._lock:
+            counts = dict(self._counts)
+        counts['hedge_rate'] = counts['hedged'] / counts['requests'] if counts['requests'] else 0.0
+        counts['hedge_win_rate'] = counts['hedge_wins'] / counts['hedged'] if counts['hedged'] else 0.0
+        return counts
+
+_metrics = HedgeMetrics()
+
+def hedge_delay(model_name: str, policy: HedgePolicy, kind: str = 'default') -> float:
+    """Seconds to wait for ``model_name`` before hedging, from its recent latencies for ``kind``"""
+    delay = get_model_router().percentile(model_name, policy.percentile, policy.min_samples, kind)
+    return max(policy.min_delay, policy.default_delay if delay is None else delay)
+
+def hedge_metrics() -> Dict[str, float]:
+    return _metrics.snapshot()
+
+async def _timed(model_name: str, kind: str, attempt: Callable[[], Awaitable[T]]) -> T:
+    started = time.monotonic()
+    try:
+        result = await attempt()
+    except Exception:  # A cancelled loser raises CancelledError, which is not counted as a failure
+        get_model_router().record_failure(model_name)
+        raise
+    get_model_router().record_success(model_name, time.monotonic() - started, kind)
+    return result
+
+async def hedged_race(primary_name: str, primary: Callable[[], Awaitable[T]],
+                      hedge_name: Optional[str], hedge: Optional[Callable[[], Awaitable[T]]],
+                      policy: HedgePolicy, kind: str = 'default') -> T:
+    """Result of the first attempt to succeed; ``primary``/``hedge`` must parse as well as call"""
+    # The hedge starts after the primary's hedge delay, or at once if the primary fails before
+    # that. Whatever is still running when a result is accepted is cancelled.
+    _metrics.add(requests=1)
+    tasks = {asyncio.ensure_future(_timed(primary_name, kind, primary)): 'primary'}
+    delay = hedge_delay(primary_name, policy, kind)
+    hedge_started = hedge is None
+    last_error: Optional[BaseException] = None
+
+    try:
+        while tasks:
+            timeout = None if hedge_started else delay
+            done, _ = await asyncio.wait(tasks, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                role = tasks.pop(task)
+                if task.exception() is not None:
+                    last_error = task.exception()
+                    continue
+                _metrics.add(**{f'{role}_wins': 1})
+                return task.result()
+
+            # Primary is slow (timeout) or failed early: bring in the hedge
+            if not hedge_started and (not done or not tasks):
+                hedge_started = True
+                _metrics.add(hedged=1)
+                tasks[asyncio.ensure_future(_timed(hedge_name, kind, hedge))] = 'hedge'
+
+        _metrics.add(failed=1)
+        raise last_error
+    finally:
+        for task in tasks:
+            task.cancel()
+        if tasks:
+            _metrics.add(cancelled=len(tasks))
+            await asyncio.gather(*tasks, return_exceptions=True)
@@ -0,0 +1,207 @@
+"""Headless interviews driven entirely from one asyncio event loop"""
+# InterviewService holds the live state of every interview the process is running: its questions,
+# answers, background scoring tasks and final evaluation. It is what the HTTP API in api_server.py
+# serves; progress is written through the shared SessionStore, so an interview evicted from memory
+# (or started by another worker) can be picked up again.
+import asyncio
+import time
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+from models.data_models import NO_ANSWER, Question, Response, ResponseLog
+from services.async_interviewer import AsyncAIInterviewer
+from services.session_store import SessionStore, get_session_store
+from services.telemetry import record_fallback
+
+def question_to_dict(question: Question) -> Dict:
+    """JSON-ready question; much cheaper than dataclasses.asdict, which deep-copies every field"""
+    return {'id': question.id, 'text': question.text, 'category': question.category,
+            'difficulty': question.difficulty}
+
+class InterviewStateError(Exception):
+    """Request that does not fit the interview's current phase, e.g. results before the last answer"""
+
+class UnknownInterviewError(KeyError):
+    """No interview with this id in memory or in the session store"""
+
+@dataclass
+class InterviewSession:
+    """One candidate's interview; the fields named in SESSION_FIELDS are what gets persisted"""
+
+    session_id: str
+    candidate_name: str
+    questions: List[Question]
+    responses: ResponseLog = field(default_factory=ResponseLog)
+    current_question: int = 0
+    phase: str = 'interview'
+    start_time: float = field(default_factory=time.time)
+    question_start_time: float = field(default_factory=time.time)
+    score_tasks: Dict[int, asyncio.Task] = field(default_factory=dict, repr=False)
+    evaluation: Optional[Dict] = None
+    evaluation_task: Optional[asyncio.Task] = field(default=None, repr=False)
+
+    def get(self, key: str, default=None):
+        """Mapping-style read, so SessionStore.save_session takes the session like st.session_state"""
+        return getattr(self, key, default)
+
+    def question(self, question_id: int) -> Optional[Question]:
+        return next((q for q in self.questions if q.id == question_id), None)
+
+    def to_dict(self) -> Dict:
+        """JSON-ready view for API clients"""
+        return {
+            'session_id': self.session_id,
+            'candidate_name': self.candidate_name,
+            'phase': self.phase,
+            'current_question': self.current_question,
+            'questions': [question_to_dict(q) for q in self.questions],
+            'answered': [r.question_id for r in self.responses],
+            'start_time': self.start_time,
+            'question_start_time': self.question_start_time,
+        }
+
+class InterviewService:
+    """Setup, question delivery, answer submission and results for many concurrent interviews"""
+    # Every method is a coroutine meant for a single event loop; per-answer scoring runs as tasks
+    # on that loop while the candidate moves on. At most ``max_sessions`` interviews stay in
+    # memory, least recently used first out.
+
+    def __init__(self, interviewer: AsyncAIInterviewer, store: Optional[SessionStore] = None,
+                 max_sessions: int = 10000, score_timeout: float = 15.0):
+        self.interviewer = interviewer
+        self.store = store or get_session_store()
+        self.max_sessions = max_sessions
+        self.score_timeout = score_timeout
+        self._sessions: 'OrderedDict[str, InterviewSession]' = OrderedDict()
+
+    async def start(self, candidate_name: str, background: str = '') -> InterviewSession:
+        """Create an interview with six questions, personalized when ``background`` is given"""
+        candidate_name = candidate_name.strip()
+        if not candidate_name:
+            raise ValueError('candidate_name is required')
+        if background.strip():
+            questions = await self.interviewer.generate_questions(background)
+        else:
+            questions = await self.interviewer.fallback_questions()
+
+        session = InterviewSession(self.store.new_session_id(), candidate_name, questions)
+        self._remember(session)
+        self.store.save_session(session.session_id, session)
+        return session
+
+    async def get(self, session_id: str) -> InterviewSession:
+        """A live interview, reloaded from the session store when it is not in memory"""
+        session = self._sessions.get(session_id)
+        if session is not None:
+            self._sessions.move_to_end(session_id)
+            return session
+
+        saved = await asyncio.to_thread(self.store.load_session, session_id)
+        if saved is None:
+            raise UnknownInterviewError(session_id)
+        session = InterviewSession(
+            session_id=session_id,
+            candidate_name=saved['candidate_name'] or '',
+            questions=saved['questions'],
+            responses=saved['responses'],
+            current_question=saved['current_question'] or 0,
+            phase=saved['phase'] or 'interview',
+            start_time=saved['start_time'] or time.time(),
+            question_start_time=saved['question_start_time'] or time.time(),
+        )
+        # Live again in memory by the time the load returns: keep the first copy
+        return self._remember(session)
+
+    async def answer(self, session_id: str, question_id: int, answer: str,
+                     time_taken: Optional[float] = None) -> InterviewSession:
+        """Record or replace an answer and start scoring it in the background"""
+        session = await self.get(session_id)
+        if session.phase != 'interview':
+            raise InterviewStateError(f'Interview is in the {session.phase} phase')
+        question = session.question(question_id)
+        if question is None:
+            raise ValueError(f'Unknown question id {question_id}')
+
+        now = time.time()
+        response = Response(
+            question_id=question.id,
+            question=question.text,
+            category=question.category,
+            answer=answer.strip() or NO_ANSWER,
+            time_taken=max(0.0, now - session.question_start_time) if time_taken is None else float(time_taken)
+        )
+        previous = session.responses.get(question.id)
+        session.responses.upsert(response)
+        self.store.save_response(session_id, response)
+
+        if previous is None or previous.answer != response.answer:
+            task = session.score_tasks.pop(question.id, None)
+            if task is not None:
+                task.cancel()
+            task = asyncio.ensure_future(self.interviewer.score_response(response))
+            # Failures are handled when the scores are collected
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            session.score_tasks[question.id] = task
+
+        position = session.questions.index(question)
+        if position >= session.current_question:
+            session.current_question = min(position + 1, len(session.questions) - 1)
+            session.question_start_time = now
+        if len(session.responses) >= len(session.questions):
+            session.phase = 'results'
+        self.store.save_session(session_id, session)
+        return session
+
+    async def results(self, session_id: str) -> Dict:
+        """The final evaluation, computed once per interview and saved for analytics"""
+        session = await self.get(session_id)
+        if session.phase != 'results':
+            raise InterviewStateError(
+                f'{len(session.responses)} of {len(session.questions)} questions answered'
+            )
+        if session.evaluation is not None:
+            return session.evaluation
+        if session.evaluation_task is None:
+            session.evaluation_task = asyncio.ensure_future(self._evaluate(session))
+        # Shielded: a client disconnecting must not cancel the evaluation others wait for
+        return await asyncio.shield(session.evaluation_task)
+
+    async def _evaluate(self, session: InterviewSession) -> Dict:
+        answer_scores = await self._collect_scores(session)
+        responses = list(session.responses)
+        evaluation = await self.interviewer.evaluate_responses(responses, answer_scores=answer_scores)
+        session.evaluation = evaluation
+        self.store.save_evaluation(session.session_id, evaluation, session.questions, responses, answer_scores)
+        return evaluation
+
+    async def _collect_scores(self, session: InterviewSession) -> Optional[Dict[int, Dict]]:
+        """Background scores of every answer, or None to grade the whole transcript instead"""
+        tasks = [session.score_tasks.get(r.question_id) for r in session.responses]
+        if any(task is None for task in tasks):
+            record_fallback('answer_scores', 'missing')
+            return None
+
+        done, pending = await asyncio.wait(tasks, timeout=self.score_timeout)
+        if pending:
+            record_fallback('answer_scores', 'timeout')
+            return None
+        if any(task.cancelled() or task.exception() is not None for task in done):
+            # Drop the failed tasks so the answer is scored again if it is resubmitted
+            for question_id in [qid for qid, t in session.score_tasks.items()
+                                if t.cancelled() or t.exception() is not None]:
+                del session.score_tasks[question_id]
+            record_fallback('answer_scores', 'failed')
+            return None
+        return {r.question_id: session.score_tasks[r.question_id].result() for r in session.responses}
+
+    def _remember(self, session: InterviewSession) -> InterviewSession:
+        existing = self._sessions.setdefault(session.session_id, session)
+        self._sessions.move_to_end(session.session_id)
+        while len(self._sessions) > self.max_sessions:
+            _, evicted = self._sessions.popitem(last=False)
+            for task in evicted.score_tasks.values():
+                task.cancel()
+        return existing
+
+    def __len__(self) -> int:
+        return len(self._sessions)
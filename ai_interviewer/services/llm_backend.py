@@ -0,0 +1,325 @@
+import asyncio
+import json
+import os
+import random
+import threading
+import time
+import dataclasses
+from dataclasses import dataclass, field
+from typing import Any, Dict, Iterator, Optional, Protocol, Tuple
+from services.context_cache import is_cache_error, record_prefix_usage
+
+@dataclass
+class GenerationSettings:
+    temperature: float = 0.7
+    max_output_tokens: int = 1024
+    top_p: float = 0.9
+    # JSON mode: e.g. "application/json" plus an OpenAPI-style schema dict
+    response_mime_type: Optional[str] = None
+    response_schema: Optional[Dict[str, Any]] = None
+    # Fixed text sent before the prompt; GeminiBackend keeps it in cached content when it can
+    static_prefix: Optional[str] = None
+
+@dataclass
+class LLMResponse:
+    text: str
+    prompt_tokens: Optional[int] = None
+    output_tokens: Optional[int] = None
+    # Part of prompt_tokens served from cached content
+    cached_tokens: Optional[int] = None
+
+    @property
+    def total_tokens(self) -> Optional[int]:
+        if self.prompt_tokens is None or self.output_tokens is None:
+            return None
+        return self.prompt_tokens + self.output_tokens
+
+class LLMBackend(Protocol):
+    """What AIInterviewer needs from a model: one generate call in sync, async and streaming form"""
+
+    model_name: str
+    # Whether calls should go through the shared per-model quota limiter
+    rate_limited: bool
+
+    def generate(self, prompt: str, settings: GenerationSettings, timeout: float, stream: bool = False):
+        """Return an LLMResponse, or an iterator of text chunks when ``stream`` is True"""
+        ...
+
+    async def generate_async(self, prompt: str, settings: GenerationSettings, timeout: float) -> LLMResponse:
+        ...
+
+    def count_tokens(self, text: str, timeout: float) -> int:
+        """Prompt tokens ``text`` costs on this model"""
+        ...
+
+class GeminiBackend:
+    """google-generativeai GenerativeModel behind the LLMBackend protocol"""
+    # With a ``prompt_cache``, a request's ``static_prefix`` is sent as cached content once the
+    # cache holds it, and inline until then or whenever caching is unavailable.
+
+    rate_limited = True
+
+    def __init__(self, model, model_name: str, prompt_cache=None):
+        self.model = model
+        self.model_name = model_name
+        self.prompt_cache = prompt_cache
+
+    def generate(self, prompt: str, settings: GenerationSettings, timeout: float, stream: bool = False):
+        model, contents = self._request(prompt, settings)
+        try:
+            response = model.generate_content(
+                contents,
+                generation_config=self._config(settings),
+                stream=stream,
+                request_options={'timeout': timeout}
+            )
+        except Exception as e:
+            if model is self.model or not is_cache_error(e):
+                raise
+            # Cached content expired or was deleted server-side: this request goes inline
+            self.prompt_cache.invalidate(self.model_name, settings.static_prefix)
+            return self.generate(prompt, settings, timeout, stream)
+        if stream:
+            return (text for text in (_chunk_text(chunk) for chunk in response) if text)
+        return self._to_response(response, settings)
+
+    async def generate_async(self, prompt: str, settings: GenerationSettings, timeout: float) -> LLMResponse:
+        model, contents = self._request(prompt, settings)
+        try:
+            response = await model.generate_content_async(
+                contents,
+                generation_config=self._config(settings),
+                request_options={'timeout': timeout}
+            )
+        except Exception as e:
+            if model is self.model or not is_cache_error(e):
+                raise
+            self.prompt_cache.invalidate(self.model_name, settings.static_prefix)
+            return await self.generate_async(prompt, settings, timeout)
+        return self._to_response(response, settings)
+
+    def _request(self, prompt: str, settings: GenerationSettings):
+        """Model to call and the text to send: the prompt alone when its prefix is cached"""
+        if not settings.static_prefix:
+            return self.model, prompt
+        cached_model = None
+        if self.prompt_cache is not None:
+            cached_model = self.prompt_cache.model_for(self.model_name, settings.static_prefix)
+        if cached_model is None:
+            return self.model, settings.static_prefix + prompt
+        return cached_model, prompt
+
+    def count_tokens(self, text: str, timeout: float) -> int:
+        return self.model.count_tokens(text, request_options={'timeout': timeout}).total_tokens
+
+    def _config(self, settings: GenerationSettings):
+        import google.generativeai as genai
+        config = dict(
+            temperature=settings.temperature,
+            max_output_tokens=settings.max_output_tokens,
+            top_p=settings.top_p
+        )
+        if settings.response_mime_type:
+            config['response_mime_type'] = settings.response_mime_type
+        if settings.response_schema is not None:
+            config['response_schema'] = settings.response_schema
+        return genai.types.GenerationConfig(**config)
+
+    @staticmethod
+    def _to_response(response, settings: GenerationSettings) -> LLMResponse:
+        usage = getattr(response, 'usage_metadata', None)
+        result = LLMResponse(
+            text=_chunk_text(response) if response else '',
+            prompt_tokens=getattr(usage, 'prompt_token_count', None),
+            output_tokens=getattr(usage, 'candidates_token_count', None),
+            cached_tokens=getattr(usage, 'cached_content_token_count', None)
+        )
+        if settings.static_prefix:
+            record_prefix_usage(result.prompt_tokens, result.cached_tokens)
+        return result
+
+def _chunk_text(chunk) -> str:
+    """Text of a response or streamed chunk; chunks carrying only metadata have none"""
+    try:
+        return chunk.text or ''
+    except ValueError:
+        return ''
+
+class SimulatedBackendError(Exception):
+    """Failure injected by SimulatedBackend; ``code`` is the HTTP status, like google.api_core's errors"""
+
+    def __init__(self, message: str, code: int):
+        super().__init__(message)
+        self.code = code
+
+@dataclass
+class LatencyModel:
+    """Log-normal latency around a median, with a floor; sigma=0 gives a constant latency"""
+
+    median: float = 1.0
+    sigma: float = 0.5
+    minimum: float = 0.0
+
+    def sample(self, rng: random.Random) -> float:
+        if self.median <= 0:
+            return self.minimum
+        return max(self.minimum, rng.lognormvariate(0.0, self.sigma) * self.median if self.sigma else self.median)
+
+def _default_payloads() -> Dict[str, str]:
+    questions = [
+        {'id': 1, 'text': 'Explain how a hash map handles collisions.', 'category': 'Technical', 'difficulty': 'Easy',
+         'reference_answer': 'A hash function maps keys to buckets; when two keys land in one bucket, chaining '
+                             'keeps a linked list per bucket and open addressing probes for the next free slot. '
+                             'Resizing at a load factor threshold keeps lookups O(1) on average.',
+         'key_concepts': ['hash function', 'bucket', 'chaining', 'open addressing', 'load factor']},
+        {'id': 2, 'text': 'What is the difference between a process and a thread?', 'category': 'Technical', 'difficulty': 'Medium',
+         'reference_answer': 'A process has its own address space and resources; threads run inside a process and '
+                             'share its memory, so they are cheaper to create and switch but need synchronization '
+                             'such as locks to avoid race conditions.',
+         'key_concepts': ['address space', 'shared memory', 'context switch', 'synchronization', 'race condition']},
+        {'id': 3, 'text': 'How would you reverse a linked list in place? Give the complexity.', 'category': 'Technical', 'difficulty': 'Medium',
+         'reference_answer': 'Walk the list with previous, current and next pointers, pointing each node back at the '
+                             'previous one; the old tail becomes the head. It takes O(n) time and O(1) extra space.',
+         'key_concepts': ['previous pointer', 'next pointer', 'head', 'O(n) time', 'O(1) space']},
+        {'id': 4, 'text': 'An API endpoint became 10x slower after a deploy. How do you find the cause?', 'category': 'Problem-Solving', 'difficulty': 'Medium',
+         'reference_answer': 'Compare metrics and traces before and after the deploy, diff the changes in that '
+                             'release, profile the endpoint, look for new slow database queries or external calls, '
+                             'and roll back if users are affected while the bottleneck is fixed.',
+         'key_concepts': ['metrics', 'diff', 'profile', 'database query', 'rollback', 'bottleneck']},
+        {'id': 5, 'text': 'Design a URL shortener that serves 10,000 requests per second.', 'category': 'Problem-Solving', 'difficulty': 'Hard',
+         'reference_answer': 'Generate a unique short key (base62 of a counter or a hash), store the key to URL '
+                             'mapping in a key-value database, serve redirects from a cache in front of it, and '
+                             'scale stateless servers horizontally behind a load balancer.',
+         'key_concepts': ['base62', 'hash', 'key-value store', 'cache', 'load balancer', 'redirect']},
+        {'id': 6, 'text': 'Tell me about a time you had to learn a new technology quickly.', 'category': 'Behavioral', 'difficulty': 'Easy',
+         'reference_answer': 'Describe the situation and why the technology was needed, how it was learned '
+                             '(documentation, small prototypes, asking experienced people), the result, and what '
+                             'the experience taught about learning.',
+         'key_concepts': ['situation', 'documentation', 'prototype', 'result', 'learned']},
+    ]
+    return {
+        'questions': json.dumps(questions, indent=2),
+        'score': json.dumps({'score': 72, 'communication_score': 78, 'strength': 'Clear structure',
+                             'improvement': 'Discuss edge cases'}),
+        'synthesis': json.dumps({'strengths': ['Clear explanations', 'Structured thinking'],
+                                 'improvements': ['More technical depth', 'Consider edge cases'],
+                                 'detailed_feedback': 'Solid intern-level performance with room to go deeper.',
+                                 'recommendation': 'Hire'}),
+        'evaluation': json.dumps({'technical_score': 74, 'communication_score': 80, 'problem_solving_score': 70,
+                                  'behavioral_score': 82, 'overall_score': 76,
+                                  'strengths': ['Clear explanations', 'Good examples'],
+                                  'improvements': ['More technical depth needed'],
+                                  'detailed_feedback': 'Solid intern-level performance with room to go deeper.',
+                                  'recommendation': 'Hire'}),
+        'default': 'OK',
+    }
+
+def classify_prompt(prompt: str) -> str:
+    """Which canned payload a prompt expects, based on the AIInterviewer prompt wording"""
+    if prompt.startswith('Repair this JSON'):
+        return 'questions' if prompt.startswith('Repair this JSON question set') else 'evaluation'
+    if 'Generate exactly' in prompt:
+        return 'questions'
+    if 'Score this answer' in prompt:
+        return 'score'
+    if 'already been graded' in prompt:
+        return 'synthesis'
+    if 'Evaluate this' in prompt:
+        return 'evaluation'
+    return 'default'
+
+@dataclass
+class SimulatedBackend:
+    """Offline backend with configurable latency, failures and canned JSON payloads"""
+    # Seeded, so a benchmark or load test run is reproducible. ``payloads`` maps a prompt kind
+    # from ``classify_prompt`` to the text returned for it (or to a callable taking the prompt).
+
+    model_name: str = 'simulated'
+    latency: LatencyModel = field(default_factory=LatencyModel)
+    failure_rate: float = 0.0
+    failure_message: str = '503 Service Unavailable (simulated)'
+    failure_code: int = 503
+    payloads: Dict[str, Any] = field(default_factory=_default_payloads)
+    stream_chunk_chars: int = 64
+    seed: Optional[int] = None
+    rate_limited: bool = False
+    # Report a request's static_prefix as served from cached content
+    cache_prefixes: bool = False
+    # Further model names served by copies of this simulator, so routing, failover and
+    # hedging have more than one model to choose from
+    replica_names: Tuple[str, ...] = ()
+
+    def __post_init__(self):
+        self._rng = random.Random(self.seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def generate(self, prompt: str, settings: GenerationSettings, timeout: float, stream: bool = False):
+        delay, fails = self._plan()
+        if stream:
+            return self._stream((settings.static_prefix or '') + prompt, delay, fails)
+
+        time.sleep(min(delay, timeout))
+        self._check(delay, timeout, fails)
+        return self._respond(prompt, settings)
+
+    async def generate_async(self, prompt: str, settings: GenerationSettings, timeout: float) -> LLMResponse:
+        delay, fails = self._plan()
+        await asyncio.sleep(min(delay, timeout))
+        self._check(delay, timeout, fails)
+        return self._respond(prompt, settings)
+
+    def for_model(self, model_name: str) -> 'SimulatedBackend':
+        """An independent copy of this simulator answering as ``model_name``"""
+        return dataclasses.replace(self, model_name=model_name, replica_names=(), seed=None)
+
+    def count_tokens(self, text: str, timeout: float) -> int:
+        # Same ~4 characters per token as the canned usage numbers; counting is not a generation
+        return len(text) // 4
+
+    def _plan(self):
+        with self._lock:
+            self.calls += 1
+            return self.latency.sample(self._rng), self._rng.random() < self.failure_rate
+
+    def _check(self, delay: float, timeout: float, fails: bool) -> None:
+        if delay > timeout:
+            raise SimulatedBackendError(f'504 Deadline Exceeded: timed out after {timeout}s (simulated)', 504)
+        if fails:
+            raise SimulatedBackendError(self.failure_message, self.failure_code)
+
+    def _respond(self, prompt: str, settings: Optional[GenerationSettings] = None) -> LLMResponse:
+        prefix = settings.static_prefix if settings is not None and settings.static_prefix else ''
+        prompt = prefix + prompt
+        payload = self.payloads.get(classify_prompt(prompt), self.payloads.get('default', 'OK'))
+        text = payload(prompt) if callable(payload) else payload
+        response = LLMResponse(text=text, prompt_tokens=len(prompt) // 4, output_tokens=len(text) // 4,
+                               cached_tokens=len(prefix) // 4 if self.cache_prefixes and prefix else None)
+        if prefix:
+            record_prefix_usage(response.prompt_tokens, response.cached_tokens)
+        return response
+
+    def _stream(self, prompt: str, delay: float, fails: bool) -> Iterator[str]:
+        text = self._respond(prompt).text
+        chunks = [text[i:i + self.stream_chunk_chars] for i in range(0, len(text), self.stream_chunk_chars)] or ['']
+        per_chunk = delay / len(chunks)
+        for i, chunk in enumerate(chunks):
+            time.sleep(per_chunk)
+            # Failures cut the stream halfway, like a dropped connection
+            if fails and i >= len(chunks) // 2:
+                raise SimulatedBackendError(self.failure_message, self.failure_code)
+            yield chunk
+
+BACKEND_ENV = 'AI_INTERVIEWER_BACKEND'
+
+def backend_from_env() -> Optional[LLMBackend]:
+    """A SimulatedBackend when AI_INTERVIEWER_BACKEND=simulated, otherwise None (use Gemini)"""
+    # AI_INTERVIEWER_SIM_LATENCY (median seconds) and AI_INTERVIEWER_SIM_FAILURE_RATE tune it. It
+    # also serves a "simulated-replica" model, so failover and hedging have a second model.
+    if os.environ.get(BACKEND_ENV, '').lower() != 'simulated':
+        return None
+    return SimulatedBackend(
+        latency=LatencyModel(median=float(os.environ.get('AI_INTERVIEWER_SIM_LATENCY', '1.0'))),
+        failure_rate=float(os.environ.get('AI_INTERVIEWER_SIM_FAILURE_RATE', '0.0')),
+        replica_names=('simulated-replica',),
+    )
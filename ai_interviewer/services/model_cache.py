@@ -0,0 +1,96 @@
+import hashlib
+import threading
+import time
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Optional
+from services.rate_limiter import error_status
+
+# Entries older than this are still served but revalidated in the background
+MODEL_CACHE_TTL = 30 * 60
+# Entries older than this are dropped and the model is resolved again
+MODEL_CACHE_MAX_AGE = 6 * 60 * 60
+# Not found, or no longer permitted for this key
+MODEL_UNAVAILABLE_STATUS_CODES = frozenset({403, 404})
+
+@dataclass
+class CachedModel:
+    model_name: str
+    model: Any
+    resolved_at: float
+
+_cache: Dict[str, CachedModel] = {}
+_revalidating = set()
+_lock = threading.Lock()
+
+def hash_api_key(api_key: str) -> str:
+    """Hash an API key so raw keys are never kept as cache keys"""
+    return hashlib.sha256(api_key.encode('utf-8')).hexdigest()
+
+def get_cached_model(key_hash: str, revalidate: Optional[Callable[[CachedModel], bool]] = None) -> Optional[CachedModel]:
+    """Return the cached model for an API key hash, revalidating stale entries in the background"""
+    now = time.monotonic()
+    with _lock:
+        entry = _cache.get(key_hash)
+        if entry is None:
+            return None
+
+        age = now - entry.resolved_at
+        if age > MODEL_CACHE_MAX_AGE:
+            del _cache[key_hash]
+            return None
+
+        start_revalidation = (
+            revalidate is not None
+            and age > MODEL_CACHE_TTL
+            and key_hash not in _revalidating
+        )
+        if start_revalidation:
+            _revalidating.add(key_hash)
+
+    if start_revalidation:
+        threading.Thread(
+            target=_revalidate,
+            args=(key_hash, entry, revalidate),
+            name='model-cache-revalidate',
+            daemon=True,
+        ).start()
+
+    return entry
+
+def store_model(key_hash: str, model_name: str, model: Any) -> CachedModel:
+    """Cache a resolved model for an API key hash"""
+    entry = CachedModel(model_name=model_name, model=model, resolved_at=time.monotonic())
+    with _lock:
+        _cache[key_hash] = entry
+    return entry
+
+def invalidate_model(key_hash: str) -> None:
+    """Drop the cached model for an API key hash"""
+    with _lock:
+        _cache.pop(key_hash, None)
+
+def clear_model_cache() -> None:
+    """Drop every cached model"""
+    with _lock:
+        _cache.clear()
+
+def is_model_unavailable_error(error: Exception) -> bool:
+    """Whether an error means the resolved model can no longer be used with this key"""
+    return error_status(error) in MODEL_UNAVAILABLE_STATUS_CODES
+
+def _revalidate(key_hash: str, entry: CachedModel, revalidate: Callable[[CachedModel], bool]) -> None:
+    try:
+        still_valid = revalidate(entry)
+    except Exception as e:
+        # Transient failures keep the entry as-is so the next access retries
+        still_valid = False if is_model_unavailable_error(e) else None
+
+    with _lock:
+        _revalidating.discard(key_hash)
+        # Only touch the entry we checked; a foreground resolve may have replaced it
+        if _cache.get(key_hash) is not entry:
+            return
+        if still_valid:
+            _cache[key_hash] = CachedModel(entry.model_name, entry.model, time.monotonic())
+        elif still_valid is False:
+            del _cache[key_hash]
@@ -0,0 +1,144 @@
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Any, Dict, List, Optional, Set
+from services.telemetry import PROBE_SECONDS, span
+
+# Model names based on current Gemini API documentation (September 2025), best first.
+# GenerativeModel adds the "models/" prefix itself, so prefixed aliases are not listed.
+MODEL_PREFERENCE = [
+    # Latest and most capable models
+    'gemini-2.5-pro',                    # Most powerful thinking model
+    'gemini-2.5-flash',                  # Best price-performance model
+    'gemini-2.5-flash-lite',             # Cost-efficient model
+
+    # Gemini 2.0 models
+    'gemini-2.0-flash',                  # Next-gen features
+    'gemini-2.0-flash-lite',             # Cost-efficient 2.0
+
+    # Gemini 1.5 models (deprecated but still available)
+    'gemini-1.5-flash',                  # Fast and versatile
+    'gemini-1.5-flash-8b',               # Smaller model (deprecated)
+    'gemini-1.5-pro',                    # Advanced reasoning (deprecated)
+]
+
+class ModelResolutionError(Exception):
+    """Raised when no candidate model answers before the deadline"""
+
+    def __init__(self, message: str, errors: Dict[str, str]):
+        super().__init__(message)
+        self.errors = errors
+
+@dataclass
+class ResolvedModel:
+    model_name: str
+    model: Any
+    elapsed: float
+    errors: Dict[str, str] = field(default_factory=dict)
+
+def probe_model(model, timeout: float = 15) -> bool:
+    """Check that a model exists and the key can use it, without paying for a generation"""
+    with span('model.probe', PROBE_SECONDS, model=_bare_name(str(getattr(model, 'model_name', '')))) as probe:
+        result = model.count_tokens('ping', request_options={'timeout': timeout})
+        answered = result is not None and getattr(result, 'total_tokens', 0) > 0
+        probe.set(answered=answered)
+        return answered
+
+def _bare_name(model_name: str) -> str:
+    return model_name[len('models/'):] if model_name.startswith('models/') else model_name
+
+class ModelResolver:
+    """Probe candidate models concurrently and pick the best-ranked one that answers"""
+    # Must be used after ``genai.configure`` has been called with the key to test.
+
+    def __init__(self, model_names: Optional[List[str]] = None, max_workers: int = 4,
+                 deadline: float = 20.0, probe_timeout: float = 15.0):
+        self.model_names = list(model_names or MODEL_PREFERENCE)
+        self.max_workers = max_workers
+        self.deadline = deadline
+        self.probe_timeout = probe_timeout
+
+    def available_models(self) -> Optional[Set[str]]:
+        """Names of models that support generation for this key, or None if listing fails"""
+        import google.generativeai as genai
+        try:
+            return {
+                _bare_name(m.name)
+                for m in genai.list_models(request_options={'timeout': self.probe_timeout})
+                if 'generateContent' in getattr(m, 'supported_generation_methods', [])
+            }
+        except Exception:
+            return None
+
+    def resolve(self) -> ResolvedModel:
+        """Return the best-ranked model that answers a probe within the deadline"""
+        started = time.monotonic()
+        errors: Dict[str, str] = {}
+
+        # One list_models call prunes candidates that do not exist for this key
+        candidates = self.model_names
+        available = self.available_models()
+        if available is not None:
+            candidates = [name for name in candidates if _bare_name(name) in available]
+            for name in self.model_names:
+                if name not in candidates:
+                    errors[name] = 'not listed for this API key'
+
+        if not candidates:
+            raise ModelResolutionError('No candidate Gemini model is available for this API key', errors)
+
+        import google.generativeai as genai
+        models = [genai.GenerativeModel(name) for name in candidates]
+        # None = still probing, True = answered, False = failed
+        outcomes: List[Optional[bool]] = [None] * len(candidates)
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='model-probe')
+        try:
+            futures = {
+                executor.submit(probe_model, model, self.probe_timeout): rank
+                for rank, model in enumerate(models)
+            }
+            pending = set(futures)
+            winner = None
+
+            while pending and winner is None:
+                remaining = self.deadline - (time.monotonic() - started)
+                if remaining <= 0:
+                    break
+
+                done, pending = wait(pending, timeout=remaining, return_when=FIRST_COMPLETED)
+                for future in done:
+                    rank = futures[future]
+                    try:
+                        outcomes[rank] = bool(future.result())
+                        if not outcomes[rank]:
+                            errors[candidates[rank]] = 'empty probe response'
+                    except Exception as e:
+                        outcomes[rank] = False
+                        errors[candidates[rank]] = str(e)
+
+                # The best-ranked success wins once every better-ranked candidate has failed
+                for rank, outcome in enumerate(outcomes):
+                    if outcome is None:
+                        break
+                    if outcome:
+                        winner = rank
+                        break
+
+            if winner is None:
+                # Deadline hit: settle for the best-ranked model that did answer
+                winner = next((rank for rank, outcome in enumerate(outcomes) if outcome), None)
+
+            for future in pending:
+                rank = futures[future]
+                if rank != winner and candidates[rank] not in errors:
+                    errors[candidates[rank]] = 'cancelled'
+        finally:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+        elapsed = time.monotonic() - started
+        if winner is None:
+            last_error = next(reversed(errors.values()), 'no response before deadline')
+            raise ModelResolutionError(f'No working Gemini model found. Last error: {last_error}', errors)
+
+        return ResolvedModel(model_name=candidates[winner], model=models[winner], elapsed=elapsed, errors=errors)
@@ -0,0 +1,207 @@
+"""Route each call to the fastest healthy model that is good enough for it"""
+# Every call records its latency (per model and call kind) and its outcome (per model) in one
+# process-wide ModelRouter, so all sessions learn from each other. A model that keeps failing has
+# its circuit breaker opened for a cooldown and receives no traffic; after the cooldown calls are
+# let through again and the first result decides whether the breaker closes or reopens for twice
+# as long. Per-call timeouts follow each model's observed tail latency instead of fixed values.
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass
+from typing import Callable, Deque, Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+# Quality tiers, derived from the model name
+TIER_LITE = 1
+TIER_STANDARD = 2
+TIER_PRO = 3
+
+# Minimum quality tier per call kind; unknown kinds accept any model
+CALL_TIERS = {
+    'questions': TIER_STANDARD,
+    'evaluation': TIER_STANDARD,
+    'synthesis': TIER_STANDARD,
+    'scoring': TIER_LITE,
+    'repair': TIER_LITE,
+}
+
+def model_tier(model_name: str) -> int:
+    name = model_name.lower()
+    if 'lite' in name or '-8b' in name:
+        return TIER_LITE
+    if '-pro' in name:
+        return TIER_PRO
+    return TIER_STANDARD
+
+@dataclass
+class _Breaker:
+    consecutive_failures: int = 0
+    # monotonic time until which the model gets no traffic; 0 = closed
+    open_until: float = 0.0
+    cooldown: float = 0.0
+    opened: int = 0
+
+class ModelRouter:
+    """Process-wide latency, error-rate and circuit-breaker state per model"""
+
+    def __init__(self, window: int = 200, failure_threshold: int = 3, error_rate_threshold: float = 0.5,
+                 min_calls_for_rate: int = 10, cooldown: float = 30.0, max_cooldown: float = 600.0,
+                 unmeasured_latency: float = 0.0, min_samples: int = 5, timeout_percentile: float = 99.0,
+                 timeout_factor: float = 2.0, min_timeout: float = 5.0, max_timeout: float = 90.0,
+                 clock: Callable[[], float] = time.monotonic):
+        self.window = window
+        self.failure_threshold = failure_threshold
+        self.error_rate_threshold = error_rate_threshold
+        self.min_calls_for_rate = min_calls_for_rate
+        self.cooldown = cooldown
+        self.max_cooldown = max_cooldown
+        # Assumed median of a model not yet measured for a call kind: 0 tries every candidate
+        # until it has min_samples latencies, then only the fastest keeps the traffic
+        self.unmeasured_latency = unmeasured_latency
+        self.min_samples = min_samples
+        self.timeout_percentile = timeout_percentile
+        self.timeout_factor = timeout_factor
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout
+        # Injectable so tests can move time without sleeping
+        self.clock = clock
+        self._latencies: Dict[Tuple[str, str], Deque[float]] = {}
+        self._outcomes: Dict[str, Deque[bool]] = {}
+        self._breakers: Dict[str, _Breaker] = {}
+        self._lock = threading.Lock()
+
+    def record_success(self, model_name: str, seconds: float, kind: str = 'default') -> None:
+        with self._lock:
+            self._latencies.setdefault((model_name, kind), deque(maxlen=self.window)).append(seconds)
+            self._outcomes.setdefault(model_name, deque(maxlen=self.window)).append(True)
+            breaker = self._breakers.setdefault(model_name, _Breaker())
+            breaker.consecutive_failures = 0
+            breaker.open_until = 0.0
+            breaker.cooldown = 0.0
+
+    def record_failure(self, model_name: str) -> None:
+        with self._lock:
+            outcomes = self._outcomes.setdefault(model_name, deque(maxlen=self.window))
+            outcomes.append(False)
+            breaker = self._breakers.setdefault(model_name, _Breaker())
+            breaker.consecutive_failures += 1
+
+            now = self.clock()
+            if breaker.open_until > now:
+                return
+            half_open = breaker.cooldown > 0
+            failing = breaker.consecutive_failures >= self.failure_threshold or (
+                len(outcomes) >= self.min_calls_for_rate
+                and outcomes.count(False) / len(outcomes) >= self.error_rate_threshold
+            )
+            if half_open or failing:
+                # A failed trial after the cooldown reopens for twice as long
+                breaker.cooldown = min(self.max_cooldown, breaker.cooldown * 2 if half_open else self.cooldown)
+                breaker.open_until = now + breaker.cooldown
+                breaker.opened += 1
+
+    def is_healthy(self, model_name: str) -> bool:
+        """False while the model's circuit breaker is open"""
+        with self._lock:
+            breaker = self._breakers.get(model_name)
+            return breaker is None or breaker.open_until <= self.clock()
+
+    def error_rate(self, model_name: str) -> float:
+        with self._lock:
+            outcomes = self._outcomes.get(model_name)
+            return outcomes.count(False) / len(outcomes) if outcomes else 0.0
+
+    def _samples(self, model_name: str, kind: Optional[str]) -> List[float]:
+        if kind is not None:
+            return list(self._latencies.get((model_name, kind), ()))
+        return [s for (name, _), values in self._latencies.items() if name == model_name for s in values]
+
+    def percentile(self, model_name: str, percentile: float, min_samples: int = 1,
+                   kind: Optional[str] = None) -> Optional[float]:
+        """Nearest-rank percentile of recent latencies, or None with fewer than ``min_samples``"""
+        # ``kind`` None pools the latencies of every call kind
+        with self._lock:
+            samples = sorted(self._samples(model_name, kind))
+        if len(samples) < max(1, min_samples):
+            return None
+        rank = min(len(samples) - 1, max(0, int(round(percentile / 100 * len(samples))) - 1))
+        return samples[rank]
+
+    def rank(self, model_names: Sequence[str], kind: str = 'default', min_tier: Optional[int] = None,
+             exclude: Iterable[str] = ()) -> List[str]:
+        """Healthy models of at least the call's tier, fastest median first"""
+        # Ties, and models not measured for this kind yet, keep the order of ``model_names``.
+        min_tier = CALL_TIERS.get(kind, TIER_LITE) if min_tier is None else min_tier
+        excluded: Set[str] = set(exclude)
+        candidates = [
+            name for name in model_names
+            if name not in excluded and model_tier(name) >= min_tier and self.is_healthy(name)
+        ]
+
+        def expected_latency(name: str) -> float:
+            median = self.percentile(name, 50, self.min_samples, kind)
+            return self.unmeasured_latency if median is None else median
+
+        order = {name: i for i, name in enumerate(candidates)}
+        return sorted(candidates, key=lambda name: (expected_latency(name), order[name]))
+
+    def timeout_for(self, model_name: str, kind: str, default: float) -> float:
+        """``default`` until the model is measured for this kind, then a multiple of its tail latency"""
+        tail = self.percentile(model_name, self.timeout_percentile, self.min_samples, kind)
+        if tail is None:
+            return default
+        return min(self.max_timeout, max(self.min_timeout, tail * self.timeout_factor))
+
+    def snapshot(self) -> List[Dict]:
+        """One row per model seen: calls, error rate, latency percentiles and breaker state"""
+        with self._lock:
+            names = sorted(self._outcomes)
+            breakers = {name: (b.open_until, b.opened) for name, b in self._breakers.items()}
+        now = self.clock()
+        rows = []
+        for name in names:
+            open_until, opened = breakers.get(name, (0.0, 0))
+            with self._lock:
+                calls = len(self._outcomes[name])
+            rows.append({
+                'model': name,
+                'tier': model_tier(name),
+                'calls': calls,
+                'error_rate': self.error_rate(name),
+                'p50': self.percentile(name, 50),
+                'p95': self.percentile(name, 95),
+                'open_for': max(0.0, open_until - now),
+                'times_opened': opened,
+            })
+        return rows
+
+_router = ModelRouter()
+
+def get_model_router() -> ModelRouter:
+    """Process-wide router shared by every session"""
+    return _router
+
+# Seconds a failed model listing is trusted before list_models() is tried again
+LISTING_RETRY_SECONDS = 60.0
+
+_available: Dict[str, Set[str]] = {}
+_listing_failed_at: Dict[str, float] = {}
+_available_lock = threading.Lock()
+
+def available_model_names(key_hash: str, primary: str, preference: Sequence[str], list_models) -> List[str]:
+    """Routing candidates for an API key: the resolved model, then every preferred model the key can use"""
+    # ``list_models()`` (a set of names, or None on failure) is cached per key once it succeeds;
+    # after a failure only the resolved model is routed to until LISTING_RETRY_SECONDS have passed
+    with _available_lock:
+        listed = _available.get(key_hash)
+        failed_at = _listing_failed_at.get(key_hash)
+    if listed is None:
+        if failed_at is not None and time.monotonic() - failed_at < LISTING_RETRY_SECONDS:
+            return [primary]
+        listed = list_models()
+        with _available_lock:
+            if listed is None:
+                _listing_failed_at[key_hash] = time.monotonic()
+                return [primary]
+            _available[key_hash] = listed
+            _listing_failed_at.pop(key_hash, None)
+    return [primary] + [name for name in preference if name != primary and name in listed]
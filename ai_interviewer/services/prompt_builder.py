@@ -0,0 +1,150 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from typing import Callable, List, Optional, Sequence, Tuple
+from models.data_models import Response
+
+TRANSCRIPT_PLACEHOLDER = '{transcript}'
+
+# Below this share of the budget the character estimate is trusted and no count_tokens
+# calls are made: the transcript fits either way
+EXACT_COUNT_THRESHOLD = 0.5
+
+@dataclass
+class PromptStats:
+    """Size and cost of building one prompt"""
+
+    prompt_tokens: int
+    budget_tokens: int
+    truncated_answers: int
+    # False when the size is the character-based estimate rather than count_tokens
+    exact: bool
+    build_seconds: float
+
+    def summary(self) -> str:
+        kind = 'tokens' if self.exact else 'tokens (estimated)'
+        truncated = f', {self.truncated_answers} answer(s) shortened' if self.truncated_answers else ''
+        return (f'{self.prompt_tokens:,} {kind} of a {self.budget_tokens:,} budget{truncated}, '
+                f'built in {self.build_seconds * 1000:.0f} ms')
+
+def estimate_text_tokens(text: str) -> int:
+    """~4 characters per token; good enough to tell whether exact counting is needed"""
+    return len(text) // 4 + 1
+
+class TokenCountCache:
+    """Process-wide LRU of token counts keyed by model and text hash"""
+
+    def __init__(self, max_entries: int = 4096):
+        self.max_entries = max_entries
+        self._counts: 'OrderedDict[Tuple[str, str], int]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(model_name: str, text: str) -> Tuple[str, str]:
+        return model_name, hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+    def get(self, key: Tuple[str, str]) -> Optional[int]:
+        with self._lock:
+            count = self._counts.get(key)
+            if count is not None:
+                self._counts.move_to_end(key)
+            return count
+
+    def put(self, key: Tuple[str, str], count: int) -> None:
+        with self._lock:
+            self._counts[key] = count
+            self._counts.move_to_end(key)
+            while len(self._counts) > self.max_entries:
+                self._counts.popitem(last=False)
+
+_token_counts = TokenCountCache()
+_count_pool = ThreadPoolExecutor(max_workers=8, thread_name_prefix='count-tokens')
+
+def count_tokens_cached(backend, texts: Sequence[str], timeout: float = 10.0) -> List[int]:
+    """Token counts from ``backend.count_tokens``, cached per text; uncached texts are counted concurrently"""
+    # A failed count falls back to the character estimate so building a prompt never fails because
+    # of counting.
+    keys = [_token_counts.key(backend.model_name, text) for text in texts]
+    counts = [_token_counts.get(key) for key in keys]
+    missing = [i for i, count in enumerate(counts) if count is None]
+
+    futures = {i: _count_pool.submit(backend.count_tokens, texts[i], timeout) for i in missing}
+    for i, future in futures.items():
+        try:
+            counts[i] = int(future.result())
+            _token_counts.put(keys[i], counts[i])
+        except Exception:
+            counts[i] = estimate_text_tokens(texts[i])
+    return counts
+
+def water_fill_cap(counts: Sequence[int], available: int, minimum: int) -> Optional[int]:
+    """Largest per-answer cap so the capped counts fit ``available``; None when nothing needs capping"""
+    if sum(counts) <= available:
+        return None
+    remaining = available
+    ordered = sorted(counts)
+    for k, count in enumerate(ordered):
+        share = remaining / (len(ordered) - k)
+        if count > share:
+            return max(minimum, int(share))
+        remaining -= count
+    return None
+
+def truncate_answer(answer: str, tokens: int, max_tokens: int) -> str:
+    """Keep the opening and the conclusion of an answer, dropping the middle"""
+    keep_chars = max(1, int(len(answer) * max_tokens / max(tokens, 1)))
+    if keep_chars >= len(answer):
+        return answer
+    head = keep_chars * 2 // 3
+    tail = keep_chars - head
+    omitted = len(answer) - head - tail
+    return f'{answer[:head].rstrip()} [... {omitted} characters omitted ...] {answer[len(answer) - tail:].lstrip()}'
+
+class PromptBuilder:
+    """Fits a transcript of answers into a prompt template within a token budget"""
+    # The template marks the transcript position with TRANSCRIPT_PLACEHOLDER;
+    # ``render_response(number, response, answer)`` renders one transcript entry. When the answers
+    # do not fit, the longest ones are cut down to an equal share of what is left.
+
+    def __init__(self, backend, budget_tokens: int, min_answer_tokens: int = 64):
+        self.backend = backend
+        self.budget_tokens = budget_tokens
+        self.min_answer_tokens = min_answer_tokens
+
+    def build(self, template: str, responses: Sequence[Response],
+              render_response: Callable[[int, Response, str], str]) -> Tuple[str, PromptStats]:
+        started = time.perf_counter()
+        answers = [r.answer for r in responses]
+        skeleton = template.replace(
+            TRANSCRIPT_PLACEHOLDER, ''.join(render_response(i, r, '') for i, r in enumerate(responses, 1))
+        )
+
+        estimated = estimate_text_tokens(skeleton) + sum(estimate_text_tokens(a) for a in answers)
+        exact = estimated > self.budget_tokens * EXACT_COUNT_THRESHOLD and hasattr(self.backend, 'count_tokens')
+        if exact:
+            skeleton_tokens, *answer_tokens = count_tokens_cached(self.backend, [skeleton] + answers)
+        else:
+            skeleton_tokens = estimate_text_tokens(skeleton)
+            answer_tokens = [estimate_text_tokens(a) for a in answers]
+
+        cap = water_fill_cap(answer_tokens, self.budget_tokens - skeleton_tokens, self.min_answer_tokens)
+        truncated = 0
+        if cap is not None:
+            for i, tokens in enumerate(answer_tokens):
+                if tokens > cap:
+                    answers[i] = truncate_answer(answers[i], tokens, cap)
+                    answer_tokens[i] = cap
+                    truncated += 1
+
+        transcript = ''.join(render_response(i, r, answers[i - 1]) for i, r in enumerate(responses, 1))
+        prompt = template.replace(TRANSCRIPT_PLACEHOLDER, transcript)
+        return prompt, PromptStats(
+            prompt_tokens=skeleton_tokens + sum(answer_tokens),
+            budget_tokens=self.budget_tokens,
+            truncated_answers=truncated,
+            exact=exact,
+            build_seconds=time.perf_counter() - started
+        )
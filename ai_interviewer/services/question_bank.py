@@ -0,0 +1,243 @@
+import json
+import random
+import re
+import sqlite3
+import threading
+import time
+import zlib
+from collections import Counter
+from typing import Dict, List, Optional, Sequence, Set, Tuple
+
+import numpy as np
+
+from models.data_models import Category, Difficulty, Question, QuestionReference
+from utils.storage import connect_sqlite, data_path
+
+# MinHash over character 5-grams; 16 bands of 4 rows catch pairs above ~0.5 Jaccard
+# similarity as LSH candidates, which are then confirmed against DUPLICATE_THRESHOLD
+SHINGLE_SIZE = 5
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+DUPLICATE_THRESHOLD = 0.7
+
+_MERSENNE_PRIME = (1 << 31) - 1
+_permutation_rng = np.random.RandomState(20240917)  # Fixed: stored signatures must stay comparable
+_PERM_A = _permutation_rng.randint(1, _MERSENNE_PRIME, size=NUM_PERMUTATIONS).astype(np.uint64)
+_PERM_B = _permutation_rng.randint(0, _MERSENNE_PRIME, size=NUM_PERMUTATIONS).astype(np.uint64)
+
+def normalize_text(text: str) -> str:
+    """Lowercase words only, so punctuation, case and spacing never make two questions differ"""
+    return ' '.join(re.findall(r'[a-z0-9+#]+', text.lower()))
+
+def minhash_signature(text: str) -> np.ndarray:
+    """MinHash signature (uint32 per permutation) of the text's character shingles"""
+    normalized = normalize_text(text)
+    shingles = {normalized[i:i + SHINGLE_SIZE] for i in range(max(1, len(normalized) - SHINGLE_SIZE + 1))}
+    hashes = np.fromiter((zlib.crc32(s.encode('utf-8')) for s in shingles), np.uint64, len(shingles))
+    hashes %= _MERSENNE_PRIME
+    permuted = (_PERM_A[:, None] * hashes[None, :] + _PERM_B[:, None]) % _MERSENNE_PRIME
+    return permuted.min(axis=1).astype(np.uint32)
+
+def _band_keys(signature: np.ndarray) -> List[Tuple[int, bytes]]:
+    rows = NUM_PERMUTATIONS // LSH_BANDS
+    return [(band, signature[band * rows:(band + 1) * rows].tobytes()) for band in range(LSH_BANDS)]
+
+class QuestionBank:
+    """Persistent bank of distinct questions, indexed by (category, difficulty)"""
+    # Every generated question is ingested; wording that is a near-duplicate of a banked question
+    # (estimated Jaccard similarity >= DUPLICATE_THRESHOLD) is dropped. Sampling a full interview
+    # set touches only the handful of slots it needs, so it costs the same with ten questions or a
+    # hundred thousand. Questions may carry a QuestionReference (reference answer and key
+    # concepts), which the offline rubric scorer grades against.
+
+    def __init__(self, db_path: Optional[str] = None):
+        self.db_path = db_path or data_path('question_bank.sqlite3')
+        self._lock = threading.Lock()
+        self._conn = connect_sqlite(self.db_path)
+        self._conn.execute(
+            'CREATE TABLE IF NOT EXISTS questions ('
+            ' id INTEGER PRIMARY KEY,'
+            ' text TEXT NOT NULL,'
+            ' category TEXT NOT NULL,'
+            ' difficulty TEXT NOT NULL,'
+            ' signature BLOB NOT NULL,'
+            ' created_at REAL NOT NULL,'
+            ' reference_answer TEXT,'
+            ' key_concepts TEXT)'
+        )
+        self._conn.commit()
+
+        # Everything in memory is addressed by row (insertion order), not by bank id
+        self._ids: List[int] = []
+        self._questions: List[Tuple[str, str, str]] = []
+        self._signatures = np.empty((64, NUM_PERMUTATIONS), dtype=np.uint32)
+        self._slots: Dict[Tuple[str, str], List[int]] = {}
+        self._buckets: Dict[Tuple[int, bytes], List[int]] = {}
+        self._row_of_text: Dict[str, int] = {}
+        self._references: Dict[int, QuestionReference] = {}
+        # (category mix, difficulty mix) pairs sample_set is known to be able to fill
+        self._fillable: Set[Tuple[tuple, tuple]] = set()
+        for bank_id, text, category, difficulty, signature, answer, concepts in self._conn.execute(
+            'SELECT id, text, category, difficulty, signature, reference_answer, key_concepts'
+            ' FROM questions ORDER BY id'
+        ):
+            row = self._index(bank_id, text, category, difficulty, np.frombuffer(signature, dtype=np.uint32))
+            if answer or concepts:
+                self._references[row] = QuestionReference(answer or '', tuple(json.loads(concepts or '[]')))
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._questions)
+
+    def find_duplicate(self, text: str, signature: Optional[np.ndarray] = None) -> Optional[int]:
+        """Bank id of a near-identical question, if any"""
+        signature = minhash_signature(text) if signature is None else signature
+        with self._lock:
+            row = self._find_duplicate(signature)
+            return None if row is None else self._ids[row]
+
+    def add(self, question: Question, reference: Optional[QuestionReference] = None) -> Optional[int]:
+        """Bank a question; returns its new bank id, or None if it duplicates a banked one"""
+        added = self.add_many([question], {question.text.strip(): reference} if reference else None)
+        return added[0] if added else None
+
+    def add_many(self, questions: Sequence[Question],
+                 references: Optional[Dict[str, QuestionReference]] = None) -> List[int]:
+        """Bank every question that is not a near-duplicate; returns the new bank ids"""
+        # ``references`` maps question text to its reference answer and key concepts; a duplicate
+        # of a banked question without one adopts it.
+        references = {text.strip(): ref for text, ref in (references or {}).items()}
+        # Signatures are computed outside the lock; only the index update is serialized
+        signed = [(q, minhash_signature(q.text)) for q in questions if q.text.strip()]
+        added = []
+        with self._lock:
+            with self._conn:
+                for question, signature in signed:
+                    text, category, difficulty = question.text.strip(), str(question.category), str(question.difficulty)
+                    reference = references.get(text)
+                    answer = reference.answer if reference else None
+                    concepts = json.dumps(list(reference.key_concepts)) if reference else None
+                    duplicate = self._find_duplicate(signature)
+                    if duplicate is not None:
+                        if reference is not None and duplicate not in self._references:
+                            self._conn.execute(
+                                'UPDATE questions SET reference_answer = ?, key_concepts = ? WHERE id = ?',
+                                (answer, concepts, self._ids[duplicate])
+                            )
+                            self._references[duplicate] = reference
+                        continue
+                    bank_id = self._conn.execute(
+                        'INSERT INTO questions (text, category, difficulty, signature, created_at,'
+                        ' reference_answer, key_concepts) VALUES (?, ?, ?, ?, ?, ?, ?)',
+                        (text, category, difficulty, signature.tobytes(), time.time(), answer, concepts)
+                    ).lastrowid
+                    row = self._index(bank_id, text, category, difficulty, signature)
+                    if reference is not None:
+                        self._references[row] = reference
+                    added.append(bank_id)
+        return added
+
+    def reference(self, text: str) -> Optional[QuestionReference]:
+        """Reference of the banked question with this wording, or of a near-duplicate of it"""
+        with self._lock:
+            row = self._row_of_text.get(normalize_text(text))
+        if row is None:
+            signature = minhash_signature(text)
+            with self._lock:
+                row = self._find_duplicate(signature)
+        if row is None:
+            return None
+        with self._lock:
+            return self._references.get(row)
+
+    def references(self) -> List[QuestionReference]:
+        """Every banked reference, e.g. as the corpus for term weights"""
+        with self._lock:
+            return list(self._references.values())
+
+    def slot_size(self, category: str, difficulty: str) -> int:
+        with self._lock:
+            return len(self._slots.get((str(category), str(difficulty)), ()))
+
+    def sample_set(self, category_mix: Dict[str, int], difficulty_mix: Dict[str, int],
+                   rng: Optional[random.Random] = None, attempts: int = 8) -> Optional[List[Question]]:
+        """A random question set with the given category and difficulty counts, or None"""
+        # Difficulties are dealt randomly across the category slots; a deal whose (category,
+        # difficulty) slots are too small is re-dealt up to ``attempts`` times.
+        rng = rng or random
+        with self._lock:
+            deal = self._deal(category_mix, difficulty_mix, rng, attempts)
+            if deal is None:
+                return None
+            picks = {slot: rng.sample(self._slots[slot], n) for slot, n in Counter(deal).items()}
+            questions = []
+            for slot in deal:
+                text, category, difficulty = self._questions[picks[slot].pop()]
+                questions.append(Question(len(questions) + 1, text, category, difficulty))
+            return questions
+
+    def can_sample_set(self, category_mix: Dict[str, int], difficulty_mix: Dict[str, int]) -> bool:
+        """Whether ``sample_set`` can fill this mix, without sampling; O(1) once it can"""
+        # The bank only grows, so a mix it could fill once stays fillable.
+        mix = (tuple(category_mix.items()), tuple(difficulty_mix.items()))
+        with self._lock:
+            if mix in self._fillable:
+                return True
+            if self._deal(category_mix, difficulty_mix, random, attempts=8) is None:
+                return False
+            self._fillable.add(mix)
+            return True
+
+    def _deal(self, category_mix: Dict[str, int], difficulty_mix: Dict[str, int], rng,
+              attempts: int) -> Optional[List[Tuple[str, str]]]:
+        """(category, difficulty) per question of a deal the slots can fill, or None"""
+        categories = [c for c, n in category_mix.items() for _ in range(n)]
+        difficulties = [d for d, n in difficulty_mix.items() for _ in range(n)]
+        if len(categories) != len(difficulties):
+            raise ValueError('Category and difficulty mixes must have the same total')
+        for _ in range(attempts):
+            rng.shuffle(difficulties)
+            deal = list(zip(categories, difficulties))
+            if all(len(self._slots.get(slot, ())) >= n for slot, n in Counter(deal).items()):
+                return deal
+        return None
+
+    def _find_duplicate(self, signature: np.ndarray) -> Optional[int]:
+        candidates = set()
+        for key in _band_keys(signature):
+            candidates.update(self._buckets.get(key, ()))
+        if not candidates:
+            return None
+        rows = np.fromiter(candidates, np.int64, len(candidates))
+        agreement = np.count_nonzero(self._signatures[rows] == signature, axis=1)
+        best = int(np.argmax(agreement))
+        return int(rows[best]) if agreement[best] >= DUPLICATE_THRESHOLD * NUM_PERMUTATIONS else None
+
+    def _index(self, bank_id: int, text: str, category: str, difficulty: str, signature: np.ndarray) -> int:
+        row = len(self._ids)
+        if row == len(self._signatures):
+            self._signatures = np.concatenate([self._signatures, np.empty_like(self._signatures)])
+        category, difficulty = Category.coerce(category), Difficulty.coerce(difficulty)
+        self._ids.append(bank_id)
+        self._questions.append((text, category, difficulty))
+        self._signatures[row] = signature
+        self._slots.setdefault((category, difficulty), []).append(row)
+        for key in _band_keys(signature):
+            self._buckets.setdefault(key, []).append(row)
+        self._row_of_text.setdefault(normalize_text(text), row)
+        return row
+
+_default_bank: Optional[QuestionBank] = None
+_default_lock = threading.Lock()
+
+def get_question_bank() -> QuestionBank:
+    """Process-wide question bank shared by every session"""
+    global _default_bank
+    with _default_lock:
+        if _default_bank is None:
+            try:
+                _default_bank = QuestionBank()
+            except (OSError, sqlite3.Error):
+                # Read-only or missing data directory: keep the bank for this process only
+                _default_bank = QuestionBank(db_path=':memory:')
+        return _default_bank
@@ -0,0 +1,148 @@
+import hashlib
+import re
+import threading
+from collections import OrderedDict, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Callable, Deque, Dict, List, Optional, Set, Tuple
+from models.data_models import Question
+
+GENERIC_FINGERPRINT = 'generic'
+
+# A personalized set is only generated once the candidate's background has stayed the
+# same this long, so each edit does not start a paid call
+SPECULATION_DELAY_SECONDS = 3.0
+# Personalized sets generated per candidate at most, however often they edit
+MAX_SPECULATIONS_PER_OWNER = 2
+
+_STOPWORDS = {
+    'a', 'an', 'and', 'the', 'in', 'on', 'of', 'for', 'to', 'with', 'at', 'by', 'from', 'as',
+    'is', 'am', 'are', 'was', 'were', 'be', 'been', 'i', 'im', 'my', 'me', 'we', 'our',
+    'have', 'has', 'had', 'some', 'also', 'using', 'used', 'use', 'experience', 'know',
+    'familiar', 'worked', 'work', 'built', 'projects', 'project', 'years', 'year',
+}
+
+def background_fingerprint(background: str) -> str:
+    """Bucket key for a candidate background: same skills in any order or case map together"""
+    words = re.findall(r'[a-z0-9+#.]+', (background or '').lower())
+    terms = sorted({w.strip('.') for w in words if w.strip('.') and w.strip('.') not in _STOPWORDS})
+    if not terms:
+        return GENERIC_FINGERPRINT
+    return hashlib.sha1(' '.join(terms).encode('utf-8')).hexdigest()[:16]
+
+class QuestionPool:
+    """Ready question sets per background fingerprint, kept filled by background workers"""
+    # Sets are handed out once each. The generic bucket (empty background) is refilled after every
+    # take; personalized buckets are generated speculatively (see ``speculate``) while the
+    # candidate is still filling in the setup form.
+
+    def __init__(self, sets_per_bucket: int = 2, max_buckets: int = 128, max_workers: int = 2,
+                 speculation_delay: float = SPECULATION_DELAY_SECONDS,
+                 max_speculations: int = MAX_SPECULATIONS_PER_OWNER):
+        self.sets_per_bucket = sets_per_bucket
+        self.max_buckets = max_buckets
+        self.speculation_delay = speculation_delay
+        self.max_speculations = max_speculations
+        self._ready: 'OrderedDict[str, Deque[List[Question]]]' = OrderedDict()
+        self._pending: Dict[str, Set[Future]] = {}
+        # owner -> (timer of the scheduled speculation or None, speculations started)
+        self._speculations: 'OrderedDict[str, Tuple[Optional[threading.Timer], int]]' = OrderedDict()
+        # Re-entrant: done callbacks run inline when a future finishes before it is registered
+        self._lock = threading.RLock()
+        self._ready_changed = threading.Condition(self._lock)
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='question-pool')
+
+    def prefetch(self, background: str, generate_fn: Callable[[str], List[Question]]) -> int:
+        """Top up the bucket for this background without blocking the caller; returns the sets started"""
+        fingerprint = background_fingerprint(background)
+        # Personalized sets are speculative, so only one is paid for per background
+        target = self.sets_per_bucket if fingerprint == GENERIC_FINGERPRINT else 1
+        with self._lock:
+            have = len(self._ready.get(fingerprint, ())) + len(self._pending.get(fingerprint, ()))
+            for _ in range(target - have):
+                future = self._executor.submit(generate_fn, background)
+                self._pending.setdefault(fingerprint, set()).add(future)
+                future.add_done_callback(lambda f, fp=fingerprint: self._on_generated(fp, f))
+            return max(0, target - have)
+
+    def speculate(self, owner: str, background: str, generate_fn: Callable[[str], List[Question]]) -> None:
+        """Prefetch a personalized set for ``owner`` (a session) once its background stops changing"""
+        # Each call replaces the owner's previous, not yet started one and waits
+        # ``speculation_delay`` again; an owner starts at most ``max_speculations`` sets.
+        with self._lock:
+            timer, started = self._speculations.pop(owner, (None, 0))
+            if timer is not None:
+                timer.cancel()
+            timer = None
+            if started < self.max_speculations:
+                timer = threading.Timer(self.speculation_delay, self._speculate_now,
+                                        (owner, background, generate_fn))
+                timer.daemon = True
+            self._speculations[owner] = (timer, started)
+            while len(self._speculations) > self.max_buckets * 8:
+                stale, _ = self._speculations.popitem(last=False)[1]
+                if stale is not None:
+                    stale.cancel()
+        if timer is not None:
+            timer.start()
+
+    def cancel_speculation(self, owner: str) -> None:
+        """Drop the owner's scheduled speculation, e.g. once it has submitted the form"""
+        with self._lock:
+            timer, started = self._speculations.get(owner, (None, 0))
+            if timer is not None:
+                timer.cancel()
+                self._speculations[owner] = (None, started)
+
+    def _speculate_now(self, owner: str, background: str, generate_fn: Callable[[str], List[Question]]) -> None:
+        with self._lock:
+            timer, started = self._speculations.get(owner, (None, 0))
+            # Replaced or cancelled after the timer fired
+            if timer is not threading.current_thread():
+                return
+            self._speculations[owner] = (None, started + self.prefetch(background, generate_fn))
+
+    def take(self, background: str, wait_timeout: float = 0.0) -> Optional[List[Question]]:
+        """Pop a ready set for this background, optionally waiting for one already in flight"""
+        fingerprint = background_fingerprint(background)
+        with self._ready_changed:
+            # A speculative generation already running beats starting another call
+            self._ready_changed.wait_for(
+                lambda: self._ready.get(fingerprint) or not self._pending.get(fingerprint),
+                timeout=wait_timeout
+            )
+            bucket = self._ready.get(fingerprint)
+            if not bucket:
+                return None
+            self._ready.move_to_end(fingerprint)
+            return bucket.popleft()
+
+    def size(self, background: str = '') -> int:
+        """Number of ready sets for a background"""
+        with self._lock:
+            return len(self._ready.get(background_fingerprint(background), ()))
+
+    def _on_generated(self, fingerprint: str, future: Future) -> None:
+        with self._lock:
+            self._pending.get(fingerprint, set()).discard(future)
+            if not self._pending.get(fingerprint):
+                self._pending.pop(fingerprint, None)
+
+            if not future.cancelled() and future.exception() is None:
+                self._ready.setdefault(fingerprint, deque()).append(future.result())
+                self._ready.move_to_end(fingerprint)
+                while len(self._ready) > self.max_buckets:
+                    self._ready.popitem(last=False)
+
+            self._ready_changed.notify_all()
+
+_pools: Dict[str, QuestionPool] = {}
+_pools_lock = threading.Lock()
+
+def get_question_pool(key: str) -> QuestionPool:
+    """Process-wide question pool for one API key hash (or other quota owner), shared by its sessions"""
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = QuestionPool()
+            _pools[key] = pool
+        return pool
@@ -0,0 +1,224 @@
+import asyncio
+import random
+import threading
+import time
+from collections import deque
+from typing import Awaitable, Callable, Dict, Optional, Tuple, TypeVar
+
+T = TypeVar('T')
+
+# (requests per minute, tokens per minute) per model; free-tier quotas as of September 2025
+DEFAULT_LIMITS: Dict[str, Tuple[int, int]] = {
+    'gemini-2.5-pro': (5, 250_000),
+    'gemini-2.5-flash': (10, 250_000),
+    'gemini-2.5-flash-lite': (15, 250_000),
+    'gemini-2.0-flash': (15, 1_000_000),
+    'gemini-2.0-flash-lite': (30, 1_000_000),
+    'gemini-1.5-flash': (15, 250_000),
+    'gemini-1.5-flash-8b': (15, 250_000),
+    'gemini-1.5-pro': (2, 32_000),
+}
+FALLBACK_LIMITS = (10, 250_000)
+
+class RateLimitTimeout(Exception):
+    """Raised when a caller waited longer than allowed for its turn"""
+
+class ModelRateLimiter:
+    """Token buckets for requests and tokens per minute, served to callers in FIFO order"""
+
+    def __init__(self, requests_per_minute: int, tokens_per_minute: int,
+                 clock: Callable[[], float] = time.monotonic):
+        self.requests_per_minute = requests_per_minute
+        self.tokens_per_minute = tokens_per_minute
+        # Injectable so tests can move time without sleeping
+        self.clock = clock
+        self._request_budget = float(requests_per_minute)
+        self._token_budget = float(tokens_per_minute)
+        self._refilled_at = self.clock()
+        self._paused_until = 0.0
+        self._queue = deque()
+        self._cond = threading.Condition()
+
+    def acquire(self, tokens: int, timeout: Optional[float] = 120.0) -> None:
+        """Block until one request and ``tokens`` tokens fit in the budget"""
+        tokens = min(tokens, self.tokens_per_minute)
+        deadline = None if timeout is None else self.clock() + timeout
+        ticket = object()
+
+        with self._cond:
+            self._queue.append(ticket)
+            try:
+                while True:
+                    now = self.clock()
+                    self._refill(now)
+                    wait_for = self._wait_time(tokens, now) if self._queue[0] is ticket else 1.0
+                    if wait_for <= 0:
+                        self._request_budget -= 1
+                        self._token_budget -= tokens
+                        return
+                    if deadline is not None:
+                        if now >= deadline:
+                            raise RateLimitTimeout('Timed out waiting for rate limit budget')
+                        wait_for = min(wait_for, deadline - now)
+                    self._cond.wait(wait_for)
+            finally:
+                self._queue.remove(ticket)
+                self._cond.notify_all()
+
+    def try_acquire(self, tokens: int) -> float:
+        """Take one request and ``tokens`` without blocking: 0 on success, else seconds to wait"""
+        # Callers blocked in ``acquire`` are served first.
+        tokens = min(tokens, self.tokens_per_minute)
+        with self._cond:
+            now = self.clock()
+            self._refill(now)
+            if self._queue:
+                return 0.05
+            wait_for = self._wait_time(tokens, now)
+            if wait_for <= 0:
+                self._request_budget -= 1
+                self._token_budget -= tokens
+                return 0.0
+            return wait_for
+
+    async def acquire_async(self, tokens: int, timeout: Optional[float] = 120.0) -> None:
+        """``acquire`` for coroutines: sleeps on the event loop instead of blocking a thread"""
+        deadline = None if timeout is None else self.clock() + timeout
+        while True:
+            wait_for = self.try_acquire(tokens)
+            if wait_for <= 0:
+                return
+            if deadline is not None:
+                remaining = deadline - self.clock()
+                if remaining <= 0:
+                    raise RateLimitTimeout('Timed out waiting for rate limit budget')
+                wait_for = min(wait_for, remaining)
+            # Spread waiters out so they do not all retry at the same instant
+            await asyncio.sleep(wait_for * random.uniform(1.0, 1.2))
+
+    def record_usage(self, estimated_tokens: int, actual_tokens: Optional[int]) -> None:
+        """Correct the token budget once the real usage of a call is known"""
+        if actual_tokens is None:
+            return
+        with self._cond:
+            self._token_budget += min(estimated_tokens, self.tokens_per_minute) - actual_tokens
+            self._cond.notify_all()
+
+    def pause(self, seconds: float) -> None:
+        """Hold every caller back after the server reported we are over quota"""
+        with self._cond:
+            self._paused_until = max(self._paused_until, self.clock() + seconds)
+            self._request_budget = min(self._request_budget, 0.0)
+
+    def _refill(self, now: float) -> None:
+        elapsed = now - self._refilled_at
+        self._refilled_at = now
+        self._request_budget = min(float(self.requests_per_minute),
+                                   self._request_budget + elapsed * self.requests_per_minute / 60)
+        self._token_budget = min(float(self.tokens_per_minute),
+                                 self._token_budget + elapsed * self.tokens_per_minute / 60)
+
+    def _wait_time(self, tokens: int, now: float) -> float:
+        waits = [self._paused_until - now]
+        if self._request_budget < 1:
+            waits.append((1 - self._request_budget) * 60 / self.requests_per_minute)
+        if self._token_budget < tokens:
+            waits.append((tokens - self._token_budget) * 60 / self.tokens_per_minute)
+        return max(waits)
+
+_limiters: Dict[str, ModelRateLimiter] = {}
+_limits: Dict[str, Tuple[int, int]] = dict(DEFAULT_LIMITS)
+_limiters_lock = threading.Lock()
+
+def configure_limits(model_name: str, requests_per_minute: int, tokens_per_minute: int) -> None:
+    """Override the quota for a model (e.g. on a paid tier); applies to new limiters"""
+    with _limiters_lock:
+        _limits[_bare_name(model_name)] = (requests_per_minute, tokens_per_minute)
+        _limiters.pop(_bare_name(model_name), None)
+
+def get_rate_limiter(model_name: str) -> ModelRateLimiter:
+    """Process-wide limiter shared by every session using this model"""
+    name = _bare_name(model_name)
+    with _limiters_lock:
+        limiter = _limiters.get(name)
+        if limiter is None:
+            limiter = ModelRateLimiter(*_limits.get(name, FALLBACK_LIMITS))
+            _limiters[name] = limiter
+        return limiter
+
+def estimate_tokens(prompt: str, max_output_tokens: Optional[int]) -> int:
+    """Rough upper bound of a call's token cost: ~4 characters per prompt token plus the output cap"""
+    return len(prompt) // 4 + (max_output_tokens or 0)
+
+# HTTP statuses worth retrying: 429 (ResourceExhausted/TooManyRequests) and the transient
+# server errors (InternalServerError, BadGateway, ServiceUnavailable, DeadlineExceeded)
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+def error_status(error: Exception) -> Optional[int]:
+    """HTTP status of an API error, from the ``code`` of google.api_core's exceptions (or the simulator's)"""
+    code = getattr(error, 'code', None)
+    return code if isinstance(code, int) else None
+
+def is_quota_error(error: Exception) -> bool:
+    status = error_status(error)
+    if status is not None:
+        return status == 429
+    error_msg = str(error).lower()
+    return 'quota' in error_msg or 'resource exhausted' in error_msg or 'rate limit' in error_msg
+
+def is_retryable_error(error: Exception) -> bool:
+    """Quota, timeout, connection and transient server errors are worth retrying; decided by type or status code"""
+    if isinstance(error, RateLimitTimeout):
+        return False
+    if isinstance(error, (TimeoutError, asyncio.TimeoutError, ConnectionError)):
+        return True
+    status = error_status(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return is_quota_error(error)
+
+def call_with_backoff(fn: Callable[[], T], limiter: Optional[ModelRateLimiter] = None, retries: int = 4,
+                      base_delay: float = 1.0, max_delay: float = 30.0, deadline: Optional[float] = None,
+                      clock: Callable[[], float] = time.monotonic) -> T:
+    """Call ``fn``, retrying retryable errors with jittered exponential backoff"""
+    # With a ``deadline`` (a ``clock`` time), an error is raised rather than retried once the
+    # backoff would reach it.
+    attempt = 0
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            if attempt >= retries or not is_retryable_error(e):
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            delay = random.uniform(delay / 2, delay)
+            if deadline is not None and clock() + delay >= deadline:
+                raise
+            if limiter is not None and is_quota_error(e):
+                # Everyone on this model backs off, not just the caller that hit the 429
+                limiter.pause(delay)
+            time.sleep(delay)
+            attempt += 1
+
+async def call_with_backoff_async(fn: Callable[[], Awaitable[T]], limiter: Optional[ModelRateLimiter] = None,
+                                  retries: int = 4, base_delay: float = 1.0, max_delay: float = 30.0,
+                                  deadline: Optional[float] = None, clock: Callable[[], float] = time.monotonic) -> T:
+    """``call_with_backoff`` for coroutine functions"""
+    attempt = 0
+    while True:
+        try:
+            return await fn()
+        except Exception as e:
+            if attempt >= retries or not is_retryable_error(e):
+                raise
+            delay = min(max_delay, base_delay * (2 ** attempt))
+            delay = random.uniform(delay / 2, delay)
+            if deadline is not None and clock() + delay >= deadline:
+                raise
+            if limiter is not None and is_quota_error(e):
+                limiter.pause(delay)
+            await asyncio.sleep(delay)
+            attempt += 1
+
+def _bare_name(model_name: str) -> str:
+    return model_name[len('models/'):] if model_name.startswith('models/') else model_name
@@ -0,0 +1,369 @@
+"""Offline rubric scoring: answers graded against each question's reference, no model call"""
+# Answers and reference answers become hashed word-n-gram TF-IDF vectors in NumPy. Each answer is
+# scored on how close it is to its question's reference answer, how many of the question's key
+# concepts it covers, and how developed it is. A communication score comes from its structure. A
+# whole interview scores in about a millisecond. That is fast enough to show a provisional score
+# the moment the results page opens, and it makes a real fallback when the model evaluation is
+# unavailable.
+# The reference for a question comes from the first of these that has one:
+# - the built-in references for the default questions;
+# - the question bank, since the model writes a reference answer and key concepts with
+#   every question it generates;
+# - a generic rubric for the question's category.
+import math
+import re
+import threading
+import zlib
+from collections import OrderedDict
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from models.data_models import Category, QuestionReference, Response, is_no_answer
+from services.question_bank import QuestionBank, get_question_bank, normalize_text
+
+# Word unigrams and bigrams hashed into 2**18 buckets; collisions are rare at answer sizes
+FEATURE_BITS = 18
+_FEATURE_MASK = (1 << FEATURE_BITS) - 1
+
+# Weights of the per-answer score
+CONCEPT_WEIGHT = 0.5
+SIMILARITY_WEIGHT = 0.3
+DEPTH_WEIGHT = 0.2
+
+# Cosine similarity with the reference answer that counts as a full match. Candidates use
+# their own words, so even strong answers rarely get much closer than this.
+FULL_SIMILARITY = 0.35
+
+# Content words (stopwords excluded) of a fully developed answer, per category
+DEPTH_WORDS = {Category.TECHNICAL: 40, Category.PROBLEM_SOLVING: 50, Category.BEHAVIORAL: 50}
+DEFAULT_DEPTH_WORDS = 45
+
+_STOPWORDS = frozenset("""
+    a about after all also an and any are as at be because been before but by can could do does
+    each for from had has have how i if in into is it its just me my of on one or our so some
+    such than that the their them then there these they this those to up us was we were what when
+    where which while who why will with would you your
+""".split())
+
+# Words that signal an answer is laid out as an argument rather than a list of facts
+_CONNECTIVES = frozenset("""
+    because since therefore so first second then next finally however although whereas but
+    instead example instance means which result
+""".split())
+
+_WORD = re.compile(r'[a-z0-9+#]+')
+_SENTENCE_END = re.compile(r'[.!?;\n]+')
+
+# Keyed by the text of ai_service.default_questions()
+BUILTIN_REFERENCES: Dict[str, QuestionReference] = {
+    'Explain the difference between an array and a linked list. When would you use each data structure?':
+        QuestionReference(
+            'An array stores elements in contiguous memory, so access by index is O(1) and iteration is cache '
+            'friendly, but inserting or deleting in the middle shifts elements and costs O(n), and a static '
+            'array has a fixed size. A linked list stores nodes that point to the next node, so insertion and '
+            'deletion at a known node are O(1), but reaching an element by index is O(n) and every node pays '
+            'for its pointer. Use an array for random access and read-heavy data, a linked list for frequent '
+            'insertions and deletions such as queues or an LRU cache.',
+            ('contiguous memory', 'random access', 'pointer', 'insertion', 'deletion', 'fixed size',
+             'cache locality')
+        ),
+    'What is time complexity (Big O notation)? Calculate the time complexity of searching through a 2D array '
+    'using nested loops.':
+        QuestionReference(
+            'Time complexity describes how the running time of an algorithm grows with the input size. Big O '
+            'notation gives the upper bound of that growth for the worst case and drops constants and lower '
+            'order terms. Searching an n by m 2D array with nested loops visits every element once, so it '
+            'takes O(n * m) time, or O(n^2) for a square array, with O(1) extra space.',
+            ('input size', 'growth rate', 'worst case', 'upper bound', 'constants', 'nested loops',
+             'O(n^2)')
+        ),
+    "You're debugging a web application that takes 30 seconds to load. Walk me through your debugging process "
+    'step by step.':
+        QuestionReference(
+            'First reproduce the slow load and measure where the time goes: the browser network tab and '
+            'performance profiler for the frontend, logs, tracing and a profiler for the backend. Check slow '
+            'database queries and missing indexes, large unoptimized assets, too many requests, blocking '
+            'scripts, and slow external API calls. Form a hypothesis, change one thing at a time, fix the '
+            'bottleneck with caching, indexes, compression or lazy loading, and verify the improvement with '
+            'monitoring.',
+            ('reproduce', 'network tab', 'profiler', 'database query', 'index', 'caching', 'bottleneck',
+             'monitoring')
+        ),
+    'Design a basic real-time chat application. What main components and technologies would you need? '
+    'Consider scalability for 1000+ users.':
+        QuestionReference(
+            'Clients keep a persistent WebSocket connection to chat servers behind a load balancer. Messages '
+            'are stored in a database and fanned out to the other participants through a message broker or '
+            'pub/sub system such as Redis, so any server can deliver to any user. An authentication service '
+            'identifies users, presence tracks who is online, and offline users get notifications. To scale '
+            'beyond 1000 users, add stateless servers horizontally, partition conversations, cache recent '
+            'messages and handle reconnects and message ordering.',
+            ('websocket', 'load balancer', 'database', 'message queue', 'pub/sub', 'authentication',
+             'horizontal scaling', 'message ordering')
+        ),
+    'Describe a challenging coding project you worked on. What obstacles did you face and how did you overcome '
+    'them?':
+        QuestionReference(
+            "Set the situation: the project, its goal and the candidate's role. Describe a specific obstacle, "
+            'such as a hard bug, an unfamiliar technology or a tight deadline. Explain the actions taken to '
+            'overcome it: research, breaking the problem down, asking teammates or mentors for help, testing '
+            'alternatives. End with the result, ideally measurable, and what was learned and would be done '
+            'differently next time.',
+            ('project', 'obstacle', 'deadline', 'debugging', 'team', 'result', 'learned')
+        ),
+    "What's the difference between SQL and NoSQL databases? Give an example of when you'd use each.":
+        QuestionReference(
+            'SQL databases are relational: data lives in tables with a fixed schema, relationships are joined '
+            'with foreign keys, and transactions give ACID guarantees, which suits banking, orders or any '
+            'data with strong consistency needs. NoSQL databases (document, key-value, column and graph '
+            'stores) have a flexible schema and scale horizontally, often trading strict consistency for '
+            'availability, which suits large volumes of semi-structured data such as user activity, caching '
+            'or real-time feeds.',
+            ('relational', 'tables', 'schema', 'joins', 'ACID', 'transactions', 'horizontal scaling',
+             'document store')
+        ),
+}
+
+# Used for questions without a reference of their own
+GENERIC_REFERENCES: Dict[str, QuestionReference] = {
+    Category.TECHNICAL: QuestionReference(
+        'Define the concept precisely, explain how it works underneath, give its time and space complexity, '
+        'compare it with the alternatives and their trade-offs, and illustrate it with a concrete example and '
+        'its edge cases.',
+        ('definition', 'time complexity', 'space complexity', 'trade-off', 'example', 'edge case')
+    ),
+    Category.PROBLEM_SOLVING: QuestionReference(
+        'Clarify the requirements and constraints, reproduce or measure the problem, form hypotheses and test '
+        'them one at a time, find the bottleneck, propose a design or fix with its trade-offs, consider scale '
+        'and failure cases, and verify the result with tests and monitoring.',
+        ('requirements', 'constraints', 'measure', 'hypothesis', 'bottleneck', 'trade-off', 'scale', 'test')
+    ),
+    Category.BEHAVIORAL: QuestionReference(
+        'Describe a specific situation and the task or challenge, the actions personally taken and why, how '
+        'the team was involved, the result and its impact, and what was learned from it.',
+        ('situation', 'challenge', 'action', 'team', 'result', 'learned')
+    ),
+}
+
+@lru_cache(maxsize=1 << 16)
+def _stem(word: str) -> str:
+    """Crude suffix stripping, so 'cached', 'caches' and 'caching' share one stem"""
+    if len(word) <= 3 or not word.isalpha():
+        return word
+    if word.endswith('ies'):
+        word = word[:-3] + 'y'
+    elif word.endswith('ing') and len(word) > 5:
+        word = word[:-3]
+    elif word.endswith('ed') and len(word) > 4:
+        word = word[:-2]
+    elif word.endswith('ly') and len(word) > 5:
+        word = word[:-2]
+    elif word.endswith('s') and not word.endswith('ss'):
+        word = word[:-1]
+    if word.endswith('y'):
+        word = word[:-1] + 'i'
+    if word.endswith('e') and len(word) > 3:
+        word = word[:-1]
+    return word
+
+def _terms_of(words: Iterable[str]) -> List[str]:
+    return [_stem(w) for w in words if w not in _STOPWORDS]
+
+def terms(text: str) -> List[str]:
+    """Stemmed content words of a text, in order"""
+    return _terms_of(_WORD.findall(text.lower()))
+
+@lru_cache(maxsize=1 << 16)
+def _unigram_id(term: str) -> int:
+    return zlib.crc32(term.encode('utf-8')) & _FEATURE_MASK
+
+def _feature_ids(words: Sequence[str]) -> np.ndarray:
+    """Hashed unigram ids followed by bigram ids, which are mixed from the unigram ids in NumPy"""
+    unigrams = np.fromiter(map(_unigram_id, words), np.int64, len(words))
+    mixed = unigrams[:-1] * 0x9E3779B1 + unigrams[1:] * 0x85EBCA77 + 1
+    bigrams = (mixed ^ (mixed >> FEATURE_BITS)) & _FEATURE_MASK
+    return np.concatenate([unigrams, bigrams])
+
+def _reference_text(reference: QuestionReference) -> str:
+    return ' '.join([reference.answer, *reference.key_concepts])
+
+def fit_idf(documents: Iterable[str]) -> np.ndarray:
+    """Smoothed inverse document frequency of every feature bucket over ``documents``"""
+    df = np.zeros(1 << FEATURE_BITS, dtype=np.float32)
+    count = 0
+    for document in documents:
+        df[np.unique(_feature_ids(terms(document)))] += 1
+        count += 1
+    return (np.log((1 + count) / (1 + df)) + 1).astype(np.float32)
+
+# (sorted feature ids, L2-normalized TF-IDF weights)
+SparseVector = Tuple[np.ndarray, np.ndarray]
+
+def vectorize(words: Sequence[str], idf: np.ndarray) -> SparseVector:
+    """Sublinear-TF x IDF vector of a text's hashed unigrams and bigrams"""
+    ids, counts = np.unique(_feature_ids(words), return_counts=True)
+    weights = (1 + np.log(counts)).astype(np.float32) * idf[ids]
+    norm = float(np.linalg.norm(weights))
+    return ids, weights / norm if norm else weights
+
+def cosines(documents: Sequence[Sequence[str]], reference: SparseVector, idf: np.ndarray) -> np.ndarray:
+    """Cosine similarity of every document's TF-IDF vector with ``reference``, in one vectorized pass"""
+    count = len(documents)
+    features = [_feature_ids(words) for words in documents]
+    doc = np.repeat(np.arange(count, dtype=np.int64), [len(f) for f in features])
+    ids = np.concatenate(features) if features else np.empty(0, dtype=np.int64)
+    # Term counts per (document, feature) from one sort of the combined keys
+    keys, counts = np.unique((doc << FEATURE_BITS) | ids, return_counts=True)
+    doc, ids = keys >> FEATURE_BITS, keys & _FEATURE_MASK
+    weights = (1 + np.log(counts)) * idf[ids]
+
+    reference_ids, reference_weights = reference
+    if len(reference_ids):
+        at = np.minimum(np.searchsorted(reference_ids, ids), len(reference_ids) - 1)
+        matched = np.where(reference_ids[at] == ids, reference_weights[at], 0.0)
+    else:
+        matched = np.zeros(len(ids))
+    dots = np.bincount(doc, weights * matched, minlength=count)
+    norms = np.sqrt(np.bincount(doc, weights * weights, minlength=count))
+    return np.divide(dots, norms, out=np.zeros(count), where=norms > 0)
+
+@dataclass
+class Rubric:
+    """A question's reference vector, its key concepts as stem sets, and the answer depth expected"""
+
+    vector: SparseVector
+    concepts: List[Tuple[str, FrozenSet[str]]]
+    depth_words: int
+
+class RubricScorer:
+    """Scores answers against the rubric of their question; thread-safe and model-free"""
+    # Term weights are fitted once, on the built-in, generic and banked references present at
+    # construction. Rubrics of built-in and banked questions are kept in an LRU cache of
+    # ``max_rubrics`` entries.
+
+    def __init__(self, bank: Optional[QuestionBank] = None,
+                 references: Optional[Dict[str, QuestionReference]] = None, max_rubrics: int = 4096):
+        self.bank = bank
+        self.max_rubrics = max_rubrics
+        references = BUILTIN_REFERENCES if references is None else references
+        self._builtin = {normalize_text(text): ref for text, ref in references.items()}
+        corpus = [*self._builtin.values(), *GENERIC_REFERENCES.values(), *(bank.references() if bank else ())]
+        self._idf = fit_idf(_reference_text(ref) for ref in corpus)
+        self._rubrics: 'OrderedDict[str, Rubric]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def _build_rubric(self, reference: QuestionReference, category: str, question: str = '') -> Rubric:
+        words = terms(' '.join([question, _reference_text(reference)]))
+        concepts = [(c, frozenset(terms(c))) for c in reference.key_concepts]
+        return Rubric(
+            vector=vectorize(words, self._idf),
+            concepts=[(name, stems) for name, stems in concepts if stems],
+            depth_words=DEPTH_WORDS.get(category, DEFAULT_DEPTH_WORDS)
+        )
+
+    def rubric_for(self, question: str, category: str) -> Rubric:
+        """The rubric of a question: its own reference if it has one, else its category's"""
+        key = normalize_text(question)
+        with self._lock:
+            rubric = self._rubrics.get(key)
+            if rubric is not None:
+                self._rubrics.move_to_end(key)
+                return rubric
+
+        reference = self._builtin.get(key)
+        if reference is None and self.bank is not None:
+            reference = self.bank.reference(question)
+        if reference is None:
+            # Not cached: the bank may learn this question's reference later
+            generic = GENERIC_REFERENCES.get(category, GENERIC_REFERENCES[Category.TECHNICAL])
+            return self._build_rubric(generic, category, question)
+
+        rubric = self._build_rubric(reference, category)
+        with self._lock:
+            self._rubrics[key] = rubric
+            while len(self._rubrics) > self.max_rubrics:
+                self._rubrics.popitem(last=False)
+        return rubric
+
+    def score_answers(self, responses: Sequence[Response]) -> Dict[int, Dict]:
+        """Per-answer scores keyed by question_id, in the shape of AIInterviewer.score_response"""
+        # Answers are grouped by question, so each rubric is looked up once and the similarities
+        # of its answers are computed together; repeated answers are scored once.
+        groups: Dict[Tuple[str, str], Dict[str, List[int]]] = {}
+        for response in responses:
+            answers = groups.setdefault((response.question, str(response.category)), {})
+            answers.setdefault(response.answer.strip(), []).append(response.question_id)
+
+        answer_scores = {}
+        for (question, category), answers in groups.items():
+            rubric = self.rubric_for(question, category)
+            texts = list(answers)
+            words = [_WORD.findall(text.lower()) if not is_no_answer(text) else [] for text in texts]
+            content = [_terms_of(w) for w in words]
+            similarities = cosines(content, rubric.vector, self._idf)
+            for text, raw, stems, similarity in zip(texts, words, content, similarities):
+                score = _score(text, raw, stems, float(similarity), rubric)
+                for question_id in answers[text]:
+                    answer_scores[question_id] = dict(score)
+        return answer_scores
+
+def _score(answer: str, words: List[str], stems: List[str], similarity: float, rubric: Rubric) -> Dict:
+    if not stems:
+        return {'score': 0, 'communication_score': 0, 'strength': '',
+                'improvement': 'Answer the question, even with a partial idea'}
+
+    present = set(stems)
+    covered = [name for name, concept in rubric.concepts if concept <= present]
+    missing = [name for name, concept in rubric.concepts if not concept <= present]
+    # Half credit for naming part of a multi-word concept
+    partial = sum(1 for _, concept in rubric.concepts
+                  if not concept <= present and len(concept & present) * 2 >= len(concept))
+    similarity = min(1.0, similarity / FULL_SIMILARITY)
+    depth = min(1.0, len(stems) / rubric.depth_words)
+    coverage = (len(covered) + 0.5 * partial) / len(rubric.concepts) if rubric.concepts else similarity
+    score = CONCEPT_WEIGHT * coverage + SIMILARITY_WEIGHT * similarity + DEPTH_WEIGHT * depth
+
+    if covered:
+        strength = f"Covered {' and '.join(covered[:2])}"
+    elif similarity >= 0.5:
+        strength = 'Answer on topic'
+    else:
+        strength = ''
+    if missing:
+        improvement = f"Discuss {', '.join(missing[:2])}"
+    elif depth < 1:
+        improvement = 'Go into more depth, with an example'
+    else:
+        improvement = ''
+    return {
+        'score': int(round(100 * score)),
+        'communication_score': communication_score(answer, words, depth),
+        'strength': strength,
+        'improvement': improvement
+    }
+
+def communication_score(answer: str, words: List[str], depth: float) -> int:
+    """0-100 from the answer's layout: sentences of a readable length, connectives, varied wording"""
+    if not words:
+        return 0
+    sentences = sum(1 for s in _SENTENCE_END.split(answer) if s.count(' ') >= 2)
+    structure = min(1.0, sentences / 3)
+    average = len(words) / max(1, sentences)
+    readability = 1.0 if 6 <= average <= 30 else max(0.3, 1 - abs(math.log(average / 18)) / 3)
+    flow = min(1.0, len(_CONNECTIVES.intersection(words)) / 3)
+    variety = min(1.0, len(set(words)) / len(words) / 0.6)
+    return int(round(100 * (0.3 * depth + 0.2 * structure + 0.2 * readability + 0.15 * flow + 0.15 * variety)))
+
+_default_scorer: Optional[RubricScorer] = None
+_default_lock = threading.Lock()
+
+def get_rubric_scorer() -> RubricScorer:
+    """Process-wide scorer over the shared question bank"""
+    global _default_scorer
+    with _default_lock:
+        if _default_scorer is None:
+            _default_scorer = RubricScorer(get_question_bank())
+        return _default_scorer
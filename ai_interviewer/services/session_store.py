@@ -0,0 +1,311 @@
+import atexit
+import hashlib
+import json
+import logging
+import threading
+import time
+import uuid
+from dataclasses import asdict
+from typing import Dict, Iterator, List, Optional, Tuple
+from models.data_models import Question, Response, ResponseLog
+from utils.storage import connect_sqlite, data_path
+
+logger = logging.getLogger(__name__)
+
+# Fields of st.session_state that make up a resumable interview
+SESSION_FIELDS = ('candidate_name', 'phase', 'current_question', 'questions', 'start_time', 'question_start_time')
+
+# Evaluation fields kept as columns of the evaluations table for analytics
+EVALUATION_SCORE_FIELDS = ('technical_score', 'communication_score', 'problem_solving_score',
+                           'behavioral_score', 'overall_score')
+
+def question_key(text: str) -> int:
+    """Stable 63-bit id of a question text, so the same question can be grouped across interviews"""
+    return int.from_bytes(hashlib.blake2b(text.encode('utf-8'), digest_size=8).digest(), 'little') >> 1
+
+class SessionStore:
+    """SQLite (WAL) store of interviews in progress, with write-behind batching"""
+    # Saves are queued and coalesced per session / per answer, then written by a single background
+    # thread every ``flush_interval`` seconds, so a submit never waits on disk. Reads flush first,
+    # so a worker always sees its own writes; other workers see them after at most one flush
+    # interval.
+
+    def __init__(self, db_path: Optional[str] = None, flush_interval: float = 0.5):
+        self.db_path = db_path or data_path('sessions.sqlite3')
+        self.flush_interval = flush_interval
+        self._conn = connect_sqlite(self.db_path)
+        self._conn.executescript(
+            'CREATE TABLE IF NOT EXISTS sessions ('
+            ' session_id TEXT PRIMARY KEY,'
+            ' candidate_name TEXT,'
+            ' phase TEXT,'
+            ' current_question INTEGER,'
+            ' questions TEXT,'
+            ' start_time REAL,'
+            ' question_start_time REAL,'
+            ' updated_at REAL NOT NULL);'
+            'CREATE TABLE IF NOT EXISTS responses ('
+            ' session_id TEXT NOT NULL,'
+            ' question_id INTEGER NOT NULL,'
+            ' question TEXT NOT NULL,'
+            ' category TEXT NOT NULL,'
+            ' answer TEXT NOT NULL,'
+            ' time_taken REAL NOT NULL,'
+            ' updated_at REAL NOT NULL,'
+            ' PRIMARY KEY (session_id, question_id));'
+            'CREATE TABLE IF NOT EXISTS evaluations ('
+            ' session_id TEXT PRIMARY KEY,'
+            ' technical_score REAL,'
+            ' communication_score REAL,'
+            ' problem_solving_score REAL,'
+            ' behavioral_score REAL,'
+            ' overall_score REAL,'
+            ' recommendation TEXT,'
+            ' completed_at REAL NOT NULL,'
+            ' evaluation TEXT);'
+            'CREATE TABLE IF NOT EXISTS answer_results ('
+            ' session_id TEXT NOT NULL,'
+            ' question_id INTEGER NOT NULL,'
+            ' question_key INTEGER NOT NULL,'
+            ' question TEXT NOT NULL,'
+            ' category TEXT NOT NULL,'
+            ' difficulty TEXT,'
+            ' score REAL,'
+            ' time_taken REAL NOT NULL,'
+            ' PRIMARY KEY (session_id, question_id));'
+        )
+        self._conn.commit()
+
+        self._db_lock = threading.Lock()
+        self._pending_lock = threading.Lock()
+        self._pending_sessions: Dict[str, Dict] = {}
+        self._pending_responses: Dict[tuple, Response] = {}
+        self._pending_evaluations: Dict[str, Tuple[tuple, List[tuple]]] = {}
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name='session-store-writer', daemon=True)
+        self._writer.start()
+        atexit.register(self.close)
+
+    @staticmethod
+    def new_session_id() -> str:
+        return uuid.uuid4().hex
+
+    def save_session(self, session_id: str, state: Dict) -> None:
+        """Queue the session-level fields; later saves of the same session replace earlier ones"""
+        snapshot = {key: state.get(key) for key in SESSION_FIELDS}
+        snapshot['questions'] = [asdict(q) for q in snapshot['questions'] or []]
+        with self._pending_lock:
+            self._pending_sessions[session_id] = snapshot
+
+    def save_response(self, session_id: str, response: Response) -> None:
+        """Queue one answer; re-saving the same question before a flush keeps only the latest"""
+        with self._pending_lock:
+            self._pending_responses[(session_id, response.question_id)] = response
+
+    def save_evaluation(self, session_id: str, evaluation: Dict, questions: List[Question],
+                        responses, answer_scores: Optional[Dict[int, Dict]] = None) -> None:
+        """Queue the final evaluation and one analytics row per answer; re-saving replaces both"""
+        difficulty = {q.id: q.difficulty for q in questions}
+        completed_at = time.time()
+        evaluation_row = (
+            session_id,
+            *[evaluation.get(name) for name in EVALUATION_SCORE_FIELDS],
+            evaluation.get('recommendation'),
+            completed_at,
+            json.dumps(evaluation, ensure_ascii=False)
+        )
+        answer_rows = [
+            (session_id, r.question_id, question_key(r.question), r.question, str(r.category),
+             None if difficulty.get(r.question_id) is None else str(difficulty[r.question_id]),
+             (answer_scores or {}).get(r.question_id, {}).get('score'), r.time_taken)
+            for r in responses
+        ]
+        with self._pending_lock:
+            self._pending_evaluations[session_id] = (evaluation_row, answer_rows)
+
+    def fetch_results(self) -> Tuple[List[tuple], List[tuple]]:
+        """Every stored evaluation row and answer row, for bulk analytics"""
+        # Evaluation rows are (session_id, *EVALUATION_SCORE_FIELDS, recommendation,
+        # completed_at); answer rows are (session_id, question_key, question, category,
+        # difficulty, score, time_taken).
+        self.flush()
+        with self._db_lock:
+            evaluations = self._conn.execute(
+                f"SELECT session_id, {', '.join(EVALUATION_SCORE_FIELDS)}, recommendation, completed_at"
+                ' FROM evaluations'
+            ).fetchall()
+            answers = self._conn.execute(
+                'SELECT session_id, question_key, question, category, difficulty, score, time_taken'
+                ' FROM answer_results'
+            ).fetchall()
+        return evaluations, answers
+
+    def iter_reports(self, since: Optional[float] = None, until: Optional[float] = None,
+                     batch_size: int = 200) -> Iterator[Dict]:
+        """Finished interviews completed in [since, until), oldest first"""
+        # Reads ``batch_size`` interviews at a time, so exporting any number of them holds only
+        # one batch in memory. Each item has ``session_id``, ``candidate_name``, ``completed_at``,
+        # ``evaluation`` and ``responses``.
+        self.flush()
+        cursor = (since or 0.0, '')
+        while True:
+            with self._db_lock:
+                rows = self._conn.execute(
+                    f'SELECT e.session_id, s.candidate_name, e.completed_at, e.evaluation,'
+                    f" {', '.join('e.' + name for name in EVALUATION_SCORE_FIELDS)}, e.recommendation"
+                    ' FROM evaluations e LEFT JOIN sessions s ON s.session_id = e.session_id'
+                    ' WHERE (e.completed_at, e.session_id) > (?, ?) AND e.completed_at < ?'
+                    ' ORDER BY e.completed_at, e.session_id LIMIT ?',
+                    (*cursor, float('inf') if until is None else until, batch_size)
+                ).fetchall()
+                if not rows:
+                    return
+                placeholders = ', '.join('?' * len(rows))
+                response_rows = self._conn.execute(
+                    'SELECT session_id, question_id, question, category, answer, time_taken FROM responses'
+                    f' WHERE session_id IN ({placeholders}) ORDER BY rowid',
+                    [row[0] for row in rows]
+                ).fetchall()
+
+            responses: Dict[str, List[Response]] = {}
+            for session_id, *fields in response_rows:
+                responses.setdefault(session_id, []).append(Response(*fields))
+
+            for session_id, candidate_name, completed_at, evaluation_json, *scores in rows:
+                if evaluation_json:
+                    evaluation = json.loads(evaluation_json)
+                else:
+                    evaluation = dict(zip(EVALUATION_SCORE_FIELDS + ('recommendation',), scores))
+                yield {
+                    'session_id': session_id,
+                    'candidate_name': candidate_name or '',
+                    'completed_at': completed_at,
+                    'evaluation': evaluation,
+                    'responses': responses.get(session_id, []),
+                }
+            cursor = (rows[-1][2], rows[-1][0])
+
+    def load_session(self, session_id: str) -> Optional[Dict]:
+        """Session fields plus ``responses``, or None if the session is unknown"""
+        self.flush()
+        with self._db_lock:
+            row = self._conn.execute(
+                'SELECT candidate_name, phase, current_question, questions, start_time, question_start_time'
+                ' FROM sessions WHERE session_id = ?',
+                (session_id,)
+            ).fetchone()
+            if row is None:
+                return None
+            response_rows = self._conn.execute(
+                'SELECT question_id, question, category, answer, time_taken FROM responses'
+                ' WHERE session_id = ? ORDER BY rowid',
+                (session_id,)
+            ).fetchall()
+
+        state = dict(zip(SESSION_FIELDS, row))
+        state['questions'] = [Question(**q) for q in json.loads(state['questions'] or '[]')]
+        state['responses'] = ResponseLog(Response(*r) for r in response_rows)
+        return state
+
+    def delete_session(self, session_id: str) -> None:
+        with self._pending_lock:
+            self._pending_sessions.pop(session_id, None)
+            for key in [k for k in self._pending_responses if k[0] == session_id]:
+                del self._pending_responses[key]
+            self._pending_evaluations.pop(session_id, None)
+        with self._db_lock:
+            self._conn.execute('DELETE FROM answer_results WHERE session_id = ?', (session_id,))
+            self._conn.execute('DELETE FROM evaluations WHERE session_id = ?', (session_id,))
+            self._conn.execute('DELETE FROM responses WHERE session_id = ?', (session_id,))
+            self._conn.execute('DELETE FROM sessions WHERE session_id = ?', (session_id,))
+            self._conn.commit()
+
+    def flush(self) -> None:
+        """Write every queued save in one transaction"""
+        # Holding the DB lock across swap and write keeps concurrent flushes in order
+        with self._db_lock:
+            with self._pending_lock:
+                sessions, self._pending_sessions = self._pending_sessions, {}
+                responses, self._pending_responses = self._pending_responses, {}
+                evaluations, self._pending_evaluations = self._pending_evaluations, {}
+            if not sessions and not responses and not evaluations:
+                return
+
+            try:
+                self._write(sessions, responses, evaluations, time.time())
+            except Exception:
+                # Put the batch back unless a newer save for the same key arrived meanwhile
+                with self._pending_lock:
+                    for sid, snapshot in sessions.items():
+                        self._pending_sessions.setdefault(sid, snapshot)
+                    for key, response in responses.items():
+                        self._pending_responses.setdefault(key, response)
+                    for sid, rows in evaluations.items():
+                        self._pending_evaluations.setdefault(sid, rows)
+                raise
+
+    def _write(self, sessions: Dict[str, Dict], responses: Dict[tuple, Response],
+               evaluations: Dict[str, Tuple[tuple, List[tuple]]], now: float) -> None:
+        with self._conn:
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO sessions (session_id, candidate_name, phase, current_question,'
+                ' questions, start_time, question_start_time, updated_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                [
+                    (sid, s['candidate_name'], s['phase'], s['current_question'], json.dumps(s['questions']),
+                     s['start_time'], s['question_start_time'], now)
+                    for sid, s in sessions.items()
+                ]
+            )
+            # Upsert keeps the original rowid, so answers stay in the order first given
+            self._conn.executemany(
+                'INSERT INTO responses (session_id, question_id, question, category, answer, time_taken,'
+                ' updated_at) VALUES (?, ?, ?, ?, ?, ?, ?)'
+                ' ON CONFLICT (session_id, question_id) DO UPDATE SET question = excluded.question,'
+                ' category = excluded.category, answer = excluded.answer,'
+                ' time_taken = excluded.time_taken, updated_at = excluded.updated_at',
+                [
+                    (sid, r.question_id, r.question, r.category, r.answer, r.time_taken, now)
+                    for (sid, _), r in responses.items()
+                ]
+            )
+            for sid, (evaluation_row, answer_rows) in evaluations.items():
+                self._conn.execute(
+                    f"INSERT OR REPLACE INTO evaluations (session_id, {', '.join(EVALUATION_SCORE_FIELDS)},"
+                    ' recommendation, completed_at, evaluation) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)',
+                    evaluation_row
+                )
+                self._conn.execute('DELETE FROM answer_results WHERE session_id = ?', (sid,))
+                self._conn.executemany(
+                    'INSERT INTO answer_results (session_id, question_id, question_key, question, category,'
+                    ' difficulty, score, time_taken) VALUES (?, ?, ?, ?, ?, ?, ?, ?)',
+                    answer_rows
+                )
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self._wakeup.set()
+        self._writer.join(timeout=5)
+        self.flush()
+
+    def _write_loop(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.flush_interval)
+            try:
+                self.flush()
+            except Exception as e:
+                # The batch was requeued; the next flush retries it
+                logger.warning('Session store flush failed: %s', e)
+
+_default_store: Optional[SessionStore] = None
+_default_lock = threading.Lock()
+
+def get_session_store() -> SessionStore:
+    """Process-wide session store shared by every session"""
+    global _default_store
+    with _default_lock:
+        if _default_store is None:
+            _default_store = SessionStore()
+        return _default_store
@@ -0,0 +1,284 @@
+"""JSON-mode output for question generation and evaluation"""
+# Both calls ask the model for ``application/json`` constrained by a ``response_schema``. What
+# comes back is still checked locally: small deviations (wrong enum casing, a score sent as a
+# string, a missing list) are fixed in place, and only output that cannot be fixed costs one short
+# repair request. Every structured call ends in one of four outcomes - valid, fixed, repaired or
+# wasted - counted to tune prompts and schemas.
+import json
+import threading
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+from models.data_models import Category, Difficulty, QuestionReference
+from services.llm_backend import GenerationSettings
+from services.telemetry import PARSE_SECONDS, STRUCTURED_OUTCOMES, span
+from utils.json_stream import parse_json_array_prefix
+
+JSON_MIME_TYPE = 'application/json'
+
+EVALUATION_SCORE_KEYS = ('technical_score', 'communication_score', 'problem_solving_score',
+                         'behavioral_score', 'overall_score')
+RECOMMENDATIONS = ('Strong Hire', 'Hire', 'Conditional Hire', 'Hold', 'No Hire')
+
+EVALUATION_DEFAULTS = {
+    'strengths': ['Completed all questions'],
+    'improvements': ['Continue learning and practicing'],
+    'detailed_feedback': 'Candidate completed the interview process.',
+    'recommendation': 'Under Review',
+}
+
+def _enum_schema(values) -> Dict:
+    return {'type': 'string', 'format': 'enum', 'enum': list(values)}
+
+# Gemini schemas are an OpenAPI subset: no minimum/maximum, so score ranges are checked locally
+QUESTION_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        'id': {'type': 'integer'},
+        'text': {'type': 'string'},
+        'category': _enum_schema(c.value for c in Category),
+        'difficulty': _enum_schema(d.value for d in Difficulty),
+        'reference_answer': {'type': 'string'},
+        'key_concepts': {'type': 'array', 'items': {'type': 'string'}},
+    },
+    'required': ['text', 'category', 'difficulty'],
+}
+
+QUESTION_SET_SCHEMA = {'type': 'array', 'items': QUESTION_SCHEMA}
+
+EVALUATION_SCHEMA = {
+    'type': 'object',
+    'properties': {
+        **{key: {'type': 'integer'} for key in EVALUATION_SCORE_KEYS},
+        'strengths': {'type': 'array', 'items': {'type': 'string'}},
+        'improvements': {'type': 'array', 'items': {'type': 'string'}},
+        'detailed_feedback': {'type': 'string'},
+        'recommendation': _enum_schema(RECOMMENDATIONS),
+    },
+    'required': [*EVALUATION_SCORE_KEYS, 'strengths', 'improvements', 'detailed_feedback', 'recommendation'],
+}
+
+class StructuredOutputError(ValueError):
+    """Model output that neither parses nor can be fixed locally"""
+
+    def __init__(self, message: str, raw_text: str = ''):
+        super().__init__(message)
+        self.raw_text = raw_text
+
+def _match_enum(value: Any, members) -> Optional[str]:
+    """Canonical enum value for a loosely written one ('problem solving' -> 'Problem-Solving')"""
+    wanted = ''.join(ch for ch in str(value).lower() if ch.isalnum())
+    for member in members:
+        if ''.join(ch for ch in member.lower() if ch.isalnum()) == wanted:
+            return member
+    return None
+
+def fix_question(data: Any) -> Tuple[Optional[Dict], int]:
+    """One question object with category and difficulty normalized; (None, 1) if unusable"""
+    if not isinstance(data, dict):
+        return None, 1
+    text = str(data.get('text') or data.get('question') or '').strip()
+    if not text:
+        return None, 1
+
+    fixes = 0 if 'text' in data else 1
+    question = {'id': data.get('id'), 'text': text}
+    for key, enum, default in (('category', Category, Category.TECHNICAL.value),
+                               ('difficulty', Difficulty, Difficulty.MEDIUM.value)):
+        value = _match_enum(data.get(key, ''), [m.value for m in enum])
+        if value != data.get(key):
+            fixes += 1
+        question[key] = value or default
+
+    # Optional: what the offline rubric scorer compares answers with
+    reference_answer = data.get('reference_answer')
+    if isinstance(reference_answer, str) and reference_answer.strip():
+        question['reference_answer'] = reference_answer.strip()
+    key_concepts = data.get('key_concepts')
+    if isinstance(key_concepts, str):
+        key_concepts = key_concepts.split(',')
+        fixes += 1
+    if isinstance(key_concepts, list):
+        concepts = [str(c).strip() for c in key_concepts if str(c).strip()]
+        if concepts:
+            question['key_concepts'] = concepts
+    return question, fixes
+
+def question_references(questions: List[Dict]) -> Dict[str, QuestionReference]:
+    """Reference answer and key concepts of each fixed question that came with them, keyed by text"""
+    return {
+        q['text']: QuestionReference(q.get('reference_answer', ''), tuple(q.get('key_concepts', ())))
+        for q in questions if q.get('reference_answer') or q.get('key_concepts')
+    }
+
+def validate_question_set(data: Any) -> Tuple[List[Dict], int]:
+    """Usable questions of a parsed question set and the number of fixes applied"""
+    fixes = 0
+    if isinstance(data, dict):
+        # {"questions": [...]} or a lone question object
+        wrapped = next((v for v in data.values() if isinstance(v, list)), None)
+        data = wrapped if wrapped is not None else [data]
+        fixes += 1
+    if not isinstance(data, list):
+        raise StructuredOutputError('Question set is not a JSON array')
+
+    questions = []
+    for item in data:
+        question, item_fixes = fix_question(item)
+        fixes += item_fixes
+        if question is not None:
+            questions.append(question)
+    if not questions:
+        raise StructuredOutputError('Could not find any valid questions in AI response')
+    return questions, fixes
+
+def _as_score(value: Any) -> int:
+    return max(0, min(100, int(round(float(str(value).strip().rstrip('%'))))))
+
+def validate_evaluation(data: Any) -> Tuple[Dict, int]:
+    """Evaluation with scores clamped to 0-100 and missing fields filled, and the number of fixes"""
+    fixes = 0
+    if isinstance(data, dict) and len(data) == 1 and isinstance(next(iter(data.values())), dict):
+        data = next(iter(data.values()))  # {"evaluation": {...}}
+        fixes += 1
+    if not isinstance(data, dict):
+        raise StructuredOutputError('Evaluation is not a JSON object')
+
+    evaluation = dict(data)
+    category_scores = []
+    for key in EVALUATION_SCORE_KEYS:
+        if key not in evaluation:
+            continue
+        try:
+            score = _as_score(evaluation[key])
+        except (TypeError, ValueError):
+            raise StructuredOutputError(f'Evaluation score {key} is not a number')
+        fixes += score != evaluation[key]
+        evaluation[key] = score
+        if key != 'overall_score':
+            category_scores.append(score)
+
+    if not category_scores:
+        raise StructuredOutputError('Evaluation has no scores')
+    if 'overall_score' not in evaluation:
+        evaluation['overall_score'] = round(sum(category_scores) / len(category_scores))
+        fixes += 1
+
+    for key in ('strengths', 'improvements'):
+        value = evaluation.get(key)
+        if isinstance(value, str):
+            evaluation[key] = [value]
+            fixes += 1
+        elif isinstance(value, list):
+            evaluation[key] = [str(item) for item in value if str(item).strip()]
+
+    recommendation = _match_enum(evaluation.get('recommendation', ''), RECOMMENDATIONS)
+    if recommendation and recommendation != evaluation['recommendation']:
+        evaluation['recommendation'] = recommendation
+        fixes += 1
+
+    for key, default in EVALUATION_DEFAULTS.items():
+        if not evaluation.get(key):
+            evaluation[key] = list(default) if isinstance(default, list) else default
+            fixes += 1
+    return evaluation, fixes
+
+@dataclass(frozen=True)
+class OutputSpec:
+    """What a structured call must return: its name, response schema and local validator"""
+
+    name: str
+    schema: Dict
+    validate: Callable[[Any], Tuple[Any, int]]
+
+QUESTION_SET = OutputSpec('question set', QUESTION_SET_SCHEMA, validate_question_set)
+EVALUATION = OutputSpec('evaluation', EVALUATION_SCHEMA, validate_evaluation)
+
+def json_settings(spec: OutputSpec, temperature: float, max_output_tokens: int,
+                  top_p: float = 0.9, static_prefix: Optional[str] = None) -> GenerationSettings:
+    return GenerationSettings(
+        temperature=temperature,
+        max_output_tokens=max_output_tokens,
+        top_p=top_p,
+        response_mime_type=JSON_MIME_TYPE,
+        response_schema=spec.schema,
+        static_prefix=static_prefix
+    )
+
+def _load_json(text: str) -> Tuple[Any, int]:
+    """JSON value of a response; fences, chatter and a cut-off array cost one fix"""
+    try:
+        return json.loads(text), 0
+    except json.JSONDecodeError:
+        pass
+
+    start = min((i for i in (text.find('{'), text.find('[')) if i != -1), default=-1)
+    if start == -1:
+        raise StructuredOutputError('No JSON in response', text)
+    end = text.rfind('}' if text[start] == '{' else ']') + 1
+    try:
+        return json.loads(text[start:end]), 1
+    except json.JSONDecodeError as e:
+        if text[start] == '[':
+            # Truncated array: keep every element that was written completely
+            items = parse_json_array_prefix(text[start:])
+            if items:
+                return items, 1
+        raise StructuredOutputError(f'Invalid JSON in response: {e}', text)
+
+def parse_structured(text: str, spec: OutputSpec) -> Tuple[Any, int]:
+    """Validated value of a response and the number of local fixes; raises StructuredOutputError"""
+    text = (text or '').strip()
+    with span('json.parse', PARSE_SECONDS, output=spec.name, chars=len(text)) as parse:
+        if not text:
+            raise StructuredOutputError(f'Empty {spec.name} response')
+        data, fixes = _load_json(text)
+        try:
+            value, validation_fixes = spec.validate(data)
+        except StructuredOutputError as e:
+            e.raw_text = text
+            raise
+        parse.set(fixes=fixes + validation_fixes)
+        return value, fixes + validation_fixes
+
+def repair_prompt(spec: OutputSpec, raw_text: str, error: Exception, max_chars: int = 6000) -> str:
+    """Short request to rewrite invalid output to the schema; the original prompt is not resent"""
+    return (
+        f'Repair this JSON {spec.name} so it is valid JSON matching the response schema. '
+        f'Keep every value that is already usable and change nothing else.\n'
+        f'Problem: {error}\n'
+        f'Output to repair:\n{raw_text[:max_chars]}'
+    )
+
+def repair_settings(spec: OutputSpec) -> GenerationSettings:
+    return json_settings(spec, temperature=0.0, max_output_tokens=2500, top_p=1.0)
+
+class StructuredOutputMetrics:
+    """How structured calls ended; ``wasted`` calls were paid for but their output discarded"""
+
+    OUTCOMES = ('valid', 'fixed', 'repaired', 'wasted')
+
+    def __init__(self):
+        self._counts = dict.fromkeys(self.OUTCOMES + ('repair_requests',), 0)
+        self._lock = threading.Lock()
+
+    def record(self, outcome: str, repair_requests: int = 0) -> None:
+        with self._lock:
+            self._counts[outcome] += 1
+            self._counts['repair_requests'] += repair_requests
+
+    def snapshot(self) -> Dict[str, float]:
+        """Counts plus calls and wasted_rate (wasted / calls)"""
+        with self._lock:
+            counts = dict(self._counts)
+        counts['calls'] = sum(counts[outcome] for outcome in self.OUTCOMES)
+        counts['wasted_rate'] = counts['wasted'] / counts['calls'] if counts['calls'] else 0.0
+        return counts
+
+_metrics = StructuredOutputMetrics()
+
+def record_outcome(outcome: str, repair_requests: int = 0) -> None:
+    _metrics.record(outcome, repair_requests)
+    STRUCTURED_OUTCOMES.inc(outcome=outcome)
+
+def structured_output_metrics() -> Dict[str, float]:
+    return _metrics.snapshot()
@@ -0,0 +1,307 @@
+"""Metrics and trace spans for the model calls and Streamlit reruns"""
+# Metrics live in process as Prometheus counters and histograms. Set AI_INTERVIEWER_METRICS_PORT
+# to serve them at ``http://<host>:<port>/metrics``, or call ``render_prometheus()``. Spans carry
+# a trace id, parent, duration, status and attributes. A background thread exports them as JSON
+# lines to AI_INTERVIEWER_TRACE_FILE, or POSTs them in JSON batches to
+# AI_INTERVIEWER_TRACE_ENDPOINT, so recording a span never blocks a rerun. With neither variable
+# set, spans are only used for the metrics.
+import contextvars
+import json
+import logging
+import os
+import queue
+import threading
+import time
+import urllib.request
+from contextlib import contextmanager
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+METRICS_PORT_ENV = 'AI_INTERVIEWER_METRICS_PORT'
+TRACE_FILE_ENV = 'AI_INTERVIEWER_TRACE_FILE'
+TRACE_ENDPOINT_ENV = 'AI_INTERVIEWER_TRACE_ENDPOINT'
+
+logger = logging.getLogger(__name__)
+
+LATENCY_BUCKETS = (0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 45.0, 60.0, 90.0)
+
+def _escape(value) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _label_text(names: Sequence[str], values: Sequence) -> str:
+    if not names:
+        return ''
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in zip(names, values)) + '}'
+
+class Counter:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self._values: Dict[Tuple, float] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1, **labels) -> None:
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels) -> float:
+        with self._lock:
+            return self._values.get(tuple(str(labels.get(name, '')) for name in self.labelnames), 0)
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} counter']
+        with self._lock:
+            values = sorted(self._values.items())
+        lines.extend(f'{self.name}{_label_text(self.labelnames, key)} {value:g}' for key, value in values)
+        return lines
+
+class Histogram:
+    def __init__(self, name: str, help_text: str, labelnames: Sequence[str] = (),
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.help_text = help_text
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        # labels -> [per-bucket counts..., +Inf count, sum]
+        self._values: Dict[Tuple, List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, **labels) -> None:
+        key = tuple(str(labels.get(name, '')) for name in self.labelnames)
+        with self._lock:
+            counts = self._values.setdefault(key, [0] * (len(self.buckets) + 2))
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+            counts[-2] += 1
+            counts[-1] += value
+
+    def count(self, **labels) -> int:
+        with self._lock:
+            counts = self._values.get(tuple(str(labels.get(name, '')) for name in self.labelnames))
+            return int(counts[-2]) if counts else 0
+
+    def render(self) -> List[str]:
+        lines = [f'# HELP {self.name} {self.help_text}', f'# TYPE {self.name} histogram']
+        with self._lock:
+            values = sorted((key, list(counts)) for key, counts in self._values.items())
+        names = self.labelnames + ('le',)
+        for key, counts in values:
+            for bound, count in zip(self.buckets, counts):
+                lines.append(f"{self.name}_bucket{_label_text(names, key + (f'{bound:g}',))} {count:g}")
+            lines.append(f"{self.name}_bucket{_label_text(names, key + ('+Inf',))} {counts[-2]:g}")
+            lines.append(f'{self.name}_sum{_label_text(self.labelnames, key)} {counts[-1]:.6f}')
+            lines.append(f'{self.name}_count{_label_text(self.labelnames, key)} {counts[-2]:g}')
+        return lines
+
+LLM_REQUEST_SECONDS = Histogram(
+    'ai_interviewer_llm_request_seconds', 'Latency of one model request attempt', ('model', 'kind', 'outcome')
+)
+LLM_TOKENS = Counter(
+    'ai_interviewer_llm_tokens_total', 'Tokens reported in usage_metadata', ('model', 'kind', 'direction')
+)
+LLM_RETRIES = Counter(
+    'ai_interviewer_llm_retries_total', 'Model requests retried after a retryable error', ('model', 'kind')
+)
+PROBE_SECONDS = Histogram(
+    'ai_interviewer_model_probe_seconds', 'Latency of model availability probes', ('model', 'outcome')
+)
+PARSE_SECONDS = Histogram(
+    'ai_interviewer_parse_seconds', 'Time to parse and validate a structured model response',
+    ('output', 'outcome'), buckets=(0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1)
+)
+STRUCTURED_OUTCOMES = Counter(
+    'ai_interviewer_structured_output_total', 'How structured model calls ended', ('outcome',)
+)
+FALLBACKS = Counter(
+    'ai_interviewer_fallbacks_total', 'Canned or local results used instead of a model answer',
+    ('component', 'reason')
+)
+RERUN_SECONDS = Histogram(
+    'ai_interviewer_rerun_seconds', 'Duration of full main() script reruns', ('phase', 'outcome')
+)
+PROMPT_CACHE_EVENTS = Counter(
+    'ai_interviewer_prompt_cache_total', 'Prompt-prefix cache lookups and cached-content lifecycle', ('event',)
+)
+SPANS_DROPPED = Counter(
+    'ai_interviewer_trace_spans_dropped_total', 'Spans not exported because the queue was full or export failed'
+)
+
+METRICS = [LLM_REQUEST_SECONDS, LLM_TOKENS, LLM_RETRIES, PROBE_SECONDS, PARSE_SECONDS, STRUCTURED_OUTCOMES,
+           FALLBACKS, RERUN_SECONDS, PROMPT_CACHE_EVENTS, SPANS_DROPPED]
+
+def render_prometheus() -> str:
+    """Every metric in the Prometheus text exposition format"""
+    return '\n'.join(line for metric in METRICS for line in metric.render()) + '\n'
+
+class Span:
+    """One timed operation; attributes named like a histogram's labels become its labels"""
+
+    __slots__ = ('name', 'trace_id', 'span_id', 'parent_id', 'attributes', 'events', 'start', 'duration', 'status')
+
+    def __init__(self, name: str, parent: Optional['Span'], attributes: Dict):
+        self.name = name
+        self.trace_id = parent.trace_id if parent is not None else os.urandom(16).hex()
+        self.span_id = os.urandom(8).hex()
+        self.parent_id = parent.span_id if parent is not None else None
+        self.attributes = attributes
+        self.events: List[Dict] = []
+        self.start = time.time()
+        self.duration = 0.0
+        self.status = 'ok'
+
+    def set(self, **attributes) -> None:
+        self.attributes.update(attributes)
+
+    def event(self, name: str, **attributes) -> None:
+        self.events.append({'name': name, 'time': time.time(), **attributes})
+
+    def to_dict(self) -> Dict:
+        return {
+            'name': self.name, 'trace_id': self.trace_id, 'span_id': self.span_id, 'parent_id': self.parent_id,
+            'start': self.start, 'duration': self.duration, 'status': self.status,
+            'attributes': self.attributes, 'events': self.events,
+        }
+
+_current_span: contextvars.ContextVar[Optional[Span]] = contextvars.ContextVar('current_span', default=None)
+
+@contextmanager
+def span(name: str, histogram: Optional[Histogram] = None, **attributes) -> Iterator[Span]:
+    """Time the block as a child of the current span"""
+    # The status is ``ok``, ``error`` (an exception) or ``aborted`` (cancellation, or a Streamlit
+    # rerun/stop). ``histogram`` observes the duration with its labels taken from the span's
+    # attributes and ``outcome`` set to the status.
+    current = Span(name, _current_span.get(), attributes)
+    token = _current_span.set(current)
+    started = time.perf_counter()
+    try:
+        yield current
+    except Exception as e:
+        current.status = 'error'
+        current.attributes.setdefault('error', f'{type(e).__name__}: {str(e)[:200]}')
+        raise
+    except BaseException:
+        current.status = 'aborted'
+        raise
+    finally:
+        current.duration = time.perf_counter() - started
+        _current_span.reset(token)
+        if histogram is not None:
+            histogram.observe(current.duration, **{**current.attributes, 'outcome': current.status})
+        _export(current)
+
+def current_span() -> Optional[Span]:
+    return _current_span.get()
+
+def record_tokens(model_name: str, kind: str, prompt_tokens: Optional[int], output_tokens: Optional[int],
+                  cached_tokens: Optional[int] = None) -> None:
+    """``cached_tokens`` is the part of ``prompt_tokens`` served from cached content"""
+    if prompt_tokens:
+        LLM_TOKENS.inc(prompt_tokens, model=model_name, kind=kind, direction='prompt')
+    if output_tokens:
+        LLM_TOKENS.inc(output_tokens, model=model_name, kind=kind, direction='output')
+    if cached_tokens:
+        LLM_TOKENS.inc(cached_tokens, model=model_name, kind=kind, direction='cached')
+    active = _current_span.get()
+    if active is not None:
+        active.set(prompt_tokens=prompt_tokens, output_tokens=output_tokens, cached_tokens=cached_tokens)
+
+def record_fallback(component: str, reason: str) -> None:
+    """Count a fallback decision and note it on the current span"""
+    FALLBACKS.inc(component=component, reason=reason)
+    active = _current_span.get()
+    if active is not None:
+        active.event('fallback', component=component, reason=reason)
+
+class _SpanExporter:
+    """Background writer of finished spans to a JSON-lines file or an HTTP endpoint"""
+
+    def __init__(self, path: Optional[str], endpoint: Optional[str], max_queue: int = 10000,
+                 batch_size: int = 200, interval: float = 1.0):
+        self.path = path
+        self.endpoint = endpoint
+        self.batch_size = batch_size
+        self.interval = interval
+        self._queue: 'queue.Queue[Dict]' = queue.Queue(maxsize=max_queue)
+        threading.Thread(target=self._run, name='trace-exporter', daemon=True).start()
+
+    def submit(self, record: Dict) -> None:
+        try:
+            self._queue.put_nowait(record)
+        except queue.Full:
+            SPANS_DROPPED.inc()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + self.interval
+            while len(batch) < self.batch_size and time.monotonic() < deadline:
+                try:
+                    batch.append(self._queue.get(timeout=max(0.0, deadline - time.monotonic())))
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                SPANS_DROPPED.inc(len(batch))
+                logger.warning('Trace export failed, %d span(s) dropped: %s', len(batch), e)
+
+    def _write(self, batch: List[Dict]) -> None:
+        if self.path:
+            with open(self.path, 'a', encoding='utf-8') as f:
+                f.writelines(json.dumps(record, default=str) + '\n' for record in batch)
+        if self.endpoint:
+            request = urllib.request.Request(
+                self.endpoint, data=json.dumps(batch, default=str).encode('utf-8'),
+                headers={'Content-Type': 'application/json'}, method='POST'
+            )
+            urllib.request.urlopen(request, timeout=5).close()
+
+_exporter: Optional[_SpanExporter] = None
+_started = False
+_lock = threading.Lock()
+
+def _export(finished: Span) -> None:
+    if _exporter is not None:
+        _exporter.submit(finished.to_dict())
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_telemetry() -> bool:
+    """Start the span exporter and metrics server configured by the environment, once per process"""
+    global _exporter, _started
+    with _lock:
+        if _started:
+            return False
+        _started = True
+
+    path = os.environ.get(TRACE_FILE_ENV)
+    endpoint = os.environ.get(TRACE_ENDPOINT_ENV)
+    if path or endpoint:
+        _exporter = _SpanExporter(path, endpoint)
+
+    port = os.environ.get(METRICS_PORT_ENV)
+    if port:
+        try:
+            server = ThreadingHTTPServer(('0.0.0.0', int(port)), _MetricsHandler)
+        except (OSError, ValueError) as e:
+            logger.error('Metrics endpoint not started on port %s: %s', port, e)
+        else:
+            threading.Thread(target=server.serve_forever, name='metrics-server', daemon=True).start()
+            logger.info('Serving Prometheus metrics on :%s/metrics', port)
+    return True
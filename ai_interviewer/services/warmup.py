@@ -0,0 +1,94 @@
+"""Optional warm-up that moves cold-start work off the first candidate's request"""
+# Enabled with AI_INTERVIEWER_WARMUP=1. The first script run in a process starts one background
+# thread that imports the Gemini SDK, opens the local caches and, when GEMINI_API_KEY is set,
+# resolves and caches the model. Readiness is exposed through ``is_ready()`` and, for container
+# probes, a marker file at AI_INTERVIEWER_READY_FILE.
+import os
+import threading
+import time
+from typing import Dict, Optional
+
+WARMUP_ENV = 'AI_INTERVIEWER_WARMUP'
+READY_FILE_ENV = 'AI_INTERVIEWER_READY_FILE'
+
+_ready = threading.Event()
+_started = False
+_lock = threading.Lock()
+_status: Dict = {'stage': 'not started', 'error': None, 'timings': {}}
+
+def warmup_enabled() -> bool:
+    return os.environ.get(WARMUP_ENV, '').lower() in ('1', 'true', 'yes')
+
+def start_warmup(api_key: Optional[str] = None) -> bool:
+    """Start the warm-up thread once per process; returns True if this call started it"""
+    global _started
+    with _lock:
+        if _started:
+            return False
+        _started = True
+
+    threading.Thread(
+        target=_warm_up,
+        args=(api_key or os.environ.get('GEMINI_API_KEY'),),
+        name='warmup',
+        daemon=True,
+    ).start()
+    return True
+
+def is_ready() -> bool:
+    return _ready.is_set()
+
+def wait_until_ready(timeout: Optional[float] = None) -> bool:
+    return _ready.wait(timeout)
+
+def warmup_status() -> Dict:
+    """Current stage, last error and per-stage durations in seconds"""
+    with _lock:
+        return {'stage': _status['stage'], 'error': _status['error'], 'timings': dict(_status['timings'])}
+
+def _run_stage(name: str, fn) -> None:
+    with _lock:
+        _status['stage'] = name
+    started = time.perf_counter()
+    fn()
+    with _lock:
+        _status['timings'][name] = time.perf_counter() - started
+
+def _import_sdk() -> None:
+    import google.generativeai  # noqa: F401
+
+def _open_caches() -> None:
+    from services.evaluation_cache import get_evaluation_cache
+    get_evaluation_cache()
+
+def _resolve_model(api_key: str) -> None:
+    import google.generativeai as genai
+    from services.model_cache import get_cached_model, hash_api_key, store_model
+    from services.model_resolver import ModelResolver
+
+    key_hash = hash_api_key(api_key)
+    if get_cached_model(key_hash) is not None:
+        return
+    genai.configure(api_key=api_key)
+    resolved = ModelResolver().resolve()
+    store_model(key_hash, resolved.model_name, resolved.model)
+
+def _warm_up(api_key: Optional[str]) -> None:
+    try:
+        _run_stage('import_sdk', _import_sdk)
+        _run_stage('open_caches', _open_caches)
+        if api_key:
+            _run_stage('resolve_model', lambda: _resolve_model(api_key))
+    except Exception as e:
+        # Warm-up is best effort: the normal request path still does everything lazily
+        with _lock:
+            _status['error'] = str(e)
+
+    with _lock:
+        _status['stage'] = 'ready'
+    _ready.set()
+
+    ready_file = os.environ.get(READY_FILE_ENV)
+    if ready_file:
+        with open(ready_file, 'w', encoding='utf-8') as f:
+            f.write(str(time.time()))
@@ -0,0 +1,31 @@
+import pytest
+from services import evaluation_cache, model_router, question_bank, question_pool, rubric_scorer, session_store
+
+class FakeClock:
+    """Monotonic clock that only moves when a test advances it"""
+
+    def __init__(self, now: float = 1000.0):
+        self.now = now
+
+    def __call__(self) -> float:
+        return self.now
+
+    def advance(self, seconds: float) -> None:
+        self.now += seconds
+
+@pytest.fixture
+def clock():
+    return FakeClock()
+
+@pytest.fixture(autouse=True)
+def data_dir(tmp_path, monkeypatch):
+    """Every test gets its own data directory and fresh process-wide caches and stores"""
+    monkeypatch.setenv('AI_INTERVIEWER_DATA_DIR', str(tmp_path))
+    monkeypatch.setattr(evaluation_cache, '_default_cache', None)
+    monkeypatch.setattr(question_bank, '_default_bank', None)
+    monkeypatch.setattr(question_pool, '_pools', {})
+    monkeypatch.setattr(rubric_scorer, '_default_scorer', None)
+    monkeypatch.setattr(session_store, '_default_store', None)
+    monkeypatch.setattr(model_router, '_available', {})
+    monkeypatch.setattr(model_router, '_listing_failed_at', {})
+    return tmp_path
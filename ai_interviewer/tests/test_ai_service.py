@@ -0,0 +1,23 @@
+import time
+import pytest
+from models.data_models import Response
+from services import ai_service
+from services.ai_service import AIInterviewer
+from services.llm_backend import LatencyModel, SimulatedBackend
+
+ANSWER = Response(1, 'What is a hash table?', 'Technical', 'A map from keys to buckets with O(1) lookups.', 30.0)
+
+def interviewer(seconds, failure_rate=0.0):
+    return AIInterviewer('', backend=SimulatedBackend(model_name='deadline-test', failure_rate=failure_rate,
+                                                      latency=LatencyModel(median=seconds, sigma=0)))
+
+def test_slow_model_is_abandoned_at_the_call_deadline(monkeypatch):
+    monkeypatch.setattr(ai_service, 'CALL_DEADLINE_SECONDS', 0.3)
+    started = time.monotonic()
+    with pytest.raises(TimeoutError):
+        interviewer(5.0).score_response(ANSWER)
+    assert time.monotonic() - started < 2.0
+
+def test_fast_model_answers_within_the_deadline(monkeypatch):
+    monkeypatch.setattr(ai_service, 'CALL_DEADLINE_SECONDS', 5.0)
+    assert 0 <= interviewer(0.01).score_response(ANSWER)['score'] <= 100
@@ -0,0 +1,18 @@
+import os
+import time
+from ui.analytics_phase import EXPORT_TTL_SECONDS, remove_stale_exports, take_export
+
+def test_downloaded_archive_is_deleted(tmp_path):
+    path = tmp_path / 'reports.zip'
+    path.write_bytes(b'PK archive')
+    assert take_export(str(path)) == b'PK archive'
+    assert not path.exists()
+
+def test_only_archives_past_the_ttl_are_removed(tmp_path):
+    stale, fresh = tmp_path / 'old.zip', tmp_path / 'new.zip'
+    stale.write_bytes(b'old')
+    fresh.write_bytes(b'new')
+    expired = time.time() - EXPORT_TTL_SECONDS - 60
+    os.utime(stale, (expired, expired))
+    remove_stale_exports(str(tmp_path))
+    assert not stale.exists() and fresh.exists()
@@ -0,0 +1,113 @@
+import asyncio
+import json
+import pytest
+import api_server
+from api_server import MAX_HEADERS, MAX_LINE_BYTES, HTTPError, InterviewAPI, _read_request
+from services.ai_service import AIInterviewer
+from services.async_interviewer import AsyncAIInterviewer
+from services.interview_service import InterviewService
+from services.llm_backend import LatencyModel, SimulatedBackend
+from services.session_store import SessionStore
+
+def read(raw: bytes):
+    """_read_request on a connection that sent ``raw`` and then stopped"""
+    async def run():
+        reader = asyncio.StreamReader(limit=MAX_LINE_BYTES)
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await _read_request(reader)
+    return asyncio.run(run())
+
+def status_of(raw: bytes) -> int:
+    with pytest.raises(HTTPError) as error:
+        read(raw)
+    return error.value.status
+
+def test_request_is_parsed_with_its_json_body():
+    body = json.dumps({'candidate_name': 'Ada'}).encode()
+    raw = b'POST /v1/interviews?x=1 HTTP/1.1\r\nContent-Length: %d\r\n\r\n%s' % (len(body), body)
+    assert read(raw) == ('POST', '/v1/interviews', {'candidate_name': 'Ada'}, True)
+    assert read(b'GET /healthz HTTP/1.0\r\n\r\n') == ('GET', '/healthz', None, False)
+    assert read(b'') is None
+
+@pytest.mark.parametrize('raw, status', [
+    (b'GARBAGE\r\n\r\n', 400),
+    (b'POST /v1/score HTTP/1.1\r\nContent-Length: abc\r\n\r\n', 400),
+    (b'POST /v1/score HTTP/1.1\r\nContent-Length: -1\r\n\r\n', 400),
+    (b'POST /v1/score HTTP/1.1\r\nContent-Length: 7\r\n\r\n{"a": }', 400),
+    (b'POST /v1/score HTTP/1.1\r\nContent-Length: 2\r\n\r\n[]', 400),
+    (b'POST /v1/score HTTP/1.1\r\nContent-Length: %d\r\n\r\n' % (api_server.MAX_BODY_BYTES + 1), 413),
+    (b'GET /healthz HTTP/1.1\r\nX-Long: ' + b'a' * MAX_LINE_BYTES + b'\r\n\r\n', 431),
+    (b'GET /healthz HTTP/1.1\r\n' + b'X-Same: 1\r\n' * (MAX_HEADERS + 1) + b'\r\n', 431),
+])
+def test_malformed_and_oversized_requests_are_rejected(raw, status):
+    assert status_of(raw) == status
+
+def test_slow_request_times_out(monkeypatch):
+    monkeypatch.setattr(api_server, 'REQUEST_READ_SECONDS', 0.05)
+
+    async def run():
+        reader = asyncio.StreamReader()
+        reader.feed_data(b'GET /healthz HTTP/1.1\r\nHost: x\r\n')  # Headers never finish
+        return await _read_request(reader)
+    with pytest.raises(HTTPError) as error:
+        asyncio.run(run())
+    assert error.value.status == 408
+
+def test_idle_keep_alive_connection_is_closed(monkeypatch):
+    monkeypatch.setattr(api_server, 'KEEP_ALIVE_SECONDS', 0.05)
+
+    async def run():
+        return await _read_request(asyncio.StreamReader())
+    assert asyncio.run(run()) is None
+
+def read_with_token(raw: bytes, token: str):
+    async def run():
+        reader = asyncio.StreamReader(limit=MAX_LINE_BYTES)
+        reader.feed_data(raw)
+        reader.feed_eof()
+        return await _read_request(reader, token)
+    return asyncio.run(run())
+
+@pytest.mark.parametrize('authorization', [b'', b'Authorization: Bearer wrong\r\n', b'Authorization: secret\r\n'])
+def test_request_without_the_token_is_rejected(authorization):
+    raw = b'POST /v1/evaluate HTTP/1.1\r\n' + authorization + b'Content-Length: 2\r\n\r\n{}'
+    with pytest.raises(HTTPError) as error:
+        read_with_token(raw, 'secret')
+    assert error.value.status == 401
+
+def test_request_with_the_token_is_accepted():
+    raw = b'POST /v1/evaluate HTTP/1.1\r\nAuthorization: Bearer secret\r\nContent-Length: 2\r\n\r\n{}'
+    assert read_with_token(raw, 'secret') == ('POST', '/v1/evaluate', {}, True)
+    assert read_with_token(b'GET /healthz HTTP/1.1\r\n\r\n', 'secret')[1] == '/healthz'
+
+def test_public_interface_needs_a_token():
+    api = InterviewAPI(InterviewService(AsyncAIInterviewer(AIInterviewer('', backend=SimulatedBackend()))))
+    with pytest.raises(ValueError):
+        asyncio.run(api_server.serve(api, '0.0.0.0', 0))
+    assert api_server.is_loopback('127.0.0.1') and api_server.is_loopback('::1')
+    assert api_server.is_loopback('localhost') and not api_server.is_loopback('0.0.0.0')
+
+def test_interview_flow_through_the_api(data_dir):
+    model = SimulatedBackend(latency=LatencyModel(median=0.0))
+    store = SessionStore(str(data_dir / 'sessions.sqlite3'))
+    api = InterviewAPI(InterviewService(AsyncAIInterviewer(AIInterviewer('', backend=model)), store=store))
+
+    async def run():
+        status, session = await api.handle('POST', '/v1/interviews', {'candidate_name': 'Ada', 'background': 'Go'})
+        assert status == 201 and len(session['questions']) == 6
+        sid = session['session_id']
+        assert (await api.handle('GET', f'/v1/interviews/{sid}/results', None))[0] == 409
+        for question in session['questions']:
+            status, session = await api.handle('POST', f'/v1/interviews/{sid}/answers',
+                                               {'question_id': question['id'], 'answer': 'An answer', 'time_taken': 5})
+            assert status == 200
+        assert session['phase'] == 'results'
+        status, evaluation = await api.handle('GET', f'/v1/interviews/{sid}/results', None)
+        assert status == 200 and evaluation['recommendation']
+        assert (await api.handle('GET', '/v1/interviews/missing', None))[0] == 404
+        assert (await api.handle('DELETE', '/v1/interviews', None))[0] == 405
+    try:
+        asyncio.run(run())
+    finally:
+        store.close()
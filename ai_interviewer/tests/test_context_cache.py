@@ -0,0 +1,88 @@
+import time
+import pytest
+from google.api_core import exceptions
+from services.ai_service import EVALUATION_RUBRIC, QUESTION_REQUIREMENTS
+from services.context_cache import PromptCache, is_cache_error
+from services.llm_backend import GeminiBackend, GenerationSettings
+from services.prompt_builder import estimate_text_tokens
+
+class Usage:
+    def __init__(self, prompt_tokens, cached_tokens):
+        self.prompt_token_count = prompt_tokens
+        self.candidates_token_count = 5
+        self.cached_content_token_count = cached_tokens
+
+class Reply:
+    def __init__(self, prompt_tokens, cached_tokens):
+        self.text = 'ok'
+        self.usage_metadata = Usage(prompt_tokens, cached_tokens)
+
+class FakeModel:
+    """GenerativeModel stand-in, optionally bound to a cached prefix; ``errors`` are raised first"""
+
+    def __init__(self, cached_prefix='', *errors):
+        self.cached_prefix = cached_prefix
+        self.errors = list(errors)
+        self.sent = []
+
+    def generate_content(self, contents, **kwargs):
+        self.sent.append(contents)
+        if self.errors:
+            raise self.errors.pop(0)
+        return Reply(len(self.cached_prefix + contents) // 4, len(self.cached_prefix) // 4 or None)
+
+PREFIX = 'rubric ' * 200
+
+@pytest.fixture
+def backend(monkeypatch):
+    monkeypatch.setattr(GeminiBackend, '_config', lambda self, settings: None)
+    cache = PromptCache(min_tokens=100, create=lambda name, prefix, ttl: (FakeModel(prefix), object()),
+                        extend=lambda cached, ttl: None)
+    return GeminiBackend(FakeModel(), 'gemini-test', cache)
+
+def wait_until_cached(backend, prefix=PREFIX):
+    deadline = time.monotonic() + 5
+    while backend.prompt_cache._entries[backend.prompt_cache._key(backend.model_name, prefix)].state != 'ready':
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+def test_shipped_prefixes_are_large_enough_to_cache():
+    minimum = PromptCache().min_tokens
+    assert estimate_text_tokens(QUESTION_REQUIREMENTS) >= minimum
+    assert estimate_text_tokens(EVALUATION_RUBRIC) >= minimum
+
+def test_prefix_goes_inline_until_cached(backend):
+    settings = GenerationSettings(static_prefix=PREFIX)
+    first = backend.generate('candidate', settings, 5)
+    assert backend.model.sent[-1] == PREFIX + 'candidate'
+    assert not first.cached_tokens
+    
+    wait_until_cached(backend)
+    second = backend.generate('candidate', settings, 5)
+    assert second.cached_tokens
+    assert len(backend.model.sent) == 1
+
+def test_prefix_below_minimum_is_never_cached(backend):
+    settings = GenerationSettings(static_prefix='tiny')
+    backend.generate('x', settings, 5)
+    backend.generate('x', settings, 5)
+    assert backend.model.sent == ['tinyx', 'tinyx']
+
+@pytest.mark.parametrize('error', [exceptions.NotFound('CachedContent not found'),
+                                   exceptions.PermissionDenied('CachedContent not found (or permission denied)')])
+def test_expired_cached_content_resends_inline(backend, error):
+    settings = GenerationSettings(static_prefix=PREFIX)
+    backend.generate('candidate', settings, 5)
+    wait_until_cached(backend)
+    key = backend.prompt_cache._key(backend.model_name, PREFIX)
+    backend.prompt_cache._entries[key].model.errors.append(error)
+    
+    response = backend.generate('candidate', settings, 5)
+    assert response.text == 'ok'
+    assert backend.model.sent[-1] == PREFIX + 'candidate'
+
+def test_cache_errors_are_decided_by_status():
+    assert is_cache_error(exceptions.NotFound('gone'))
+    assert is_cache_error(exceptions.PermissionDenied('denied'))
+    assert not is_cache_error(exceptions.ResourceExhausted('cachedContent quota'))
+    assert not is_cache_error(RuntimeError('404 CachedContent not found'))
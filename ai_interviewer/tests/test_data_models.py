@@ -0,0 +1,50 @@
+import json
+from models.data_models import Category, Difficulty, Question, Response, ResponseLog
+from services.session_store import SessionStore
+
+ANSWERS = [
+    Response(3, 'Design a URL shortener.', 'Problem-Solving', 'Hash plus a counter', 120.0),
+    Response(1, 'What is a hash map?', 'Technical', 'Buckets and hashing', 40.5),
+    Response(6, 'Why this role?', 'Behavioral', 'I like building tools', 15.0),
+]
+
+def test_log_reads_like_a_list_of_responses():
+    log = ResponseLog(ANSWERS)
+    assert len(log) == 3
+    assert list(log) == ANSWERS
+    assert log[1] == ANSWERS[1]
+    assert log == ANSWERS
+    assert 6 in log and 2 not in log
+    assert log.get(1) == ANSWERS[1] and log.get(2) is None
+    assert list(log.time_taken) == [120.0, 40.5, 15.0]
+    assert log.total_time() == 175.5
+
+def test_upsert_replaces_an_answer_in_place():
+    log = ResponseLog(ANSWERS)
+    log.upsert(Response(1, 'What is a hash map?', 'Technical', 'Open addressing too', 60.0))
+    assert len(log) == 3
+    assert [r.question_id for r in log] == [3, 1, 6]
+    assert log.get(1).answer == 'Open addressing too'
+    assert log.total_time() == 195.0
+
+def test_log_round_trips_through_the_session_store(data_dir):
+    store = SessionStore(str(data_dir / 'sessions.sqlite3'), flush_interval=60)
+    try:
+        store.save_session('s1', {'candidate_name': 'Ada', 'phase': 'interview', 'current_question': 2,
+                                  'questions': [], 'start_time': 0.0, 'question_start_time': 0.0})
+        for response in ResponseLog(ANSWERS):
+            store.save_response('s1', response)
+        loaded = store.load_session('s1')['responses']
+    finally:
+        store.close()
+    assert isinstance(loaded, ResponseLog)
+    assert loaded == ResponseLog(ANSWERS)
+    assert loaded[0].category is Category.PROBLEM_SOLVING
+
+def test_categories_are_shared_enums_that_encode_as_plain_strings():
+    question = Question(1, 'Q', 'Technical', 'Hard')
+    assert question.category is Category.TECHNICAL and question.difficulty is Difficulty.HARD
+    assert question.category == 'Technical' and str(question.difficulty) == 'Hard'
+    assert json.dumps({'category': question.category}) == '{"category": "Technical"}'
+    # Unknown labels are kept as plain strings
+    assert Response(1, 'Q', 'Design', 'A', 1.0).category == 'Design'
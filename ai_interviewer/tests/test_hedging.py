@@ -0,0 +1,85 @@
+import asyncio
+import threading
+import time
+import pytest
+from models.data_models import Response
+from services.ai_service import AIInterviewer
+from services.hedging import HedgePolicy, hedge_metrics, hedged_race
+from services.llm_backend import GenerationSettings, LatencyModel, SimulatedBackend, SimulatedBackendError
+
+POLICY = HedgePolicy(default_delay=0.05, min_delay=0.01)
+
+def backend(name, seconds, failure_rate=0.0):
+    return SimulatedBackend(model_name=name, latency=LatencyModel(median=seconds, sigma=0), failure_rate=failure_rate)
+
+def attempt(model, cancelled):
+    """One call to ``model`` that notes whether it was cancelled"""
+    async def call():
+        try:
+            response = await model.generate_async('Score this answer', GenerationSettings(), timeout=10)
+        except asyncio.CancelledError:
+            cancelled.append(model.model_name)
+            raise
+        return model.model_name, response.text
+    return call
+
+def race(primary, hedge, cancelled):
+    return asyncio.run(hedged_race(primary.model_name, attempt(primary, cancelled),
+                                   hedge.model_name, attempt(hedge, cancelled), POLICY, 'scoring'))
+
+def delta(before):
+    after = hedge_metrics()
+    names = ('hedged', 'primary_wins', 'hedge_wins', 'failed', 'cancelled')
+    return {name: after[name] - before[name] for name in names}
+
+def test_slow_primary_is_hedged_and_the_loser_cancelled():
+    primary, hedge, cancelled = backend('race-slow-primary', 2.0), backend('race-fast-hedge', 0.01), []
+    before = hedge_metrics()
+    started = time.monotonic()
+    winner, _ = race(primary, hedge, cancelled)
+    assert winner == 'race-fast-hedge'
+    assert time.monotonic() - started < 1.0
+    assert cancelled == ['race-slow-primary']
+    assert delta(before) == {'hedged': 1, 'primary_wins': 0, 'hedge_wins': 1, 'failed': 0, 'cancelled': 1}
+
+def test_fast_primary_never_starts_the_hedge():
+    primary, hedge, cancelled = backend('race-quick-primary', 0.0), backend('race-unused-hedge', 0.0), []
+    before = hedge_metrics()
+    winner, _ = race(primary, hedge, cancelled)
+    assert winner == 'race-quick-primary'
+    assert hedge.calls == 0
+    assert cancelled == []
+    assert delta(before)['hedged'] == 0
+
+def test_early_primary_failure_starts_the_hedge_at_once():
+    primary, hedge, cancelled = backend('race-broken-primary', 0.0, failure_rate=1.0), backend('race-rescue', 0.0), []
+    slow_policy = HedgePolicy(default_delay=5.0)
+    started = time.monotonic()
+    result = asyncio.run(hedged_race(primary.model_name, attempt(primary, cancelled),
+                                     hedge.model_name, attempt(hedge, cancelled), slow_policy, 'scoring'))
+    assert result[0] == 'race-rescue'
+    assert time.monotonic() - started < 1.0
+
+def test_both_failing_raises_the_last_error():
+    primary, hedge = backend('race-down-1', 0.0, failure_rate=1.0), backend('race-down-2', 0.0, failure_rate=1.0)
+    before = hedge_metrics()
+    with pytest.raises(SimulatedBackendError):
+        race(primary, hedge, [])
+    assert delta(before)['failed'] == 1
+
+def test_sync_evaluations_share_one_background_loop():
+    """Each hedged evaluation from sync code runs on the same long-lived loop (the SDK's async client is bound to it)"""
+    loops = []
+    payload = SimulatedBackend().payloads['evaluation']
+
+    def evaluation(prompt):
+        loops.append((threading.current_thread().name, id(asyncio.get_running_loop())))
+        return payload
+    model = SimulatedBackend(model_name='hedged-sim', latency=LatencyModel(median=0.0),
+                             payloads={'evaluation': evaluation}, replica_names=('hedged-sim-replica',))
+    interviewer = AIInterviewer('', backend=model, hedge_policy=POLICY)
+    responses = [Response(1, 'What is a hash map?', 'Technical', 'A key-value table with hashing.', 30.0)]
+    for _ in range(2):
+        assert interviewer.evaluate_responses(responses, use_cache=False)['recommendation'] == 'Hire'
+    assert len(loops) == 2 and loops[0] == loops[1]
+    assert loops[0][0] == 'async-calls'
@@ -0,0 +1,56 @@
+import json
+from services.ai_service import AIInterviewer
+from services.llm_backend import LatencyModel, SimulatedBackend
+from utils.json_stream import JSONArrayStreamParser, parse_json_array_prefix
+
+ELEMENTS = [
+    {'id': 1, 'text': 'Braces {inside} [strings] and an escaped \\" quote', 'category': 'Technical'},
+    {'id': 2, 'text': 'Nested', 'tags': [{'a': [1, 2]}, {'b': {}}]},
+    [3, 'a nested array element'],
+]
+TEXT = 'Sure! Here you go:\n```json\n' + json.dumps(ELEMENTS, indent=2) + '\n```'
+
+def feed_in_chunks(text, size):
+    parser = JSONArrayStreamParser()
+    elements = []
+    for start in range(0, len(text), size):
+        elements.extend(parser.feed(text[start:start + size]))
+    return parser, elements
+
+def test_any_chunking_yields_the_same_elements():
+    for size in (1, 2, 7, 64, len(TEXT)):
+        parser, elements = feed_in_chunks(TEXT, size)
+        assert elements == ELEMENTS
+        assert parser.finished
+
+def test_each_element_is_returned_by_the_chunk_that_closes_it():
+    parser = JSONArrayStreamParser()
+    first = json.dumps(ELEMENTS[0])
+    assert parser.feed('[' + first[:-1]) == []
+    assert parser.feed(first[-1] + ', {"id"') == [ELEMENTS[0]]
+
+def test_truncated_stream_keeps_every_completed_element():
+    cut = TEXT.index('"Nested"')
+    parser, elements = feed_in_chunks(TEXT[:cut], 16)
+    assert elements == [ELEMENTS[0]]
+    assert not parser.finished
+    assert parse_json_array_prefix(TEXT[:cut]) == [ELEMENTS[0]]
+
+def test_invalid_elements_and_scalars_are_skipped():
+    parser = JSONArrayStreamParser()
+    assert parser.feed('[1, "x", {"a": tru}, {"b": 2}]') == [{'b': 2}]
+    assert parser.elements_seen == 1
+    assert parser.finished
+
+def test_text_after_the_array_is_ignored():
+    assert parse_json_array_prefix('[{"a": 1}] and then [{"b": 2}]') == [{'a': 1}]
+
+def test_a_stream_cut_midway_is_topped_up_to_six_questions():
+    # failure_rate=1 drops the connection halfway through the stream
+    model = SimulatedBackend(latency=LatencyModel(median=0.0), failure_rate=1.0, stream_chunk_chars=64)
+    questions = list(AIInterviewer('', backend=model).stream_questions('Python, databases'))
+    assert [q.id for q in questions] == [1, 2, 3, 4, 5, 6]
+    streamed = [q['text'] for q in json.loads(model.payloads['questions'])]
+    from_stream = [q.text in streamed for q in questions]
+    # The questions completed before the cut are kept; fallback questions fill the rest
+    assert from_stream[0] and not all(from_stream)
@@ -0,0 +1,52 @@
+import threading
+import pytest
+from google.api_core import exceptions
+from services import model_cache
+from services.model_cache import get_cached_model, is_model_unavailable_error, store_model
+
+@pytest.fixture(autouse=True)
+def empty_cache(monkeypatch):
+    monkeypatch.setattr(model_cache, '_cache', {})
+    monkeypatch.setattr(model_cache, '_revalidating', set())
+
+def revalidate_with(outcome):
+    """A revalidation callback returning or raising ``outcome``, and an event set once it ran"""
+    ran = threading.Event()
+    
+    def revalidate(entry):
+        ran.set()
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+    return revalidate, ran
+
+def revalidated(monkeypatch, outcome):
+    monkeypatch.setattr(model_cache, 'MODEL_CACHE_TTL', -1)
+    entry = store_model('key', 'gemini-test', object())
+    revalidate, ran = revalidate_with(outcome)
+    assert get_cached_model('key', revalidate) is entry
+    assert ran.wait(5)
+    for thread in threading.enumerate():
+        if thread.name == 'model-cache-revalidate':
+            thread.join(5)
+    return entry
+
+def test_unavailable_is_decided_by_status():
+    assert is_model_unavailable_error(exceptions.NotFound('models/gemini-test is not found'))
+    assert is_model_unavailable_error(exceptions.PermissionDenied('denied'))
+    assert not is_model_unavailable_error(exceptions.ServiceUnavailable('backend not found upstream'))
+    assert not is_model_unavailable_error(exceptions.InvalidArgument('permission field is invalid'))
+    assert not is_model_unavailable_error(RuntimeError('404 in the message only'))
+
+def test_model_gone_is_evicted(monkeypatch):
+    revalidated(monkeypatch, exceptions.NotFound('gone'))
+    assert 'key' not in model_cache._cache
+
+def test_transient_failure_keeps_the_entry(monkeypatch):
+    entry = revalidated(monkeypatch, exceptions.ServiceUnavailable('model not found on this shard'))
+    assert model_cache._cache['key'] is entry
+
+def test_successful_revalidation_renews_the_entry(monkeypatch):
+    entry = revalidated(monkeypatch, True)
+    renewed = model_cache._cache['key']
+    assert renewed is not entry and renewed.resolved_at >= entry.resolved_at
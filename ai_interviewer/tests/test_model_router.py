@@ -0,0 +1,83 @@
+import pytest
+from services import model_router
+from services.model_router import TIER_PRO, ModelRouter, available_model_names
+
+@pytest.fixture
+def router(clock):
+    return ModelRouter(failure_threshold=3, cooldown=30.0, max_cooldown=100.0, min_samples=2, clock=clock)
+
+def fail(router, name, times):
+    for _ in range(times):
+        router.record_failure(name)
+
+def test_breaker_opens_after_consecutive_failures(router, clock):
+    fail(router, 'gemini-2.5-flash', 2)
+    assert router.is_healthy('gemini-2.5-flash')
+    router.record_failure('gemini-2.5-flash')
+    assert not router.is_healthy('gemini-2.5-flash')
+    assert router.rank(['gemini-2.5-flash', 'gemini-2.0-flash'], 'evaluation') == ['gemini-2.0-flash']
+    clock.advance(29.9)
+    assert not router.is_healthy('gemini-2.5-flash')
+
+def test_half_open_failure_reopens_for_twice_as_long(router, clock):
+    fail(router, 'gemini-2.5-flash', 3)
+    clock.advance(30)
+    assert router.is_healthy('gemini-2.5-flash')  # Half-open: one trial call is let through
+    router.record_failure('gemini-2.5-flash')
+    clock.advance(59)
+    assert not router.is_healthy('gemini-2.5-flash')
+    clock.advance(1)
+    assert router.is_healthy('gemini-2.5-flash')
+    # Doubling stops at max_cooldown
+    router.record_failure('gemini-2.5-flash')
+    clock.advance(100)
+    assert router.is_healthy('gemini-2.5-flash')
+    assert router.snapshot()[0]['times_opened'] == 3
+
+def test_half_open_success_closes_the_breaker(router, clock):
+    fail(router, 'gemini-2.5-flash', 3)
+    clock.advance(30)
+    router.record_success('gemini-2.5-flash', 1.0)
+    router.record_failure('gemini-2.5-flash')
+    # Back to the closed state: one failure no longer opens it
+    assert router.is_healthy('gemini-2.5-flash')
+
+def test_error_rate_opens_the_breaker(clock):
+    router = ModelRouter(failure_threshold=100, min_calls_for_rate=10, error_rate_threshold=0.5, clock=clock)
+    for _ in range(5):
+        router.record_success('gemini-2.5-flash', 1.0)
+        router.record_failure('gemini-2.5-flash')
+    assert not router.is_healthy('gemini-2.5-flash')
+
+def test_rank_prefers_the_faster_model_and_respects_tiers(router):
+    for _ in range(2):
+        router.record_success('gemini-2.5-pro', 4.0, 'evaluation')
+        router.record_success('gemini-2.5-flash', 1.0, 'evaluation')
+    names = ['gemini-2.5-pro', 'gemini-2.5-flash', 'gemini-2.5-flash-lite']
+    assert router.rank(names, 'evaluation') == ['gemini-2.5-flash', 'gemini-2.5-pro']
+    assert router.rank(names, 'scoring', min_tier=TIER_PRO) == ['gemini-2.5-pro']
+
+def test_timeout_follows_the_tail_latency(router):
+    assert router.timeout_for('gemini-2.5-flash', 'scoring', 30.0) == 30.0
+    for seconds in (2.0, 4.0):
+        router.record_success('gemini-2.5-flash', seconds, 'scoring')
+    assert router.timeout_for('gemini-2.5-flash', 'scoring', 30.0) == 8.0
+
+def test_failed_model_listing_is_retried_after_the_ttl(monkeypatch):
+    calls = []
+
+    def listing(result):
+        def list_models():
+            calls.append(result)
+            return result
+        return list_models
+    preference = ['gemini-2.5-pro', 'gemini-2.5-flash']
+    assert available_model_names('key-a', 'gemini-2.5-pro', preference, listing(None)) == ['gemini-2.5-pro']
+    assert available_model_names('key-a', 'gemini-2.5-pro', preference, listing(None)) == ['gemini-2.5-pro']
+    assert len(calls) == 1  # Within the TTL the failure is not retried
+
+    monkeypatch.setattr(model_router, 'LISTING_RETRY_SECONDS', 0.0)
+    found = listing({'gemini-2.5-flash'})
+    assert available_model_names('key-a', 'gemini-2.5-pro', preference, found) == preference
+    assert available_model_names('key-a', 'gemini-2.5-pro', preference, listing(None)) == preference
+    assert len(calls) == 2  # A successful listing is kept
@@ -0,0 +1,62 @@
+import threading
+import time
+from models.data_models import Question
+from services.ai_service import DIFFICULTY_MIX, QUESTION_MIX, default_questions
+from services.question_bank import QuestionBank
+from services.question_pool import QuestionPool, get_question_pool
+
+class Generator:
+    """Counts generations and returns the default set"""
+
+    def __init__(self):
+        self.backgrounds = []
+        self._lock = threading.Lock()
+
+    def __call__(self, background):
+        with self._lock:
+            self.backgrounds.append(background)
+        return default_questions()
+
+def settle(pool, seconds=0.3):
+    time.sleep(seconds)
+    pool._executor.shutdown(wait=True)
+
+def test_edits_within_the_delay_start_one_generation():
+    pool, generate = QuestionPool(speculation_delay=0.1), Generator()
+    for background in ('Python', 'Python, Django', 'Python, Django, SQL'):
+        pool.speculate('session', background, generate)
+        time.sleep(0.02)
+    settle(pool)
+    assert generate.backgrounds == ['Python, Django, SQL']
+    assert pool.take('Python, Django, SQL') is not None
+
+def test_speculations_per_owner_are_capped():
+    pool, generate = QuestionPool(speculation_delay=0.01, max_speculations=2), Generator()
+    for background in ('Go', 'Rust', 'Java'):
+        pool.speculate('session', background, generate)
+        time.sleep(0.15)
+    pool.speculate('other-session', 'Kotlin', generate)
+    settle(pool)
+    assert generate.backgrounds == ['Go', 'Rust', 'Kotlin']
+
+def test_cancelled_speculation_never_runs():
+    pool, generate = QuestionPool(speculation_delay=0.05), Generator()
+    pool.speculate('session', 'C++', generate)
+    pool.cancel_speculation('session')
+    settle(pool)
+    assert generate.backgrounds == []
+
+def test_pools_are_kept_per_key():
+    assert get_question_pool('key-a') is get_question_pool('key-a')
+    assert get_question_pool('key-a') is not get_question_pool('key-b')
+
+def test_bank_readiness_matches_sampling(tmp_path):
+    bank = QuestionBank(str(tmp_path / 'bank.sqlite3'))
+    assert not bank.can_sample_set(QUESTION_MIX, DIFFICULTY_MIX)
+    bank.add_many([Question(i, f'{category} {difficulty} question number {i} about {topic}', category, difficulty)
+                   for i, (topic, category, difficulty) in enumerate(
+                       (topic, category, difficulty)
+                       for topic in ('hashing', 'graphs', 'caching', 'queues')
+                       for category in QUESTION_MIX for difficulty in DIFFICULTY_MIX)])
+    assert bank.can_sample_set(QUESTION_MIX, DIFFICULTY_MIX)
+    assert bank.sample_set(QUESTION_MIX, DIFFICULTY_MIX) is not None
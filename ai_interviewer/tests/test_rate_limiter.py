@@ -0,0 +1,109 @@
+import asyncio
+import threading
+import time
+import pytest
+from services.llm_backend import SimulatedBackendError
+from services.rate_limiter import (
+    ModelRateLimiter, RateLimitTimeout, call_with_backoff, call_with_backoff_async, is_quota_error,
+    is_retryable_error
+)
+
+def failing(*errors, result='ok'):
+    """A call that raises ``errors`` in turn, then returns ``result``; counts its calls"""
+    remaining = list(errors)
+    calls = []
+
+    def fn():
+        calls.append(1)
+        if remaining:
+            raise remaining.pop(0)
+        return result
+    return fn, calls
+
+def test_request_bucket_refills_with_time(clock):
+    limiter = ModelRateLimiter(2, 10_000, clock=clock)
+    assert limiter.try_acquire(10) == 0
+    assert limiter.try_acquire(10) == 0
+    assert limiter.try_acquire(10) == pytest.approx(30.0)
+    clock.advance(30)
+    assert limiter.try_acquire(10) == 0
+
+def test_token_bucket_waits_for_missing_tokens(clock):
+    limiter = ModelRateLimiter(100, 1000, clock=clock)
+    assert limiter.try_acquire(800) == 0
+    # 200 tokens left; 400 more need 200 / (1000 per minute) = 12 s
+    assert limiter.try_acquire(400) == pytest.approx(12.0)
+
+def test_record_usage_returns_overestimated_tokens(clock):
+    limiter = ModelRateLimiter(100, 1000, clock=clock)
+    assert limiter.try_acquire(900) == 0
+    limiter.record_usage(900, 100)
+    assert limiter.try_acquire(800) == 0
+
+def test_queued_caller_is_served_before_try_acquire(clock):
+    limiter = ModelRateLimiter(1, 10_000, clock=clock)
+    assert limiter.try_acquire(1) == 0
+    served = threading.Event()
+    waiter = threading.Thread(target=lambda: (limiter.acquire(1, timeout=None), served.set()))
+    waiter.start()
+    time.sleep(0.05)
+    # The budget is back, but the blocked caller is first in line
+    clock.advance(60)
+    assert limiter.try_acquire(1) > 0
+    limiter.record_usage(0, 0)  # Wakes the waiter to re-check the clock
+    assert served.wait(2)
+    waiter.join()
+
+def test_acquire_times_out(clock):
+    limiter = ModelRateLimiter(1, 10_000, clock=clock)
+    limiter.try_acquire(1)
+    with pytest.raises(RateLimitTimeout):
+        limiter.acquire(1, timeout=0)
+
+def test_429_pauses_every_caller_and_is_retried(clock):
+    limiter = ModelRateLimiter(60, 10_000, clock=clock)
+    fn, calls = failing(SimulatedBackendError('Resource exhausted (simulated)', 429))
+    assert call_with_backoff(fn, limiter=limiter, base_delay=0.001) == 'ok'
+    assert len(calls) == 2
+    # The pause empties the request budget for everyone on the model
+    assert limiter.try_acquire(1) > 0
+
+def test_transient_server_errors_are_retried_until_the_limit():
+    fn, calls = failing(*(SimulatedBackendError('503 Service Unavailable', 503) for _ in range(5)))
+    with pytest.raises(SimulatedBackendError):
+        call_with_backoff(fn, retries=2, base_delay=0.001)
+    assert len(calls) == 3
+
+def test_backoff_gives_up_when_the_next_retry_would_pass_the_deadline(clock):
+    fn, calls = failing(*(SimulatedBackendError('503 Service Unavailable', 503) for _ in range(5)))
+    with pytest.raises(SimulatedBackendError):
+        call_with_backoff(fn, base_delay=10.0, deadline=clock() + 4.0, clock=clock)
+    assert len(calls) == 1
+
+@pytest.mark.parametrize('error', [
+    SimulatedBackendError('400 Request 5000 tokens, 500 over', 400),
+    ValueError('Parsed 500 items'),
+])
+def test_other_errors_fail_fast(error):
+    fn, calls = failing(error)
+    with pytest.raises(type(error)):
+        call_with_backoff(fn, base_delay=0.001)
+    assert len(calls) == 1
+
+def test_classification_uses_status_code_before_message():
+    assert is_quota_error(SimulatedBackendError('anything', 429))
+    assert not is_quota_error(SimulatedBackendError('quota dashboard link', 503))
+    assert is_retryable_error(SimulatedBackendError('no digits here', 500))
+    assert not is_retryable_error(SimulatedBackendError('503 in the text', 404))
+    assert is_retryable_error(asyncio.TimeoutError())
+    assert not is_retryable_error(RateLimitTimeout())
+
+def test_async_backoff_retries_429(clock):
+    limiter = ModelRateLimiter(60, 10_000, clock=clock)
+    sync_fn, calls = failing(SimulatedBackendError('429', 429))
+
+    async def fn():
+        return sync_fn()
+    assert asyncio.run(call_with_backoff_async(fn, limiter=limiter, base_delay=0.001)) == 'ok'
+    assert len(calls) == 2
+    assert limiter.try_acquire(1) > 0
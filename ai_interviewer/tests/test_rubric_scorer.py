@@ -0,0 +1,22 @@
+import pytest
+from models.data_models import NO_ANSWER, TIMED_OUT_ANSWER, Response
+from services.ai_service import default_questions
+from services.rubric_scorer import get_rubric_scorer
+
+@pytest.mark.parametrize('answer', [NO_ANSWER, TIMED_OUT_ANSWER])
+def test_placeholder_answers_score_zero(answer):
+    question = default_questions()[0]
+    scores = get_rubric_scorer().score_answers([Response(question.id, question.text, question.category, answer, 1.0)])
+    assert scores[question.id]['score'] == 0
+
+def test_on_topic_answer_beats_vague_answer():
+    question = default_questions()[0]
+    good = ('An array keeps elements in contiguous memory so random access by index is O(1), but insertion '
+            'and deletion in the middle are O(n). A linked list uses a pointer from each node to the next, '
+            'so insertion and deletion are O(1) once you have the node.')
+    vague = 'I am not sure, I think it depends on the situation really.'
+    scores = get_rubric_scorer().score_answers([
+        Response(1, question.text, question.category, good, 60.0),
+        Response(2, question.text, question.category, vague, 60.0),
+    ])
+    assert scores[1]['score'] > scores[2]['score']
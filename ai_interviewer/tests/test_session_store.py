@@ -0,0 +1,92 @@
+import sqlite3
+import pytest
+from models.data_models import Question, Response
+from services.session_store import SessionStore
+
+QUESTIONS = [Question(1, 'What is a hash map?', 'Technical', 'Easy'),
+             Question(2, 'Tell me about a bug you fixed.', 'Behavioral', 'Medium')]
+EVALUATION = {'technical_score': 70, 'communication_score': 80, 'problem_solving_score': 60,
+              'behavioral_score': 90, 'overall_score': 75, 'recommendation': 'Hire', 'strengths': ['Clear']}
+
+@pytest.fixture
+def store(data_dir):
+    # A long interval keeps the writer thread out of the way; tests flush explicitly
+    store = SessionStore(str(data_dir / 'sessions.sqlite3'), flush_interval=60)
+    yield store
+    store.close()
+
+def state(phase='interview', current_question=0):
+    return {'candidate_name': 'Ada', 'phase': phase, 'current_question': current_question,
+            'questions': QUESTIONS, 'start_time': 1.0, 'question_start_time': 2.0}
+
+def stored_rows(store, table):
+    with sqlite3.connect(store.db_path) as conn:
+        return conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0]
+
+def test_saves_are_written_behind_and_coalesced(store):
+    store.save_session('s1', state(current_question=0))
+    store.save_session('s1', state(current_question=1))
+    assert stored_rows(store, 'sessions') == 0
+    store.flush()
+    assert stored_rows(store, 'sessions') == 1
+    assert store.load_session('s1')['current_question'] == 1
+
+def test_load_round_trips_the_interview(store):
+    store.save_session('s1', state())
+    store.save_response('s1', Response(2, QUESTIONS[1].text, 'Behavioral', 'First answer', 10.0))
+    store.save_response('s1', Response(1, QUESTIONS[0].text, 'Technical', 'Buckets', 20.0))
+    store.flush()
+    store.save_response('s1', Response(2, QUESTIONS[1].text, 'Behavioral', 'Second answer', 30.0))
+
+    loaded = store.load_session('s1')  # Flushes the queued answer first
+    assert loaded['questions'] == QUESTIONS
+    # A replaced answer keeps its original position
+    assert [(r.question_id, r.answer) for r in loaded['responses']] == [(2, 'Second answer'), (1, 'Buckets')]
+    assert loaded['responses'].get(2).time_taken == 30.0
+    assert store.load_session('unknown') is None
+
+def test_failed_flush_requeues_unless_a_newer_save_arrived(store, monkeypatch):
+    store.save_session('s1', state(current_question=0))
+    store.save_session('s2', state(current_question=0))
+    original_write = store._write
+
+    def failing_write(*args):
+        store.save_session('s2', state(current_question=5))  # A save racing the failed write
+        raise sqlite3.OperationalError('database is locked')
+    monkeypatch.setattr(store, '_write', failing_write)
+    with pytest.raises(sqlite3.OperationalError):
+        store.flush()
+
+    monkeypatch.setattr(store, '_write', original_write)
+    assert store.load_session('s1')['current_question'] == 0
+    assert store.load_session('s2')['current_question'] == 5
+
+def test_reports_are_paged_in_completion_order(store):
+    for i in range(5):
+        sid = f's{i}'
+        store.save_session(sid, state(phase='results'))
+        response = Response(1, QUESTIONS[0].text, 'Technical', f'answer {i}', 10.0)
+        store.save_response(sid, response)
+        store.save_evaluation(sid, dict(EVALUATION, overall_score=60 + i), QUESTIONS[:1], [response],
+                              {1: {'score': 50 + i}})
+        store.flush()
+
+    reports = list(store.iter_reports(batch_size=2))
+    assert [r['session_id'] for r in reports] == ['s0', 's1', 's2', 's3', 's4']
+    assert reports[4]['evaluation']['overall_score'] == 64
+    assert reports[4]['evaluation']['strengths'] == ['Clear']
+    assert reports[4]['responses'][0].answer == 'answer 4'
+
+    evaluations, answers = store.fetch_results()
+    assert len(evaluations) == 5
+    assert sorted(row[5] for row in answers) == [50, 51, 52, 53, 54]
+    assert {row[4] for row in answers} == {'Easy'}
+
+def test_delete_removes_queued_and_stored_rows(store):
+    store.save_session('s1', state())
+    store.flush()
+    store.save_response('s1', Response(1, QUESTIONS[0].text, 'Technical', 'queued', 1.0))
+    store.delete_session('s1')
+    store.flush()
+    assert store.load_session('s1') is None
+    assert stored_rows(store, 'responses') == 0
@@ -0,0 +1,245 @@
+import os
+import time
+import streamlit as st
+from datetime import datetime, timedelta
+from services.analytics import (
+    DEFAULT_PERCENTILES, DIFFICULTY_LEVELS, answer_percentiles, cohort_comparison, load_dataset,
+    question_calibration, score_percentiles
+)
+from services.context_cache import prompt_cache_metrics
+from services.hedging import hedge_metrics
+from services.model_router import get_model_router
+from services.session_store import get_session_store
+from services.structured_output import structured_output_metrics
+from utils.admin_auth import is_admin, require_admin
+from utils.report_utils import REPORT_FORMATS, write_reports_zip
+from utils.storage import data_path
+
+# Larger archives are left on disk for the operator instead of passing through the browser session
+EXPORT_DOWNLOAD_LIMIT = 50 * 1024 * 1024
+# Archives not downloaded (or too large to download) are deleted after this long
+EXPORT_TTL_SECONDS = 60 * 60
+
+@st.cache_data(ttl=60, show_spinner=False)
+def _cached_dataset():
+    """Stored interviews, reloaded from disk at most once a minute"""
+    return load_dataset()
+
+def _percentile_table(rows):
+    """Dataframe-ready columns from {label: percentiles}"""
+    table = {'': list(rows.keys())}
+    for i, p in enumerate(DEFAULT_PERCENTILES):
+        table[f'p{p}'] = [round(float(values[i]), 1) for values in rows.values()]
+    return table
+
+def show_admin_page():
+    """Operator-only analytics (every candidate's scores and transcripts), behind the admin password"""
+    if require_admin():
+        show_analytics_dashboard()
+
+def show_analytics_dashboard():
+    """Score distributions, question calibration and cohorts across every finished interview"""
+    st.title('📈 Interview Analytics')
+    
+    if st.button('🔄 Reload data'):
+        _cached_dataset.clear()
+    
+    dataset = _cached_dataset()
+    if dataset.interviews == 0:
+        st.info('No finished interviews yet. Results appear here once candidates reach the results page.')
+        return
+    
+    started = time.perf_counter()
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.metric('Interviews', f'{dataset.interviews:,}')
+    with col2:
+        st.metric('Answers', f'{dataset.answers:,}')
+    
+    st.subheader('Score Distribution')
+    st.dataframe(_percentile_table(score_percentiles(dataset)), hide_index=True, use_container_width=True)
+    
+    col1, col2 = st.columns(2)
+    with col1:
+        st.subheader('Answer Score by Category')
+        st.dataframe(_percentile_table(answer_percentiles(dataset, by='category')), hide_index=True)
+        st.subheader('Time per Answer (s) by Category')
+        st.dataframe(_percentile_table(answer_percentiles(dataset, by='category', value='time_taken')),
+                     hide_index=True)
+    with col2:
+        st.subheader('Answer Score by Difficulty')
+        st.dataframe(_percentile_table(answer_percentiles(dataset, by='difficulty')), hide_index=True)
+        st.subheader('Time per Answer (s) by Difficulty')
+        st.dataframe(_percentile_table(answer_percentiles(dataset, by='difficulty', value='time_taken')),
+                     hide_index=True)
+    
+    st.subheader('Question Calibration')
+    min_answers = st.number_input('Minimum answers per question', min_value=1, value=5)
+    calibration = question_calibration(dataset, min_answers=int(min_answers))
+    flagged = calibration['miscalibrated'].nonzero()[0]
+    if len(flagged):
+        st.warning(f'⚠️ {len(flagged)} question(s) score differently from their difficulty label')
+        label = lambda code: DIFFICULTY_LEVELS[code] if code >= 0 else '-'
+        st.dataframe({
+            'Question': [calibration['question'][i] for i in flagged],
+            'Answers': [int(calibration['answers'][i]) for i in flagged],
+            'Mean score': [round(float(calibration['mean_score'][i]), 1) for i in flagged],
+            'Labelled': [label(calibration['labelled_difficulty'][i]) for i in flagged],
+            'Observed': [label(calibration['observed_difficulty'][i]) for i in flagged],
+        }, hide_index=True, use_container_width=True)
+    else:
+        st.success('✅ Every question with enough answers matches its difficulty label')
+    
+    st.subheader('Cohorts')
+    period_days = st.selectbox('Cohort period', [7, 30], format_func=lambda d: f'{d} days')
+    cohorts = cohort_comparison(dataset, period_days=period_days)
+    st.dataframe({
+        'Cohort': [datetime.fromtimestamp(t).strftime('%Y-%m-%d') for t in cohorts['cohort_start']],
+        'Interviews': cohorts['interviews'].tolist(),
+        'Mean score': [round(float(v), 1) for v in cohorts['mean_score']],
+        'Median score': [round(float(v), 1) for v in cohorts['median_score']],
+        'Hire rate': [f'{v:.0%}' for v in cohorts['hire_rate']],
+    }, hide_index=True, use_container_width=True)
+    
+    st.caption(f'Computed in {(time.perf_counter() - started) * 1000:.0f} ms')
+    
+    show_model_health()
+    show_structured_output_metrics()
+    show_prompt_cache_metrics()
+    show_hedge_metrics()
+    show_bulk_export()
+
+def show_model_health():
+    """Latency, errors and circuit breakers of every model called by this server process"""
+    rows = get_model_router().snapshot()
+    if not rows:
+        return
+    
+    st.subheader('Model Health')
+    seconds = lambda value: '-' if value is None else f'{value:.1f}s'
+    st.dataframe({
+        'Model': [row['model'] for row in rows],
+        'Tier': [row['tier'] for row in rows],
+        'Calls': [row['calls'] for row in rows],
+        'Error rate': [f"{row['error_rate']:.0%}" for row in rows],
+        'p50': [seconds(row['p50']) for row in rows],
+        'p95': [seconds(row['p95']) for row in rows],
+        'Circuit': [f"open {row['open_for']:.0f}s" if row['open_for'] else 'closed' for row in rows],
+    }, hide_index=True, use_container_width=True)
+
+def show_structured_output_metrics():
+    """How often JSON-mode calls needed a local fix or a repair request, or were wasted"""
+    metrics = structured_output_metrics()
+    if not metrics['calls']:
+        return
+    
+    st.subheader('Structured Output')
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric('JSON calls', metrics['calls'])
+    with col2:
+        st.metric('Fixed locally', metrics['fixed'])
+    with col3:
+        st.metric('Repaired', f"{metrics['repaired']} of {metrics['repair_requests']} tried")
+    with col4:
+        st.metric('Wasted', f"{metrics['wasted_rate']:.1%}")
+
+def show_prompt_cache_metrics():
+    """Prompt tokens of rubric-prefixed calls that were served from cached content"""
+    metrics = prompt_cache_metrics()
+    if not metrics['requests']:
+        return
+    
+    st.subheader('Prompt Cache')
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric('Prefixed calls', metrics['requests'])
+    with col2:
+        st.metric('Served from cache', f"{metrics['cached_requests']} of {metrics['requests']}")
+    with col3:
+        st.metric('Cached tokens', f"{metrics['cached_tokens']:,}")
+    with col4:
+        st.metric('Prompt tokens cached', f"{metrics['cached_share']:.0%}")
+    if metrics['failed']:
+        st.caption(f"Cached content unavailable {metrics['failed']} time(s); those prefixes are sent inline.")
+
+def show_hedge_metrics():
+    """Cost and benefit of hedged evaluation requests in this server process"""
+    metrics = hedge_metrics()
+    if not metrics['requests']:
+        return
+    
+    st.subheader('Hedged Requests')
+    col1, col2, col3, col4 = st.columns(4)
+    with col1:
+        st.metric('Requests', metrics['requests'])
+    with col2:
+        st.metric('Hedge rate', f"{metrics['hedge_rate']:.0%}")
+    with col3:
+        st.metric('Hedge wins', f"{metrics['hedge_win_rate']:.0%} of hedged")
+    with col4:
+        st.metric('Losers cancelled', metrics['cancelled'])
+
+def show_bulk_export():
+    """Zip every report of a date range for download (admin only: the reports are candidate transcripts)"""
+    if not is_admin():
+        return
+    st.subheader('Export Reports')
+    col1, col2 = st.columns(2)
+    with col1:
+        today = datetime.now().date()
+        date_range = st.date_input('Completed between', (today - timedelta(days=7), today))
+    with col2:
+        export_format = st.selectbox('Format', list(REPORT_FORMATS), key='export_format')
+    
+    if st.button('📦 Prepare export') and len(date_range) == 2:
+        since = datetime.combine(date_range[0], datetime.min.time()).timestamp()
+        until = datetime.combine(date_range[1] + timedelta(days=1), datetime.min.time()).timestamp()
+        file_name = f'Interview_Reports_{date_range[0]:%Y%m%d}_{date_range[1]:%Y%m%d}_{export_format}.zip'
+        export_dir = data_path('exports')
+        os.makedirs(export_dir, exist_ok=True)
+        remove_stale_exports(export_dir)
+        path = os.path.join(export_dir, file_name)
+        # Rendered straight to disk in constant memory
+        with open(path, 'wb') as archive:
+            with st.spinner('Building archive...'):
+                count = write_reports_zip(archive, get_session_store().iter_reports(since, until), export_format)
+        
+        size = os.path.getsize(path)
+        if size > EXPORT_DOWNLOAD_LIMIT:
+            st.info(
+                f'{count} report(s), {size / 1024 / 1024:.0f} MB: too large to download through the browser. '
+                f'The archive is on the server at `{path}` for the next {EXPORT_TTL_SECONDS // 60} minutes. '
+                f'`python export_reports.py {file_name} --since {date_range[0]:%Y-%m-%d} '
+                f'--until {date_range[1] + timedelta(days=1):%Y-%m-%d} --format {export_format}` writes it anywhere.'
+            )
+            return
+        st.download_button(
+            label=f'Download {count} report(s)',
+            data=lambda: take_export(path),
+            file_name=file_name,
+            mime='application/zip',
+            on_click='ignore'
+        )
+
+def take_export(path):
+    """Archive bytes for a download, read only when the button is clicked; the file is deleted after"""
+    try:
+        with open(path, 'rb') as archive:
+            return archive.read()
+    finally:
+        try:
+            os.remove(path)
+        except OSError:
+            pass
+
+def remove_stale_exports(export_dir, ttl=EXPORT_TTL_SECONDS):
+    """Delete archives older than ``ttl`` seconds that nobody downloaded"""
+    cutoff = time.time() - ttl
+    for entry in os.scandir(export_dir):
+        try:
+            if entry.is_file() and entry.stat().st_mtime < cutoff:
+                os.remove(entry.path)
+        except OSError:
+            pass
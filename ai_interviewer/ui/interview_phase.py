@@ -1,14 +1,19 @@
 import streamlit as st
 import time
-from models.data_models import Response
+from models.data_models import NO_ANSWER, TIMED_OUT_ANSWER, Response, is_no_answer
+from services.answer_scoring import schedule_answer_scoring
+from utils.session_utils import persist_response, persist_session
 
-def show_interview_phase():
+QUESTION_TIME_LIMIT = 180  # Seconds per question
+
+def show_interview_phase(interviewer):
     """Interview phase - ask questions and collect responses"""
     current_q_idx = st.session_state.current_question
     questions = st.session_state.questions
     
     if current_q_idx >= len(questions):
         st.session_state.phase = 'results'
+        persist_session()
         st.rerun()
         return
     
@@ -17,22 +22,9 @@ def show_interview_phase():
     progress = min(1.0, max(0.0, (current_q_idx + 1) / len(questions)))
     st.progress(progress, text=f"Question {current_q_idx + 1} of {len(questions)}")
     
-    # Timer
+    # Timer: a fragment, so only the countdown re-runs every second, not the whole app
     if st.session_state.question_start_time:
-        elapsed = time.time() - st.session_state.question_start_time
-        remaining = max(0, 180 - elapsed)  
-        
-        mins = int(remaining // 60)
-        secs = int(remaining % 60)
-        
-        if remaining > 60:
-            st.success(f"⏰ Time remaining: {mins}:{secs:02d}")
-        elif remaining > 30:
-            st.warning(f"⏰ Time remaining: {mins}:{secs:02d}")
-        elif remaining > 0:
-            st.error(f"⏰ Time remaining: {mins}:{secs:02d}")
-        else:
-            st.error("⏰ Time's up!")
+        show_question_timer(current_question, current_q_idx, interviewer)
     
     col1, col2 = st.columns([3, 1])
     with col1:
@@ -47,46 +39,104 @@ def show_interview_phase():
     
     st.markdown(f"**{current_question.text}**")
     
+    answer_key = f"answer_{current_q_idx}"
+    if answer_key not in st.session_state:
+        # Back from another question or resumed: start from the saved answer or draft
+        saved = st.session_state.responses.get(current_question.id)
+        if saved is not None and not is_no_answer(saved.answer):
+            st.session_state[answer_key] = saved.answer
     answer = st.text_area(
         "Your Answer:",
         placeholder="Type your detailed response here...",
         height=200,
-        key=f"answer_{current_q_idx}"
+        key=answer_key,
+        on_change=save_draft,
+        args=(current_q_idx, current_question)
     )
+    # The browser only sends the text on Ctrl+Enter or when the box loses focus
+    st.caption("Your answer is saved when you press Ctrl+Enter or click outside the box. "
+               "When time runs out, the last saved text is submitted.")
     
     col1, col2, col3 = st.columns([1, 1, 1])
     
     with col1:
         if current_q_idx > 0:
             if st.button("← Previous", use_container_width=True):
-                save_current_response(answer, current_question)
+                save_current_response(answer, current_question, interviewer)
                 st.session_state.current_question -= 1
                 st.session_state.question_start_time = time.time()
+                persist_session()
                 st.rerun()
     
-    with col2:
-        if 'remaining' in locals() and remaining <= 0:
-            st.error("Time expired!")
-            if st.button("Auto-Submit", use_container_width=True):
-                submit_response(answer or "No response provided (time expired)", current_question)
-    
     with col3:
         if current_q_idx < len(questions) - 1:
             if st.button("Next →", use_container_width=True):
                 if not answer.strip():
                     st.error("Please provide an answer before proceeding.")
                 else:
-                    submit_response(answer, current_question)
+                    submit_response(answer, current_question, interviewer)
         else:
             if st.button("Finish Interview", use_container_width=True):
                 if not answer.strip():
                     st.error("Please provide an answer before finishing.")
                 else:
-                    submit_response(answer, current_question)
+                    submit_response(answer, current_question, interviewer)
                     st.session_state.phase = 'results'
+                    persist_session()
                     st.rerun()
 
-def save_current_response(answer, question):
+def question_deadline(question_idx):
+    """Monotonic deadline of a question, derived once per question from its wall-clock start"""
+    marker = (question_idx, st.session_state.question_start_time)
+    if st.session_state.get('question_deadline_for') != marker:
+        # Wall-clock start survives a resume on another worker; the monotonic clock does not
+        elapsed = time.time() - st.session_state.question_start_time
+        st.session_state.question_deadline = time.monotonic() + QUESTION_TIME_LIMIT - elapsed
+        st.session_state.question_deadline_for = marker
+    return st.session_state.question_deadline
+
+@st.fragment(run_every=1)
+def show_question_timer(question, question_idx, interviewer):
+    """Countdown that refreshes itself every second and submits the answer when time runs out"""
+    if st.session_state.current_question != question_idx:
+        return  # Stale tick from a question that was already submitted
+    
+    remaining = max(0, question_deadline(question_idx) - time.monotonic())
+    mins = int(remaining // 60)
+    secs = int(remaining % 60)
+    
+    if remaining > 60:
+        st.success(f"⏰ Time remaining: {mins}:{secs:02d}")
+    elif remaining > 30:
+        st.warning(f"⏰ Time remaining: {mins}:{secs:02d}")
+    elif remaining > 0:
+        st.error(f"⏰ Time remaining: {mins}:{secs:02d}")
+    else:
+        st.error("⏰ Time's up! Submitting your answer...")
+    st.progress(remaining / QUESTION_TIME_LIMIT)
+    if 0 < remaining <= 30:
+        st.caption("Press Ctrl+Enter now to save what you have typed.")
+    
+    if remaining <= 0:
+        # Enforced here rather than by a button, so an idle tab cannot run past the limit
+        answer = st.session_state.get(f"answer_{question_idx}", "")
+        submit_response(answer.strip() or TIMED_OUT_ANSWER, question, interviewer)
+
+def save_draft(question_idx, question):
+    """Keep the committed text of an answer in progress, so a resume or the time limit starts from it"""
+    answer = st.session_state.get(f"answer_{question_idx}", "")
+    if answer.strip():
+        response = Response(
+            question_id=question.id,
+            question=question.text,
+            category=question.category,
+            answer=answer.strip(),
+            time_taken=time.time() - st.session_state.question_start_time
+        )
+        st.session_state.responses.upsert(response)
+        persist_response(response)
+
+def save_current_response(answer, question, interviewer):
     """Save current response without advancing"""
     if answer.strip():
         time_taken = time.time() - st.session_state.question_start_time
@@ -98,18 +148,11 @@ def save_current_response(answer, question):
             time_taken=time_taken
         )
         
-        existing_idx = None
-        for i, r in enumerate(st.session_state.responses):
-            if r.question_id == question.id:
-                existing_idx = i
-                break
-        
-        if existing_idx is not None:
-            st.session_state.responses[existing_idx] = response
-        else:
-            st.session_state.responses.append(response)
+        st.session_state.responses.upsert(response)
+        persist_response(response)
+        schedule_answer_scoring(st.session_state.answer_scoring_jobs, response, interviewer.score_response)
 
-def submit_response(answer, question):
+def submit_response(answer, question, interviewer):
     """Submit response and advance to next question"""
     time_taken = time.time() - st.session_state.question_start_time
     
@@ -117,21 +160,17 @@ def submit_response(answer, question):
         question_id=question.id,
         question=question.text,
         category=question.category,
-        answer=answer.strip() or "No response provided",
+        answer=answer.strip() or NO_ANSWER,
         time_taken=time_taken
     )
     
-    existing_idx = None
-    for i, r in enumerate(st.session_state.responses):
-        if r.question_id == question.id:
-            existing_idx = i
-            break
+    st.session_state.responses.upsert(response)
     
-    if existing_idx is not None:
-        st.session_state.responses[existing_idx] = response
-    else:
-        st.session_state.responses.append(response)
+    # Grade in the background so the results page only has to aggregate
+    schedule_answer_scoring(st.session_state.answer_scoring_jobs, response, interviewer.score_response)
     
     st.session_state.current_question += 1
     st.session_state.question_start_time = time.time()
+    persist_response(response)
+    persist_session()
     st.rerun()
\ No newline at end of file
@@ -1,6 +1,9 @@
 import streamlit as st
 from datetime import datetime
-from utils.report_utils import generate_report
+from services.ai_service import basic_evaluation
+from services.answer_scoring import collect_answer_scores
+from utils.report_utils import REPORT_FORMATS, iter_report, report_filename
+from utils.session_utils import persist_evaluation
 
 def show_results_phase(interviewer):
     """Results phase - show evaluation and feedback"""
@@ -10,8 +13,25 @@ def show_results_phase(interviewer):
         st.error("No responses found. Please restart the interview.")
         return
     
-    with st.spinner("Analyzing your responses..."):
-        evaluation = interviewer.evaluate_responses(st.session_state.responses)
+    # Evaluated once per interview; reruns (downloads, widget clicks) render the stored result
+    evaluation = st.session_state.get('evaluation')
+    if evaluation is None:
+        # Scored locally in milliseconds, shown while the model evaluation runs
+        provisional = st.empty()
+        estimate = basic_evaluation(st.session_state.responses)
+        provisional.info(
+            f"⚡ **Provisional score: {estimate['overall_score']}/100** "
+            f"(Technical {estimate['technical_score']}, Problem-Solving {estimate['problem_solving_score']}, "
+            f"Behavioral {estimate['behavioral_score']}) — matched against reference answers while the "
+            f"full evaluation is prepared."
+        )
+        
+        with st.spinner("Analyzing your responses..."):
+            answer_scores = collect_answer_scores(st.session_state.answer_scoring_jobs, st.session_state.responses)
+            evaluation = interviewer.evaluate_responses(st.session_state.responses, answer_scores=answer_scores)
+        provisional.empty()
+        st.session_state.evaluation = evaluation
+        persist_evaluation(evaluation, answer_scores)
     
     overall_score = evaluation.get('overall_score', 0)
     
@@ -89,19 +109,25 @@ def show_results_phase(interviewer):
     with col3:
         st.metric("Questions Completed", f"{len(st.session_state.responses)}/6")
     
+    if interviewer.last_prompt_stats is not None:
+        st.caption(f"Evaluation prompt: {interviewer.last_prompt_stats.summary()}")
+    
     col1, col2 = st.columns(2)
     with col1:
+        report_format = st.selectbox("Report format", list(REPORT_FORMATS), key="report_format")
         if st.button("📥 Download Report", use_container_width=True):
-            report = generate_report(evaluation, st.session_state.responses)
+            report = "".join(iter_report(evaluation, st.session_state.responses,
+                                         st.session_state.candidate_name, report_format))
             st.download_button(
                 label="Download Full Report",
                 data=report,
-                file_name=f"Interview_Report_{st.session_state.candidate_name}_{datetime.now().strftime('%Y%m%d_%H%M')}.txt",
-                mime="text/plain"
+                file_name=report_filename(st.session_state.candidate_name, datetime.now(), report_format),
+                mime=REPORT_FORMATS[report_format][1]
             )
     
     with col2:
         if st.button("🔄 New Interview", use_container_width=True):
             for key in list(st.session_state.keys()):
                 del st.session_state[key]
+            st.query_params.clear()  # Start a new stored interview instead of resuming this one
             st.rerun()
\ No newline at end of file
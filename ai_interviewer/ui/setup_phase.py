@@ -1,5 +1,9 @@
 import streamlit as st
 import time
+from services.ai_service import QuestionGenerationError
+from services.question_pool import get_question_pool
+from services.telemetry import record_fallback
+from utils.session_utils import persist_session
 
 def show_setup_phase(interviewer):
     """Setup phase - collect candidate info and generate questions"""
@@ -17,58 +21,100 @@ def show_setup_phase(interviewer):
     - Immediate evaluation and feedback
     """)
     
-    with st.form("candidate_setup"):
-        st.subheader("Candidate Information")
-        
-        name = st.text_input("Full Name *", placeholder="Enter your full name")
-        background = st.text_area(
-            "Programming Background (Optional)", 
-            placeholder="Brief description of your programming experience, languages, projects...",
-            height=100
-        )
+    # Plain widgets instead of st.form so the background reaches the script as soon as
+    # it is committed and a personalized set can be generated while the candidate reads on
+    st.subheader("Candidate Information")
+    
+    name = st.text_input("Full Name *", placeholder="Enter your full name")
+    background = st.text_area(
+        "Programming Background (Optional)", 
+        placeholder="Brief description of your programming experience, languages, projects...",
+        height=100
+    )
+    
+    pool = get_question_pool(interviewer.quota_key)
+    session_id = st.session_state.session_id
+    # Once the bank can fill a generic set, generic sets no longer need the model
+    bank_ready = interviewer.bank_ready()
+    if not bank_ready:
+        pool.prefetch("", interviewer.request_questions)
+    if background.strip():
+        # Started only once the background stops changing, not on every edit
+        pool.speculate(session_id, background, interviewer.request_questions)
+    else:
+        pool.cancel_speculation(session_id)
+    
+    submitted = st.button("Start Interview", use_container_width=True)
+    
+    if submitted:
+        if not name.strip():
+            st.error("Please enter your name to continue.")
+            return
         
-        submitted = st.form_submit_button("Start Interview", use_container_width=True)
+        st.session_state.candidate_name = name.strip()
+        # A set still waiting out the edit delay would duplicate the one made below
+        pool.cancel_speculation(session_id)
         
-        if submitted:
-            if not name.strip():
-                st.error("Please enter your name to continue.")
-                return
-            
-            st.session_state.candidate_name = name.strip()
-            
-            with st.spinner("Generating personalized questions..."):
-                try:
-                    questions = interviewer.generate_questions(background)
-                    st.session_state.questions = questions
-                    st.session_state.phase = 'interview'
-                    st.session_state.start_time = time.time()
-                    st.session_state.question_start_time = time.time()
-                    st.success("Questions generated! Starting interview...")
-                    time.sleep(1)
-                    st.rerun()
-                except Exception as e:
-                    st.error(f"Failed to generate questions: {e}")
-                    st.info("Using sample questions instead...")
-                    questions = interviewer._get_fallback_questions()
-                    st.session_state.questions = questions
-                    st.session_state.phase = 'interview'
-                    st.session_state.start_time = time.time()
-                    st.session_state.question_start_time = time.time()
-                    st.rerun()
-        
-        col1, col2 = st.columns(2)
-        with col2:
-            if st.form_submit_button("🚀 Use Sample Questions", use_container_width=True):
-                if not name.strip():
-                    st.error("Please enter your name to continue.")
-                    return
-                
-                st.session_state.candidate_name = name.strip()
-                questions = interviewer._get_fallback_questions()
+        with st.spinner("Generating personalized questions..."):
+            try:
+                # Generic sets come straight from the bank, personalized ones from the pool
+                # when prefetch got there first; LLM call only on a miss
+                questions = interviewer.bank_question_set() if not background.strip() else None
+                if questions is None:
+                    questions = pool.take(background, wait_timeout=45)
+                if questions is None:
+                    questions = stream_question_preview(interviewer, background)
+                if not bank_ready:
+                    pool.prefetch("", interviewer.request_questions)
                 st.session_state.questions = questions
                 st.session_state.phase = 'interview'
                 st.session_state.start_time = time.time()
                 st.session_state.question_start_time = time.time()
-                st.success("Using sample questions! Starting interview...")
+                persist_session()
+                st.success("Questions generated! Starting interview...")
                 time.sleep(1)
-                st.rerun()
\ No newline at end of file
+                st.rerun()
+            except Exception as e:
+                record_fallback('questions', type(e).__name__)
+                st.error(f"Failed to generate questions: {e}")
+                st.info("Using sample questions instead...")
+                questions = interviewer._get_fallback_questions()
+                st.session_state.questions = questions
+                st.session_state.phase = 'interview'
+                st.session_state.start_time = time.time()
+                st.session_state.question_start_time = time.time()
+                persist_session()
+                st.rerun()
+    
+    col1, col2 = st.columns(2)
+    with col2:
+        if st.button("🚀 Use Sample Questions", use_container_width=True):
+            if not name.strip():
+                st.error("Please enter your name to continue.")
+                return
+            
+            st.session_state.candidate_name = name.strip()
+            pool.cancel_speculation(session_id)
+            questions = interviewer._get_fallback_questions()
+            st.session_state.questions = questions
+            st.session_state.phase = 'interview'
+            st.session_state.start_time = time.time()
+            st.session_state.question_start_time = time.time()
+            persist_session()
+            st.success("Using sample questions! Starting interview...")
+            time.sleep(1)
+            st.rerun()
+
+def stream_question_preview(interviewer, background):
+    """Generate questions on a pool miss, showing each one as soon as it is written"""
+    preview = st.container()
+    questions = []
+    try:
+        for question in interviewer.stream_questions(background):
+            questions.append(question)
+            preview.markdown(f"**{question.id}.** *{question.category}* — {question.text}")
+    except QuestionGenerationError as e:
+        record_fallback('questions', 'stream_failed')
+        st.warning(f"{e} Using fallback questions.")
+        return interviewer._get_fallback_questions()
+    return questions
@@ -0,0 +1,33 @@
+import hmac
+import os
+import streamlit as st
+
+ADMIN_PASSWORD_ENV = 'AI_INTERVIEWER_ADMIN_PASSWORD'
+
+def admin_enabled() -> bool:
+    """Whether an admin password is configured; without one the admin page stays closed"""
+    return bool(os.environ.get(ADMIN_PASSWORD_ENV))
+
+def is_admin() -> bool:
+    """Whether this browser session has signed in with the admin password"""
+    return admin_enabled() and bool(st.session_state.get('admin_authenticated'))
+
+def require_admin() -> bool:
+    """Show the admin sign-in form until the right password is entered; True once signed in"""
+    if not admin_enabled():
+        st.error(f'The admin page is disabled. Set {ADMIN_PASSWORD_ENV} on the server to enable it.')
+        return False
+    if is_admin():
+        return True
+    
+    st.title('🔒 Admin sign-in')
+    with st.form('admin_sign_in'):
+        password = st.text_input('Admin password', type='password')
+        submitted = st.form_submit_button('Sign in')
+    if submitted:
+        expected = os.environ[ADMIN_PASSWORD_ENV]
+        if hmac.compare_digest(password.encode('utf-8'), expected.encode('utf-8')):
+            st.session_state.admin_authenticated = True
+            st.rerun()
+        st.error('Wrong password')
+    return False
@@ -0,0 +1,107 @@
+import json
+import os
+import urllib.error
+import urllib.request
+from dataclasses import asdict
+from typing import Dict, Iterator, List, Optional
+import streamlit as st
+from models.data_models import Question, Response
+from services.ai_service import QuestionGenerationError, basic_evaluation, default_questions
+
+API_URL_ENV = 'AI_INTERVIEWER_API_URL'
+# Sent as a bearer token; the server requires it when it listens off loopback
+API_TOKEN_ENV = 'AI_INTERVIEWER_API_TOKEN'
+
+def api_url_from_env() -> Optional[str]:
+    """Base URL of an interview API server (api_server.py) to use instead of calling the model here"""
+    return os.environ.get(API_URL_ENV, '').rstrip('/') or None
+
+class RemoteInterviewer:
+    """The AIInterviewer methods the UI uses, served by an interview API server"""
+    # Model calls, routing, quotas and caches then live in that one server process; the Streamlit
+    # app keeps only each candidate's session state.
+
+    def __init__(self, base_url: str, timeout: float = 120.0, token: Optional[str] = None):
+        self.base_url = base_url.rstrip('/')
+        self.timeout = timeout
+        self.headers = {'Content-Type': 'application/json'}
+        token = token or os.environ.get(API_TOKEN_ENV)
+        if token:
+            self.headers['Authorization'] = f'Bearer {token}'
+        # Prompts are built on the server
+        self.last_prompt_stats = None
+        health = self._call('GET', '/healthz', timeout=5)
+        self.model_name = health['model']
+        self._bank_ready = bool(health.get('bank_ready'))
+        # The server spends its own key on every call made through it
+        self.quota_key = f'api:{self.base_url}'
+
+    def _call(self, method: str, path: str, body: Optional[Dict] = None, timeout: Optional[float] = None):
+        data = None if body is None else json.dumps(body, ensure_ascii=False).encode('utf-8')
+        request = urllib.request.Request(
+            self.base_url + path, data=data, method=method, headers=self.headers
+        )
+        try:
+            with urllib.request.urlopen(request, timeout=timeout or self.timeout) as reply:
+                return json.loads(reply.read())
+        except urllib.error.HTTPError as e:
+            try:
+                message = json.loads(e.read()).get('error', e.reason)
+            except ValueError:
+                message = e.reason
+            raise RuntimeError(f'Interview API {e.code}: {message}') from e
+
+    @staticmethod
+    def _questions(payload: Dict) -> Optional[List[Question]]:
+        questions = payload.get('questions')
+        return None if questions is None else [Question(**q) for q in questions]
+
+    def bank_question_set(self) -> Optional[List[Question]]:
+        try:
+            return self._questions(self._call('GET', '/v1/questions/bank', timeout=10))
+        except (OSError, RuntimeError):
+            return None
+
+    def bank_ready(self) -> bool:
+        """As reported by the server's /healthz when this client connected"""
+        return self._bank_ready
+
+    def request_questions(self, candidate_background: str = '') -> List[Question]:
+        """Generate 6 questions or raise; no Streamlit calls"""
+        try:
+            payload = self._call('POST', '/v1/questions', {'background': candidate_background, 'fallback': False})
+        except (OSError, RuntimeError) as e:
+            raise QuestionGenerationError(str(e))
+        return self._questions(payload)
+
+    def generate_questions(self, candidate_background: str = '') -> List[Question]:
+        try:
+            questions = self._questions(self._call('POST', '/v1/questions', {'background': candidate_background}))
+            st.success(f'Generated {len(questions)} personalized questions!')
+            return questions
+        except (OSError, RuntimeError) as e:
+            st.error(f'Error generating questions: {e}')
+            return self._get_fallback_questions()
+
+    def stream_questions(self, candidate_background: str = '') -> Iterator[Question]:
+        """The API answers with the whole set, so the questions arrive together"""
+        yield from self.request_questions(candidate_background)
+
+    def _get_fallback_questions(self) -> List[Question]:
+        return self.bank_question_set() or default_questions()
+
+    def score_response(self, response: Response) -> Dict:
+        """Score a single answer; safe to call from a background worker (no Streamlit calls)"""
+        return self._call('POST', '/v1/score', {'response': asdict(response)})
+
+    def evaluate_responses(self, responses: List[Response], answer_scores: Optional[Dict[int, Dict]] = None,
+                           use_cache: bool = True) -> Dict:
+        try:
+            return self._call('POST', '/v1/evaluate', {
+                'responses': [asdict(r) for r in responses],
+                'answer_scores': {str(k): v for k, v in (answer_scores or {}).items()},
+                'use_cache': use_cache,
+            })
+        except (OSError, RuntimeError) as e:
+            st.error(f'Evaluation error: {e}')
+            return basic_evaluation(responses)
@@ -0,0 +1,76 @@
+import json
+from typing import Any, List
+
+class JSONArrayStreamParser:
+    """Incrementally parse the elements of a top-level JSON array"""
+    # Text before the opening ``[`` (markdown fences, chatter) is skipped. Each call to ``feed``
+    # returns the elements whose closing brace or bracket arrived in that chunk, so a truncated
+    # stream still yields every element that was completed.
+
+    def __init__(self):
+        self.started = False
+        self.finished = False
+        self.elements_seen = 0
+        self._buffer: List[str] = []
+        self._depth = 0
+        self._in_string = False
+        self._escaped = False
+
+    def feed(self, chunk: str) -> List[Any]:
+        """Consume a chunk of text and return the array elements completed by it"""
+        completed = []
+        for char in chunk:
+            if self.finished:
+                break
+
+            if not self.started:
+                if char == '[':
+                    self.started = True
+                continue
+
+            if self._in_string:
+                self._buffer.append(char)
+                if self._escaped:
+                    self._escaped = False
+                elif char == '\\':
+                    self._escaped = True
+                elif char == '"':
+                    self._in_string = False
+                continue
+
+            if self._depth == 0:
+                # Between elements: only a new container starts an element we keep
+                if char in '{[':
+                    self._buffer = [char]
+                    self._depth = 1
+                elif char == ']':
+                    self.finished = True
+                continue
+
+            self._buffer.append(char)
+            if char == '"':
+                self._in_string = True
+            elif char in '{[':
+                self._depth += 1
+            elif char in '}]':
+                self._depth -= 1
+                if self._depth == 0:
+                    element = self._decode()
+                    if element is not None:
+                        completed.append(element)
+
+        return completed
+
+    def _decode(self):
+        text = ''.join(self._buffer)
+        self._buffer = []
+        try:
+            element = json.loads(text)
+        except json.JSONDecodeError:
+            return None
+        self.elements_seen += 1
+        return element
+
+def parse_json_array_prefix(text: str) -> List[Any]:
+    """Every complete element of the first JSON array in ``text``, even if it is truncated"""
+    return JSONArrayStreamParser().feed(text)
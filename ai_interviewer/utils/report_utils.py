@@ -1,14 +1,49 @@
+import csv
+import html
+import io
+import json
+import re
 import streamlit as st
+import zipfile
 from datetime import datetime
+from typing import BinaryIO, Dict, Iterable, Iterator, Optional, Sequence
 
-def generate_report(evaluation, responses):
+# Format name -> (file extension, MIME type)
+REPORT_FORMATS = {
+    'text': ('txt', 'text/plain'),
+    'json': ('json', 'application/json'),
+    'csv': ('csv', 'text/csv'),
+    'html': ('html', 'text/html'),
+}
+
+SCORE_LABELS = [
+    ('technical_score', 'Technical Knowledge'),
+    ('communication_score', 'Communication'),
+    ('problem_solving_score', 'Problem Solving'),
+    ('behavioral_score', 'Behavioral Fit'),
+]
+
+def generate_report(evaluation, responses, candidate_name: Optional[str] = None):
     """Generate downloadable text report"""
-    report = f"""
+    if candidate_name is None:
+        candidate_name = st.session_state.candidate_name
+    return "".join(iter_report(evaluation, responses, candidate_name))
+
+def iter_report(evaluation: Dict, responses: Sequence, candidate_name: str, fmt: str = 'text',
+                generated_at: Optional[datetime] = None) -> Iterator[str]:
+    """Render a report piece by piece; needs no Streamlit session"""
+    renderers = {'text': _iter_text, 'json': _iter_json, 'csv': _iter_csv, 'html': _iter_html}
+    if fmt not in renderers:
+        raise ValueError(f"Unknown report format: {fmt}")
+    return renderers[fmt](evaluation, responses, candidate_name, generated_at or datetime.now())
+
+def _iter_text(evaluation, responses, candidate_name, generated_at):
+    yield f"""
 AI INTERVIEW REPORT
 ==================
-Candidate: {st.session_state.candidate_name}
+Candidate: {candidate_name}
 Position: Software Development Engineer Intern
-Date: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
+Date: {generated_at.strftime('%Y-%m-%d %H:%M:%S')}
 
 OVERALL PERFORMANCE
 ==================
@@ -37,15 +72,108 @@ DETAILED FEEDBACK
 QUESTION RESPONSES
 =================
 """
-    
+
     for i, response in enumerate(responses, 1):
-        report += f"""
+        yield f"""
 Question {i}: {response.category}
 {'-' * 50}
 Q: {response.question}
 A: {response.answer}
 Time: {response.time_taken:.1f} seconds
 """
-    
-    report += "\n---\nGenerated by AI Interviewer System"
-    return report
\ No newline at end of file
+
+    yield "\n---\nGenerated by AI Interviewer System"
+
+def _iter_json(evaluation, responses, candidate_name, generated_at):
+    header = {
+        'candidate': candidate_name,
+        'position': 'Software Development Engineer Intern',
+        'date': generated_at.isoformat(timespec='seconds'),
+        'evaluation': evaluation,
+    }
+    # Open the object by hand so responses can be written one at a time
+    yield json.dumps(header, ensure_ascii=False)[:-1] + ', "responses": ['
+    for i, response in enumerate(responses):
+        yield (", " if i else "") + json.dumps({
+            'question_id': response.question_id,
+            'question': response.question,
+            'category': str(response.category),
+            'answer': response.answer,
+            'time_taken': round(response.time_taken, 1),
+        }, ensure_ascii=False)
+    yield "]}"
+
+def _iter_csv(evaluation, responses, candidate_name, generated_at):
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def row(values):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerow(values)
+        return buffer.getvalue()
+
+    # One row per answer, with the interview-level results repeated so rows stand alone
+    yield row(['candidate', 'date', 'overall_score', 'recommendation',
+               *[key for key, _ in SCORE_LABELS], 'question_number', 'category', 'question', 'answer', 'time_taken'])
+    interview = [candidate_name, generated_at.isoformat(timespec='seconds'),
+                 evaluation.get('overall_score', 0), evaluation.get('recommendation', 'Under Review'),
+                 *[evaluation.get(key, 0) for key, _ in SCORE_LABELS]]
+    for i, response in enumerate(responses, 1):
+        yield row([*interview, i, str(response.category), response.question, response.answer,
+                   f"{response.time_taken:.1f}"])
+
+def _iter_html(evaluation, responses, candidate_name, generated_at):
+    e = html.escape
+    yield f"""<!DOCTYPE html>
+<html><head><meta charset="utf-8"><title>Interview Report - {e(candidate_name)}</title>
+<style>body{{font-family:sans-serif;max-width:50em;margin:2em auto}}td,th{{padding:.2em 1em;text-align:left}}</style>
+</head><body>
+<h1>AI Interview Report</h1>
+<p><b>Candidate:</b> {e(candidate_name)}<br><b>Position:</b> Software Development Engineer Intern<br>
+<b>Date:</b> {generated_at.strftime('%Y-%m-%d %H:%M:%S')}</p>
+<h2>Overall Performance</h2>
+<p><b>Overall Score:</b> {e(str(evaluation.get('overall_score', 0)))}/100<br>
+<b>Recommendation:</b> {e(str(evaluation.get('recommendation', 'Under Review')))}</p>
+<h2>Detailed Scores</h2>
+<table>{''.join(f"<tr><th>{label}</th><td>{e(str(evaluation.get(key, 0)))}/100</td></tr>" for key, label in SCORE_LABELS)}</table>
+<h2>Strengths</h2>
+<ul>{''.join(f"<li>{e(str(s))}</li>" for s in evaluation.get('strengths', []))}</ul>
+<h2>Improvement Areas</h2>
+<ul>{''.join(f"<li>{e(str(i))}</li>" for i in evaluation.get('improvements', []))}</ul>
+<h2>Detailed Feedback</h2>
+<p>{e(str(evaluation.get('detailed_feedback', 'No detailed feedback available.')))}</p>
+<h2>Question Responses</h2>
+"""
+    for i, response in enumerate(responses, 1):
+        yield f"""<h3>Question {i}: {e(str(response.category))}</h3>
+<p><b>Q:</b> {e(response.question)}</p>
+<p><b>A:</b> {e(response.answer).replace(chr(10), '<br>')}</p>
+<p><i>Time: {response.time_taken:.1f} seconds</i></p>
+"""
+    yield "<hr><p>Generated by AI Interviewer System</p></body></html>\n"
+
+def report_filename(candidate_name: str, generated_at: datetime, fmt: str = 'text', suffix: str = "") -> str:
+    """Interview_Report_<name>_<YYYYmmdd_HHMM>[_suffix].<ext>, safe to use inside a zip"""
+    safe_name = re.sub(r"[^A-Za-z0-9_.-]+", "_", candidate_name).strip("_") or "Candidate"
+    suffix = f"_{suffix}" if suffix else ""
+    return f"Interview_Report_{safe_name}_{generated_at.strftime('%Y%m%d_%H%M')}{suffix}.{REPORT_FORMATS[fmt][0]}"
+
+def write_reports_zip(output: BinaryIO, reports: Iterable[Dict], fmt: str = 'text') -> int:
+    """Stream stored reports (as yielded by SessionStore.iter_reports) into a zip archive.
+
+    Each report is rendered and compressed chunk by chunk straight into ``output``, which
+    may be a file, a pipe or a socket; memory use does not grow with the number of reports.
+    Returns the number of reports written.
+    """
+    count = 0
+    with zipfile.ZipFile(output, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for report in reports:
+            generated_at = datetime.fromtimestamp(report['completed_at'])
+            name = report_filename(report['candidate_name'], generated_at, fmt, report['session_id'][:8])
+            with archive.open(name, 'w') as entry:
+                for chunk in iter_report(report['evaluation'], report['responses'],
+                                         report['candidate_name'], fmt, generated_at):
+                    entry.write(chunk.encode('utf-8'))
+            count += 1
+    return count
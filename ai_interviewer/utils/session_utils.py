@@ -1,8 +1,12 @@
 import streamlit as st
-import google.generativeai as genai
+from models.data_models import ResponseLog
+from services.model_cache import hash_api_key, store_model
+from services.model_resolver import ModelResolutionError, ModelResolver
+from services.session_store import get_session_store
 
 def initialize_session_state():
     """Initialize session state variables"""
+    restore_or_start_session()
     if 'phase' not in st.session_state:
         st.session_state.phase = 'setup'  
     if 'current_question' not in st.session_state:
@@ -10,86 +14,108 @@ def initialize_session_state():
     if 'questions' not in st.session_state:
         st.session_state.questions = []
     if 'responses' not in st.session_state:
-        st.session_state.responses = []
+        st.session_state.responses = ResponseLog()
     if 'candidate_name' not in st.session_state:
         st.session_state.candidate_name = ""
     if 'start_time' not in st.session_state:
         st.session_state.start_time = None
     if 'question_start_time' not in st.session_state:
         st.session_state.question_start_time = None
+    if 'answer_scoring_jobs' not in st.session_state:
+        st.session_state.answer_scoring_jobs = {}
     if 'api_tested' not in st.session_state:
         st.session_state.api_tested = False
     if 'api_test_result' not in st.session_state:
         st.session_state.api_test_result = None
 
+def restore_or_start_session():
+    """Bind this browser session to a stored interview, resuming it from ?sid= on any worker"""
+    if 'session_id' in st.session_state:
+        return
+    
+    store = get_session_store()
+    session_id = st.query_params.get('sid')
+    saved = store.load_session(session_id) if session_id else None
+    
+    if saved is not None:
+        for key, value in saved.items():
+            st.session_state[key] = value
+    else:
+        session_id = store.new_session_id()
+        st.query_params['sid'] = session_id
+    
+    st.session_state.session_id = session_id
+
+def persist_session():
+    """Queue the current phase, position and questions for a write-behind save"""
+    get_session_store().save_session(st.session_state.session_id, st.session_state)
+
+def persist_response(response):
+    """Queue one recorded answer for a write-behind save"""
+    get_session_store().save_response(st.session_state.session_id, response)
+
+def persist_evaluation(evaluation, answer_scores=None):
+    """Queue the final evaluation and per-answer results for cross-interview analytics, once per interview"""
+    if st.session_state.get('evaluation_saved'):
+        return
+    get_session_store().save_evaluation(
+        st.session_state.session_id, evaluation, st.session_state.questions,
+        st.session_state.responses, answer_scores
+    )
+    st.session_state.evaluation_saved = True
+
 def test_api_connection(api_key):
     """Test API connection with current Gemini models and store result in session state"""
     try:
+        # Deferred so sessions that never test the key skip the SDK import
+        import google.generativeai as genai
         genai.configure(api_key=api_key)
         
-        # Updated model names based on current Gemini API (September 2025)
-        model_names = [
-            # Try the most stable and widely available models first
-            'gemini-2.5-flash',
-            'gemini-2.5-pro', 
-            'gemini-2.0-flash',
-            'gemini-1.5-flash',
-            'gemini-1.5-pro',
-            
-            # Try with models/ prefix as backup
-            'models/gemini-2.5-flash',
-            'models/gemini-2.5-pro',
-            'models/gemini-2.0-flash', 
-            'models/gemini-1.5-flash',
-            'models/gemini-1.5-pro'
-        ]
-        
-        last_error = None
+        st.info("Testing connection with available Gemini models...")
         
-        for model_name in model_names:
-            try:
-                st.info(f"Testing connection with {model_name}...")
-                
-                test_model = genai.GenerativeModel(model_name)
-                test_response = test_model.generate_content(
-                    "Respond with exactly 'API_TEST_SUCCESS' if you receive this message.",
-                    generation_config=genai.types.GenerationConfig(
-                        max_output_tokens=20,
-                        temperature=0.1,
-                        top_p=0.8
-                    ),
-                    request_options={'timeout': 20}
-                )
-                
-                if test_response and test_response.text:
-                    response_text = test_response.text.strip()
-                    st.success(f"✅ API test successful with {model_name}")
-                    st.success(f"Response: {response_text}")
-                    
-                    st.session_state.api_test_result = f"success_with_{model_name}"
-                    st.session_state.api_tested = True
-                    return True
-                else:
-                    st.warning(f"⚠️ Empty response from {model_name}")
-                    last_error = f"Empty response from {model_name}"
-                    continue
-                    
-            except Exception as e:
-                error_msg = str(e)
+        try:
+            resolved = ModelResolver().resolve()
+        except ModelResolutionError as e:
+            resolved = None
+            last_error = str(e)
+            
+            for model_name, error_msg in e.errors.items():
                 st.warning(f"❌ Failed with {model_name}: {error_msg[:100]}...")
-                last_error = error_msg
-                
-                # Special handling for common errors
-                if "404" in error_msg:
-                    st.info(f"Model {model_name} not found, trying next model...")
-                elif "quota" in error_msg.lower():
-                    st.error("⚠️ API quota exceeded. Please check your usage limits.")
-                elif "permission" in error_msg.lower():
-                    st.error("⚠️ Permission denied. Please check your API key permissions.")
-                elif "timeout" in error_msg.lower():
-                    st.warning("⚠️ Request timed out. Trying next model...")
+            
+            # Special handling for common errors
+            all_errors = " ".join(e.errors.values()).lower()
+            if "quota" in all_errors:
+                st.error("⚠️ API quota exceeded. Please check your usage limits.")
+            if "permission" in all_errors:
+                st.error("⚠️ Permission denied. Please check your API key permissions.")
+            if "timeout" in all_errors or "deadline" in all_errors:
+                st.warning("⚠️ Some models timed out.")
+        
+        if resolved is not None:
+            model_name = resolved.model_name
+            # The probe only checked metadata; send one real generation for the explicit test
+            test_response = resolved.model.generate_content(
+                "Respond with exactly 'API_TEST_SUCCESS' if you receive this message.",
+                generation_config=genai.types.GenerationConfig(
+                    max_output_tokens=20,
+                    temperature=0.1,
+                    top_p=0.8
+                ),
+                request_options={'timeout': 20}
+            )
+            
+            if test_response and test_response.text:
+                response_text = test_response.text.strip()
+                st.success(f"✅ API test successful with {model_name} ({resolved.elapsed:.1f}s)")
+                st.success(f"Response: {response_text}")
                 
-                continue
+                store_model(hash_api_key(api_key), model_name, resolved.model)
+                st.session_state.api_test_result = f"success_with_{model_name}"
+                st.session_state.api_tested = True
+                return True
+            
+            st.warning(f"⚠️ Empty response from {model_name}")
+            last_error = f"Empty response from {model_name}"
         
         # No working model found
         st.session_state.api_test_result = f"no_working_model_found: {last_error}"
@@ -131,6 +157,7 @@ def reset_session():
     for key in list(st.session_state.keys()):
         if key not in keys_to_keep:
             del st.session_state[key]
+    st.query_params.clear()  # Start a new stored interview instead of resuming this one
     
     initialize_session_state()
 
@@ -0,0 +1,21 @@
+import os
+import sqlite3
+
+DATA_DIR_ENV = 'AI_INTERVIEWER_DATA_DIR'
+
+def get_data_dir() -> str:
+    """Directory for local caches and databases, created on first use"""
+    data_dir = os.environ.get(DATA_DIR_ENV) or os.path.join(os.path.expanduser('~'), '.ai_interviewer')
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
+
+def data_path(filename: str) -> str:
+    """Path of a file inside the data directory"""
+    return os.path.join(get_data_dir(), filename)
+
+def connect_sqlite(db_path: str) -> sqlite3.Connection:
+    """Open a SQLite connection that can be shared between threads behind a lock"""
+    conn = sqlite3.connect(db_path, check_same_thread=False, timeout=30)
+    conn.execute('PRAGMA journal_mode=WAL')
+    conn.execute('PRAGMA synchronous=NORMAL')
+    return conn